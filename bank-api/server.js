@@ -166,6 +166,81 @@ app.post('/withdraw/:acc/:ifsc/:amount', async (req, res) => {
     } finally { client.release(); }
 });
 
+// 9. Batch Deposits/Withdrawals (Atomic per batch, rows applied in order)
+// Body: { transactions: [{ type: 'deposit' | 'withdraw', amount, timestamp? }] }
+// Rows that fail validation or would overdraw are reported and skipped; the rest are committed.
+app.post('/batch/:acc/:ifsc', async (req, res) => {
+    const { acc, ifsc } = req.params;
+    const { transactions } = req.body;
+    if (!Array.isArray(transactions)) return res.status(400).json({ error: 'transactions must be an array' });
+
+    const client = await pool.connect();
+    try {
+        await client.query('BEGIN');
+        const user = await client.query(
+            'SELECT balance FROM accounts WHERE account_number = $1 AND ifsc_code = $2 FOR UPDATE',
+            [acc, ifsc]
+        );
+        if (user.rows.length === 0) throw new Error('Account not found');
+
+        // Work in paise so the running balance does not drift
+        let balance = Math.round(parseFloat(user.rows[0].balance) * 100);
+        const senders = [], receivers = [], amounts = [], timestamps = [];
+        const results = [];
+
+        transactions.forEach((tx, index) => {
+            const amount = Math.round(parseFloat(tx.amount) * 100);
+            if (!(amount > 0)) {
+                results.push({ index, status: 'failed', error: 'Amount must be a positive number' });
+                return;
+            }
+            if (tx.type === 'deposit') {
+                balance += amount;
+                senders.push('EXTERNAL_DEPOSIT');
+                receivers.push(acc);
+            } else if (tx.type === 'withdraw') {
+                if (balance < amount) {
+                    results.push({ index, status: 'failed', error: 'Insufficient funds' });
+                    return;
+                }
+                balance -= amount;
+                senders.push(acc);
+                receivers.push('CASH_WITHDRAWAL');
+            } else {
+                results.push({ index, status: 'failed', error: 'Unknown transaction type' });
+                return;
+            }
+            amounts.push((amount / 100).toFixed(2));
+            timestamps.push(tx.timestamp || null);
+            results.push({ index, status: 'ok' });
+        });
+
+        if (amounts.length > 0) {
+            await client.query(
+                `INSERT INTO transactions (sender_account, receiver_account, amount, timestamp)
+                 SELECT s, r, a, COALESCE(t, CURRENT_TIMESTAMP)
+                 FROM unnest($1::varchar[], $2::varchar[], $3::numeric[], $4::timestamp[]) AS u(s, r, a, t)`,
+                [senders, receivers, amounts, timestamps]
+            );
+            await client.query(
+                'UPDATE accounts SET balance = $1 WHERE account_number = $2 AND ifsc_code = $3',
+                [(balance / 100).toFixed(2), acc, ifsc]
+            );
+        }
+        await client.query('COMMIT');
+        res.json({
+            message: 'Batch processed',
+            applied: amounts.length,
+            failed: transactions.length - amounts.length,
+            balance: (balance / 100).toFixed(2),
+            results
+        });
+    } catch (err) {
+        await client.query('ROLLBACK');
+        res.status(400).json({ error: err.message });
+    } finally { client.release(); }
+});
+
 const PORT = process.env.PORT || 3100;
 app.listen(PORT, '0.0.0.0', () => {
     console.log(`Bank API running on port ${PORT}`);
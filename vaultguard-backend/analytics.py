@@ -0,0 +1,128 @@
+"""
+VaultGuard Analytics
+Category and weekday x category spending over any date range, from cached expense columns
+"""
+import asyncio
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import ACCOUNT_STATE_CACHE_SIZE
+
+
+# Amount bands build_expenses in main.py categorizes withdrawals by
+CATEGORIES = ("regular", "irregular", "daily")
+BAND_EDGES = np.array([200, 500, 1500, 3000, 5000], dtype=float)
+BAND_CATEGORY = np.array([2, 2, 1, 1, 0, 0], dtype=np.int8)  # band -> index into CATEGORIES
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+# 1970-01-01, day 0 of datetime64[D], was a Thursday
+_EPOCH_WEEKDAY = 3
+
+
+class ExpenseColumns:
+    """
+    An account's withdrawals as numpy columns sorted by day: day number
+    (datetime64[D] as int), weekday, category and amount. Date ranges are
+    bisected with searchsorted, and totals are bincounts over the slice.
+    """
+
+    def __init__(self, days: np.ndarray, categories: np.ndarray, amounts: np.ndarray):
+        if len(days) > 1 and np.any(days[1:] < days[:-1]):
+            order = np.argsort(days, kind='stable')
+            days, categories, amounts = days[order], categories[order], amounts[order]
+        self.days = days
+        self.weekdays = ((days + _EPOCH_WEEKDAY) % 7).astype(np.int8)
+        self.categories = categories
+        self.amounts = amounts
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @classmethod
+    def from_transactions(cls, transactions: List[Dict], account_number: str) -> 'ExpenseColumns':
+        # Same rule as rollups.is_expense
+        expenses = [
+            tx for tx in transactions
+            if tx.get('sender_account') == account_number or tx.get('receiver_account') == 'CASH_WITHDRAWAL'
+        ]
+        days = np.array([tx['timestamp'][:10] for tx in expenses], dtype='datetime64[D]').astype(np.int64)
+        amounts = np.array([tx['amount'] for tx in expenses], dtype=float)
+        return cls(days, BAND_CATEGORY[np.searchsorted(BAND_EDGES, amounts, side='right')], amounts)
+
+    @classmethod
+    def from_expenses(cls, expenses: List[Dict]) -> 'ExpenseColumns':
+        """Columns for manually added expenses, keeping the category the user chose"""
+        expenses = [expense for expense in expenses if expense['category'] in CATEGORIES]
+        days = np.array([expense['date'] for expense in expenses], dtype='datetime64[D]').astype(np.int64)
+        categories = np.array([CATEGORIES.index(expense['category']) for expense in expenses], dtype=np.int8)
+        amounts = np.array([expense['amount'] for expense in expenses], dtype=float)
+        return cls(days, categories, amounts)
+
+    def extend(self, other: 'ExpenseColumns') -> 'ExpenseColumns':
+        return ExpenseColumns(
+            np.concatenate([self.days, other.days]),
+            np.concatenate([self.categories, other.categories]),
+            np.concatenate([self.amounts, other.amounts])
+        )
+
+    def _range(self, start: Optional[date], end: Optional[date]) -> slice:
+        first = 0 if start is None else np.searchsorted(self.days, np.datetime64(start, 'D').astype(np.int64))
+        last = len(self) if end is None else np.searchsorted(
+            self.days, np.datetime64(end, 'D').astype(np.int64), side='right'
+        )
+        return slice(first, last)
+
+    def category_totals(self, start: Optional[date] = None, end: Optional[date] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Spend and expense count per category (in CATEGORIES order), start through end inclusive"""
+        rows = self._range(start, end)
+        categories = self.categories[rows]
+        totals = np.bincount(categories, weights=self.amounts[rows], minlength=len(CATEGORIES))
+        return totals, np.bincount(categories, minlength=len(CATEGORIES))
+
+    def weekday_by_category(self, start: Optional[date] = None, end: Optional[date] = None) -> np.ndarray:
+        """7 x len(CATEGORIES) spend matrix, Monday first, start through end inclusive"""
+        rows = self._range(start, end)
+        cells = self.weekdays[rows].astype(np.intp) * len(CATEGORIES) + self.categories[rows]
+        totals = np.bincount(cells, weights=self.amounts[rows], minlength=7 * len(CATEGORIES))
+        return totals.reshape(7, len(CATEGORIES))
+
+
+class AnalyticsService:
+    """
+    Keeps ExpenseColumns per account alongside the prediction service's
+    account state. Transactions a state has gained since the columns were
+    built (events append to its feed) are folded in; a refetched state, with
+    a new feed, is rebuilt off the event loop.
+    """
+
+    def __init__(self, max_accounts: int = ACCOUNT_STATE_CACHE_SIZE):
+        self.max_accounts = max_accounts
+        # account -> (transaction list the columns came from, rows consumed, columns)
+        self._columns: OrderedDict = OrderedDict()
+
+    async def columns(self, state) -> ExpenseColumns:
+        account_number = state.account_number
+        transactions = state.transactions
+        cached = self._columns.get(account_number)
+        if cached is not None and cached[0] is transactions:
+            _, consumed, columns = cached
+            if consumed == len(transactions):
+                self._columns.move_to_end(account_number)
+                return columns
+            # Rows appended by events since the last read: a short tail, parsed inline
+            rows = transactions[consumed:]
+            columns = columns.extend(ExpenseColumns.from_transactions(rows, account_number))
+        else:
+            # A copy, so rows appended while the thread reads are folded in next time
+            rows = list(transactions)
+            consumed = 0
+            columns = await asyncio.to_thread(ExpenseColumns.from_transactions, rows, account_number)
+
+        self._columns[account_number] = (transactions, consumed + len(rows), columns)
+        self._columns.move_to_end(account_number)
+        while len(self._columns) > self.max_accounts:
+            self._columns.popitem(last=False)
+        return columns
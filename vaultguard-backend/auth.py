@@ -2,8 +2,9 @@
 VaultGuard Authentication Module
 Handles user authentication with JWT tokens
 """
+import hashlib
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
@@ -15,17 +16,23 @@ from config import (
     SECRET_KEY,
     ALGORITHM,
     ACCESS_TOKEN_EXPIRE_MINUTES,
+    STREAM_TOKEN_EXPIRE_SECONDS,
     DEMO_USER_EMAIL,
     DEMO_USER_PASSWORD,
     USER_NAME,
     USER_EMAIL,
     DEFAULT_ACCOUNT_NUMBER,
-    DEFAULT_IFSC_CODE
+    DEFAULT_IFSC_CODE,
+    DEFAULT_TIMEZONE
 )
+from cache import get_cache
 
 # Security
 security = HTTPBearer()
 
+# Scope claim of tokens that may only open a dashboard stream
+STREAM_SCOPE = "stream"
+
 
 # Models
 class Token(BaseModel):
@@ -46,6 +53,7 @@ class UserRegister(BaseModel):
     email: str
     password: str
     name: str
+    timezone: Optional[str] = None  # IANA name, e.g. "Asia/Kolkata"
 
 
 class User(BaseModel):
@@ -53,6 +61,8 @@ class User(BaseModel):
     name: str
     account_number: str
     ifsc_code: str
+    tier: str = "standard"
+    timezone: str = DEFAULT_TIMEZONE
     disabled: bool = False
 
 
@@ -136,9 +146,16 @@ def get_users_db():
     return _users_db
 
 
-def add_user(email: str, name: str, hashed_password: str, account_number: str, ifsc_code: str) -> UserInDB:
-    """Add a new user to the database"""
-    if email in _users_db:
+def add_user(
+    email: str,
+    name: str,
+    hashed_password: str,
+    account_number: str,
+    ifsc_code: str,
+    timezone: Optional[str] = None
+) -> UserInDB:
+    """Add a new user to the database (mirrored to the shared cache for the other workers)"""
+    if get_user(email) is not None:
         raise ValueError("User already exists")
     user = UserInDB(
         email=email,
@@ -146,12 +163,30 @@ def add_user(email: str, name: str, hashed_password: str, account_number: str, i
         account_number=account_number,
         ifsc_code=ifsc_code,
         hashed_password=hashed_password,
+        timezone=timezone or DEFAULT_TIMEZONE,
         disabled=False
     )
-    _users_db[email] = user
+    _save_user(user)
     return user
 
 
+def set_user_timezone(email: str, timezone: str) -> Optional[UserInDB]:
+    """Change a user's timezone"""
+    user = get_user(email)
+    if user is None:
+        return None
+    user = user.model_copy(update={"timezone": timezone})
+    _save_user(user)
+    return user
+
+
+def _save_user(user: UserInDB):
+    _users_db[user.email] = user
+    cache = get_cache()
+    if cache.shared:
+        cache.set(f"user:{user.email}", user.model_dump())
+
+
 def get_password_hash(password: str) -> str:
     """Hash a password"""
     return hash_password(password)
@@ -160,9 +195,14 @@ def get_password_hash(password: str) -> str:
 def get_user(email: str) -> Optional[UserInDB]:
     """Get user from database by email"""
     users_db = get_users_db()
-    if email in users_db:
+    # The shared copy wins: the user may have registered or changed settings through another worker
+    cache = get_cache()
+    cached = cache.get(f"user:{email}") if cache.shared else None
+    if cached is not None:
+        if email not in users_db or users_db[email].model_dump() != cached:
+            users_db[email] = UserInDB(**cached)
         return users_db[email]
-    return None
+    return users_db.get(email)
 
 
 def authenticate_user(email: str, password: str) -> Optional[UserInDB]:
@@ -187,35 +227,86 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
-    """Get current user from JWT token"""
-    credentials_exception = HTTPException(
+def create_stream_token(email: str, access_token: str) -> str:
+    """
+    Create a short-lived token that can only open a dashboard stream.
+    EventSource has to send it in the URL, where it may be logged, so it
+    expires quickly and is refused everywhere else. It carries a digest of
+    the login's access token so a reconnect replaces that login's stream.
+    """
+    return create_access_token(
+        {
+            "sub": email,
+            "scope": STREAM_SCOPE,
+            "sid": hashlib.sha1(access_token.encode('utf-8')).hexdigest()
+        },
+        expires_delta=timedelta(seconds=STREAM_TOKEN_EXPIRE_SECONDS)
+    )
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_token(token: str, scope: Optional[str]) -> dict:
+    """Claims of a valid token with the given scope (None for access tokens), or 401"""
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
     except JWTError:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+    if payload.get("sub") is None or payload.get("scope") != scope:
+        raise _credentials_exception()
+    return payload
+
+
+def _user_from_claims(payload: dict) -> User:
+    token_data = TokenData(email=payload["sub"])
     user = get_user(email=token_data.email)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return User(
         email=user.email,
         name=user.name,
         account_number=user.account_number,
         ifsc_code=user.ifsc_code,
+        tier=user.tier,
+        timezone=user.timezone,
         disabled=user.disabled
     )
 
 
+def get_user_from_token(token: str) -> User:
+    """Resolve a JWT access token to its user, raising 401 if it is invalid"""
+    return _user_from_claims(_decode_token(token, None))
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+    """Get current user from JWT token"""
+    return get_user_from_token(credentials.credentials)
+
+
+async def get_stream_session(token: Optional[str] = None) -> Tuple[User, str]:
+    """
+    Get the user and login session for a dashboard stream.
+    EventSource cannot set headers, so only a stream token is accepted, as ?token=
+    """
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    payload = _decode_token(token, STREAM_SCOPE)
+    user = _user_from_claims(payload)
+    if user.disabled:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user, payload.get("sid") or user.email
+
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active (non-disabled) user"""
     if current_user.disabled:
@@ -0,0 +1,288 @@
+"""
+VaultGuard Backtesting
+Walk-forward accuracy and latency backtest of the income forecasting methods
+
+Usage:
+    python backtest.py --accounts 40 --days 365 --processes 4
+    python backtest.py --ndjson transactions.ndjson --target-mape 25
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+from config import INCOME_FORECASTER_BACKEND
+from ml_models import (
+    FORECASTER_BACKENDS,
+    INCOME_QUANTILES,
+    IncomeFeatures,
+    IncomePredictor,
+    get_forecaster
+)
+
+
+# History-length buckets matching the cold-start thresholds in IncomePredictor.hybrid_weights
+HISTORY_BUCKETS = ((0, 30, '<30d'), (30, 90, '30-90d'), (90, None, '90d+'))
+
+
+def history_bucket(days_history: int) -> str:
+    for low, high, label in HISTORY_BUCKETS:
+        if days_history >= low and (high is None or days_history < high):
+            return label
+    return HISTORY_BUCKETS[-1][2]
+
+
+def pinball_loss(actual: float, predicted: np.ndarray, quantiles: Tuple[float, ...] = INCOME_QUANTILES) -> float:
+    """Mean pinball (quantile) loss over the quantiles; a point forecast is scored as every quantile"""
+    losses = [
+        max(q * (actual - value), (q - 1) * (actual - value))
+        for q, value in zip(quantiles, np.broadcast_to(predicted, len(quantiles)))
+    ]
+    return float(np.mean(losses))
+
+
+class _Totals:
+    """Error and timing sums for one method, mergeable across accounts and processes"""
+
+    def __init__(self):
+        self.forecasts = 0
+        self.abs_error = 0.0
+        self.error = 0.0
+        self.ape = 0.0
+        self.ape_count = 0
+        self.pinball = 0.0
+        self.fit_ms = 0.0
+        self.fits = 0
+        self.predict_ms = 0.0
+
+    def add_forecast(self, actual: float, point: float, band: Optional[np.ndarray], predict_ms: float):
+        self.forecasts += 1
+        self.abs_error += abs(point - actual)
+        self.error += point - actual
+        if actual > 0:
+            # Windows without income have no percentage error
+            self.ape += abs(point - actual) / actual
+            self.ape_count += 1
+        self.pinball += pinball_loss(actual, band if band is not None else np.array([point]))
+        self.predict_ms += predict_ms
+
+    def merge(self, other: '_Totals'):
+        for field, value in vars(other).items():
+            setattr(self, field, getattr(self, field) + value)
+
+    def row(self) -> Dict:
+        n = max(self.forecasts, 1)
+        return {
+            'forecasts': self.forecasts,
+            'mae': round(self.abs_error / n, 2),
+            'mape': round(100 * self.ape / self.ape_count, 2) if self.ape_count else None,
+            'pinball': round(self.pinball / n, 2),
+            'bias': round(self.error / n, 2),
+            'fit_ms': round(self.fit_ms / self.fits, 3) if self.fits else 0.0,
+            'predict_ms': round(self.predict_ms / n, 3),
+            # Refits amortized over the forecasts they served: the cost of one answer
+            'ms_per_forecast': round((self.fit_ms + self.predict_ms) / n, 3)
+        }
+
+
+def backtest_account(
+    daily_income: Dict,
+    horizon: int = 15,
+    step: int = 7,
+    refit_every: int = 7,
+    min_history: int = 14,
+    backends: Optional[List[str]] = None,
+    n_jobs: Optional[int] = None
+) -> Dict[Tuple[str, str], _Totals]:
+    """
+    Replay one account's income day by day. Every `step` days each method
+    forecasts the income of the next `horizon` days, scored against what actually
+    arrived. Models are refitted every `refit_every` days, growing the previous
+    fit where the backend supports it, and forecast from the latest history in
+    between - the way persisted models serve requests.
+
+    Methods: 'statistical' (mean run-rate), every backend as pure ML, and
+    'hybrid' - what /api/predictions serves: the blend of the default backend
+    and the run-rate with the hybrid_weights for the history length at that
+    point, haircut by the safety factor. Hybrid is charged the model's fit and
+    predict time only where its ML leg has weight.
+    n_jobs overrides the forest's thread count (run_backtest uses 1 in pool
+    workers, which already occupy every core).
+    Returns totals keyed by (method, history bucket).
+    """
+    backends = list(backends or FORECASTER_BACKENDS)
+    hybrid_backend = INCOME_FORECASTER_BACKEND
+    fitted_backends = backends if hybrid_backend in backends else backends + [hybrid_backend]
+
+    full = IncomeFeatures.from_daily(daily_income)
+    series = np.array(full.history)
+    totals: Dict[Tuple[str, str], _Totals] = {}
+    models: Dict[str, object] = {}
+
+    def record(method: str, bucket: str) -> _Totals:
+        return totals.setdefault((method, bucket), _Totals())
+
+    replay = IncomeFeatures()
+    for day_index in range(len(series) - horizon):
+        replay.add(full.dates[day_index], series[day_index])
+        days_history = day_index + 1
+        if days_history < min_history:
+            continue
+        bucket = history_bucket(days_history)
+        weight_ml, weight_stat, _, _ = IncomePredictor.hybrid_weights(days_history)
+
+        if (days_history - min_history) % refit_every == 0:
+            frame = replay.frame()
+            for backend in fitted_backends:
+                forecaster = get_forecaster(backend)
+                if n_jobs is not None and hasattr(forecaster, 'n_jobs'):
+                    forecaster.n_jobs = n_jobs
+                started = time.perf_counter()
+                models[backend] = forecaster.fit(frame, models.get(backend))
+                elapsed = (time.perf_counter() - started) * 1000
+                charged = [backend] if backend in backends else []
+                if backend == hybrid_backend and weight_ml > 0:
+                    charged.append('hybrid')
+                for method in charged:
+                    record(method, bucket).fit_ms += elapsed
+                    record(method, bucket).fits += 1
+
+        if (days_history - min_history) % step:
+            continue
+        actual = float(series[day_index + 1:day_index + 1 + horizon].sum())
+
+        started = time.perf_counter()
+        statistical = replay.mean * horizon
+        record('statistical', bucket).add_forecast(actual, statistical, None, (time.perf_counter() - started) * 1000)
+
+        ml_totals: Dict[str, Tuple[float, float]] = {}
+        for backend in fitted_backends:
+            started = time.perf_counter()
+            daily, band = models[backend].forecast_with_quantiles(
+                replay.history, horizon, last_date=replay.last_date
+            )
+            predict_ms = (time.perf_counter() - started) * 1000
+            ml_totals[backend] = (float(daily.sum()), predict_ms)
+            if backend in backends:
+                record(backend, bucket).add_forecast(actual, ml_totals[backend][0], band, predict_ms)
+
+        ml_total, predict_ms = ml_totals[hybrid_backend]
+        hybrid = (ml_total * weight_ml + statistical * weight_stat) * IncomePredictor.safety_factor(replay.std)
+        record('hybrid', bucket).add_forecast(actual, hybrid, None, predict_ms if weight_ml > 0 else 0.0)
+
+    return totals
+
+
+def _backtest_worker(args: Tuple[str, Dict, Dict]) -> Dict[Tuple[str, str], _Totals]:
+    _, daily_income, options = args
+    return backtest_account(daily_income, **options)
+
+
+def run_backtest(
+    histories: Iterable[Tuple[str, Dict]],
+    processes: Optional[int] = None,
+    **options
+) -> List[Dict]:
+    """
+    Backtest many accounts, one per task on a multiprocessing pool
+    (processes=1 runs inline). `histories` yields (account, daily income)
+    pairs; options are passed to backtest_account. Returns one summary row per
+    method, pooled over all accounts, plus one per method and history bucket.
+    """
+    tasks = ((account, daily_income, options) for account, daily_income in histories)
+    merged: Dict[Tuple[str, str], _Totals] = {}
+
+    def merge(result: Dict[Tuple[str, str], _Totals]):
+        for (method, bucket), totals in result.items():
+            for key in ((method, 'all'), (method, bucket)):
+                merged.setdefault(key, _Totals()).merge(totals)
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        for task in tasks:
+            merge(_backtest_worker(task))
+    else:
+        # One forest thread per worker; the pool already spreads over the cores
+        options.setdefault('n_jobs', 1)
+        with multiprocessing.Pool(processes) as pool:
+            for result in pool.imap_unordered(_backtest_worker, tasks):
+                merge(result)
+
+    bucket_order = ['all'] + [label for _, _, label in HISTORY_BUCKETS]
+    rows = [{'method': method, 'history': bucket, **totals.row()} for (method, bucket), totals in merged.items()]
+    return sorted(rows, key=lambda row: (bucket_order.index(row['history']), row['mae']))
+
+
+def cheapest_method(report: List[Dict], target_mape: float, history: str = 'all') -> Optional[Dict]:
+    """The lowest-latency method whose MAPE meets the target (None if none does)"""
+    meeting = [
+        row for row in report
+        if row['history'] == history and row['mape'] is not None and row['mape'] <= target_mape
+    ]
+    return min(meeting, key=lambda row: row['ms_per_forecast']) if meeting else None
+
+
+def histories_from_ndjson(path: str) -> List[Tuple[str, Dict]]:
+    """Daily income per account from an export of synthetic_data.py (or any rows in that format)"""
+    daily: Dict[str, Dict] = {}
+    with open(path, 'rb') as f:
+        for line in f:
+            record = orjson.loads(line)
+            if record['type'] != 'deposit':
+                continue
+            day = datetime.strptime(record['timestamp'][:10], '%Y-%m-%d').date()
+            account = daily.setdefault(record['account_number'], {})
+            account[day] = account.get(day, 0) + float(record['amount'])
+    return list(daily.items())
+
+
+def synthetic_histories(n_accounts: int, seed: int, days: int) -> Iterable[Tuple[str, Dict]]:
+    from synthetic_data import generate_accounts
+    for account in generate_accounts(n_accounts, seed=seed, days=days):
+        yield account.account_number, IncomePredictor.aggregate_daily_income(account.rows())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the income forecasting methods")
+    parser.add_argument("--ndjson", help="transactions exported by synthetic_data.py (default: generate)")
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--horizon", type=int, default=15, help="days ahead each forecast covers")
+    parser.add_argument("--step", type=int, default=7, help="days between forecasts (1 = every day)")
+    parser.add_argument("--refit-every", type=int, default=7)
+    parser.add_argument("--backends", help="comma separated (default: all)")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--target-mape", type=float, default=None)
+    args = parser.parse_args()
+
+    histories = (
+        histories_from_ndjson(args.ndjson) if args.ndjson
+        else synthetic_histories(args.accounts, args.seed, args.days)
+    )
+    started = time.perf_counter()
+    report = run_backtest(
+        histories,
+        processes=args.processes,
+        horizon=args.horizon,
+        step=args.step,
+        refit_every=args.refit_every,
+        backends=args.backends.split(",") if args.backends else None
+    )
+
+    columns = ['method', 'history', 'forecasts', 'mae', 'mape', 'pinball', 'bias', 'fit_ms', 'predict_ms', 'ms_per_forecast']
+    print("".join(f"{column:>16}" for column in columns))
+    for row in report:
+        print("".join(f"{str(row[column]):>16}" for column in columns))
+    print(f"Backtest took {time.perf_counter() - started:.1f}s")
+
+    if args.target_mape is not None:
+        for bucket in ['all'] + [label for _, _, label in HISTORY_BUCKETS]:
+            choice = cheapest_method(report, args.target_mape, bucket)
+            print(f"Cheapest method within {args.target_mape}% MAPE for {bucket} history: "
+                  f"{choice['method'] if choice else 'none'}")
@@ -1,11 +1,101 @@
 """
 Bank API Service - Handles communication with the simulated bank API
 """
+import asyncio
+import time
 import httpx
-from typing import List, Dict, Optional
+from collections import OrderedDict, deque
+from typing import Any, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import random
-from config import BANK_API_URL, DEFAULT_ACCOUNT_NUMBER, DEFAULT_IFSC_CODE
+from config import (
+    BANK_API_URL,
+    DEFAULT_ACCOUNT_NUMBER,
+    DEFAULT_IFSC_CODE,
+    BANK_SNAPSHOT_DEADLINE,
+    BANK_BULK_BATCH_SIZE,
+    BANK_BULK_CONCURRENCY,
+    BANK_CONNECT_TIMEOUT,
+    BANK_READ_TIMEOUT,
+    BANK_WRITE_TIMEOUT,
+    BANK_BULK_TIMEOUT,
+    BANK_RETRY_ATTEMPTS,
+    BANK_RETRY_BACKOFF,
+    BANK_BREAKER_FAILURE_RATE,
+    BANK_BREAKER_WINDOW,
+    BANK_BREAKER_MIN_CALLS,
+    BANK_BREAKER_RESET_SECONDS,
+    BANK_STALE_CACHE_SIZE
+)
+from deadline import DeadlineExceeded, bound, bound_httpx, check, expired
+
+
+class BankUnavailableError(Exception):
+    """Raised when the Bank API cannot be reached (or the circuit is open) and no fallback exists"""
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker over a sliding window of recent calls.
+    Opens when the failure rate trips, fails fast for the cooldown, then lets a
+    single trial call through (half-open) to decide whether to close again.
+    """
+    
+    def __init__(
+        self,
+        failure_rate: float = BANK_BREAKER_FAILURE_RATE,
+        window: int = BANK_BREAKER_WINDOW,
+        min_calls: int = BANK_BREAKER_MIN_CALLS,
+        reset_timeout: float = BANK_BREAKER_RESET_SECONDS
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self._results = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+    
+    def allow(self) -> bool:
+        """Whether a call may be attempted right now"""
+        if self.state == 'open':
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = 'half_open'
+            self._trial_in_flight = False
+        if self.state == 'half_open':
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+    
+    def record_success(self):
+        if self.state == 'half_open':
+            self.state = 'closed'
+            self._results.clear()
+        self._results.append(True)
+    
+    def record_failure(self):
+        if self.state == 'half_open':
+            self._trip()
+            return
+        self._results.append(False)
+        failures = self._results.count(False)
+        if len(self._results) >= self.min_calls and failures / len(self._results) >= self.failure_rate:
+            self._trip()
+    
+    def release_trial(self):
+        """End a half-open trial that settled nothing: back to open, due for another trial (no-op once settled)"""
+        if self.state == 'half_open' and self._trial_in_flight:
+            # _opened_at is left alone, so the cooldown has already passed
+            self.state = 'open'
+            self._trial_in_flight = False
+    
+    def _trip(self):
+        self.state = 'open'
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+        self._results.clear()
 
 
 class BankAPIService:
@@ -13,52 +103,166 @@ class BankAPIService:
     
     def __init__(self, base_url: str = BANK_API_URL):
         self.base_url = base_url
-        self.timeout = httpx.Timeout(30.0)
+        self.read_timeout = httpx.Timeout(BANK_READ_TIMEOUT, connect=BANK_CONNECT_TIMEOUT)
+        self.write_timeout = httpx.Timeout(BANK_WRITE_TIMEOUT, connect=BANK_CONNECT_TIMEOUT)
+        self.bulk_timeout = httpx.Timeout(BANK_BULK_TIMEOUT, connect=BANK_CONNECT_TIMEOUT)
+        self.breaker = CircuitBreaker()
+        # Last-known-good reads, served (marked stale) while the bank is unavailable
+        self._last_good: OrderedDict = OrderedDict()
+    
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        idempotent: bool = False,
+        timeout: Optional[httpx.Timeout] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request through the circuit breaker.
+        Idempotent requests are retried with jittered exponential backoff on
+        transport errors and 5xx responses; writes are attempted once.
+        Timeouts and backoff never outlast the current request's deadline.
+        """
+        if timeout is None:
+            timeout = self.read_timeout if idempotent else self.write_timeout
+        attempts = max(1, BANK_RETRY_ATTEMPTS) if idempotent else 1
+        
+        for attempt in range(attempts):
+            check()
+            if not self.breaker.allow():
+                raise BankUnavailableError("Bank API circuit is open")
+            trial = self.breaker.state == 'half_open'
+            attempt_timeout = bound_httpx(timeout)
+            try:
+                try:
+                    if client is not None:
+                        response = await client.request(
+                            method, f"{self.base_url}{path}", timeout=attempt_timeout, **kwargs
+                        )
+                    else:
+                        async with httpx.AsyncClient(timeout=attempt_timeout) as own_client:
+                            response = await own_client.request(method, f"{self.base_url}{path}", **kwargs)
+                except httpx.TransportError as e:
+                    if expired():
+                        # Our budget ran out, not the bank's patience: not a bank failure
+                        raise DeadlineExceeded("Request deadline exceeded") from e
+                    self.breaker.record_failure()
+                    if attempt == attempts - 1:
+                        raise BankUnavailableError(f"Bank API request failed: {e}") from e
+                else:
+                    if response.status_code < 500:
+                        self.breaker.record_success()
+                        return response
+                    self.breaker.record_failure()
+                    if attempt == attempts - 1:
+                        return response
+            finally:
+                # A trial that ended any other way (deadline, cancellation, a
+                # non-transport error) settled nothing; free it for the next caller
+                if trial:
+                    self.breaker.release_trial()
+            await asyncio.sleep(bound(random.uniform(0, BANK_RETRY_BACKOFF * (2 ** attempt))))
+    
+    async def _read_with_fallback(self, key: Tuple, fetch) -> Tuple[Any, bool]:
+        """Run a read, remembering the result; on failure serve the last good value marked stale"""
+        try:
+            value = await fetch()
+        except (BankUnavailableError, httpx.HTTPStatusError):
+            if key in self._last_good:
+                return self._last_good[key], True
+            raise
+        
+        self._last_good[key] = value
+        self._last_good.move_to_end(key)
+        while len(self._last_good) > BANK_STALE_CACHE_SIZE:
+            self._last_good.popitem(last=False)
+        return value, False
     
     async def health_check(self) -> Dict:
         """Check if Bank API is healthy"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(f"{self.base_url}/health")
-            return response.json()
+        response = await self._request("GET", "/health", idempotent=True)
+        return response.json()
     
     async def get_all_users(self) -> Dict:
         """Get all users from the bank"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(f"{self.base_url}/getallusers")
-            return response.json()
+        response = await self._request("GET", "/getallusers", idempotent=True)
+        return response.json()
+    
+    async def _fetch_user(self, account_number: str, ifsc_code: str) -> Optional[Dict]:
+        response = await self._request("GET", f"/getuser/{account_number}/{ifsc_code}", idempotent=True)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+    
+    async def get_user_with_status(self, account_number: str, ifsc_code: str) -> Tuple[Optional[Dict], bool]:
+        """Get specific user details and whether they came from the stale fallback"""
+        return await self._read_with_fallback(
+            ('user', account_number, ifsc_code),
+            lambda: self._fetch_user(account_number, ifsc_code)
+        )
     
     async def get_user(self, account_number: str, ifsc_code: str) -> Optional[Dict]:
         """Get specific user details"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(f"{self.base_url}/getuser/{account_number}/{ifsc_code}")
-            if response.status_code == 404:
-                return None
-            response.raise_for_status()
-            return response.json()
+        user, _ = await self.get_user_with_status(account_number, ifsc_code)
+        return user
     
     async def account_exists(self, account_number: str, ifsc_code: str = "VAULT001") -> bool:
         """Check if an account number already exists in the bank"""
-        user = await self.get_user(account_number, ifsc_code)
+        # Never answer from the stale fallback: a missed account would be handed out twice
+        user = await self._fetch_user(account_number, ifsc_code)
         return user is not None
     
     async def create_user(self, account_number: str, ifsc_code: str, initial_balance: float = 0) -> Dict:
         """Create a new user"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/adduser/{account_number}/{ifsc_code}",
-                json={"initial_balance": initial_balance}
-            )
-            # Don't raise for status - handle 400 (user exists) gracefully
-            if response.status_code == 400:
-                return {"message": "User may already exist", "status": "exists"}
-            response.raise_for_status()
-            return response.json()
+        response = await self._request(
+            "POST",
+            f"/adduser/{account_number}/{ifsc_code}",
+            json={"initial_balance": initial_balance}
+        )
+        # Don't raise for status - handle 400 (user exists) gracefully
+        if response.status_code == 400:
+            return {"message": "User may already exist", "status": "exists"}
+        response.raise_for_status()
+        return response.json()
     
     async def delete_user(self, account_number: str, ifsc_code: str) -> Dict:
         """Delete a user"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.delete(f"{self.base_url}/deleteuser/{account_number}/{ifsc_code}")
-            return response.json()
+        response = await self._request("DELETE", f"/deleteuser/{account_number}/{ifsc_code}")
+        return response.json()
+    
+    async def _fetch_transactions(
+        self,
+        account_number: str,
+        ifsc_code: str,
+        filter_type: str,
+        filter_value: Optional[str]
+    ) -> List[Dict]:
+        params = {"value": filter_value} if filter_value else {}
+        response = await self._request(
+            "GET",
+            f"/gettransaction/{account_number}/{ifsc_code}/{filter_type}",
+            idempotent=True,
+            params=params
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data.get('data', [])
+    
+    async def get_transactions_with_status(
+        self,
+        account_number: str,
+        ifsc_code: str,
+        filter_type: str = "alltime",
+        filter_value: Optional[str] = None
+    ) -> Tuple[List[Dict], bool]:
+        """Get transactions for a user and whether they came from the stale fallback"""
+        return await self._read_with_fallback(
+            ('transactions', account_number, ifsc_code, filter_type, filter_value),
+            lambda: self._fetch_transactions(account_number, ifsc_code, filter_type, filter_value)
+        )
     
     async def get_transactions(
         self,
@@ -68,13 +272,46 @@ class BankAPIService:
         filter_value: Optional[str] = None
     ) -> List[Dict]:
         """Get transactions for a user"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            url = f"{self.base_url}/gettransaction/{account_number}/{ifsc_code}/{filter_type}"
-            params = {"value": filter_value} if filter_value else {}
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return data.get('data', [])
+        transactions, _ = await self.get_transactions_with_status(
+            account_number, ifsc_code, filter_type, filter_value
+        )
+        return transactions
+    
+    async def fetch_account_snapshot(
+        self,
+        account_number: str,
+        ifsc_code: str,
+        deadline: float = BANK_SNAPSHOT_DEADLINE
+    ) -> Dict:
+        """
+        Fetch account details and all transactions concurrently.
+        Both requests share one deadline (cut short by the request's own); if either fails or it passes,
+        the other is cancelled and the error is raised (asyncio.TimeoutError on deadline).
+        While the bank is unavailable the last-known-good data is returned with stale=True.
+        """
+        user_task = asyncio.ensure_future(self.get_user_with_status(account_number, ifsc_code))
+        transactions_task = asyncio.ensure_future(
+            self.get_transactions_with_status(account_number, ifsc_code, "alltime")
+        )
+        tasks = [user_task, transactions_task]
+        
+        try:
+            (user, user_stale), (transactions, transactions_stale) = await asyncio.wait_for(
+                asyncio.gather(*tasks), timeout=bound(deadline)
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            # Reap the cancelled tasks so their errors are not reported as unretrieved
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        
+        return {
+            'user': user,
+            'balance': float(user['balance']) if user else 0,
+            'transactions': transactions,
+            'stale': user_stale or transactions_stale
+        }
     
     async def deposit(
         self,
@@ -86,14 +323,14 @@ class BankAPIService:
         """Make a deposit"""
         if amount <= 0:
             raise ValueError("Deposit amount must be a positive number")
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            json_data = {"timestamp": timestamp} if timestamp else {}
-            response = await client.post(
-                f"{self.base_url}/deposit/{account_number}/{ifsc_code}/{amount}",
-                json=json_data
-            )
-            response.raise_for_status()
-            return response.json()
+        json_data = {"timestamp": timestamp} if timestamp else {}
+        response = await self._request(
+            "POST",
+            f"/deposit/{account_number}/{ifsc_code}/{amount}",
+            json=json_data
+        )
+        response.raise_for_status()
+        return response.json()
     
     async def withdraw(
         self,
@@ -105,14 +342,95 @@ class BankAPIService:
         """Make a withdrawal"""
         if amount <= 0:
             raise ValueError("Withdrawal amount must be a positive number")
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            json_data = {"timestamp": timestamp} if timestamp else {}
-            response = await client.post(
-                f"{self.base_url}/withdraw/{account_number}/{ifsc_code}/{amount}",
-                json=json_data
-            )
-            response.raise_for_status()
-            return response.json()
+        json_data = {"timestamp": timestamp} if timestamp else {}
+        response = await self._request(
+            "POST",
+            f"/withdraw/{account_number}/{ifsc_code}/{amount}",
+            json=json_data
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    async def bulk_transactions(
+        self,
+        transactions: List[Dict],
+        batch_size: int = BANK_BULK_BATCH_SIZE,
+        concurrency: int = BANK_BULK_CONCURRENCY
+    ) -> Dict:
+        """
+        Ingest many deposits/withdrawals through the bank's batch endpoint.
+        
+        Each row needs account_number, ifsc_code, type ('deposit' or 'withdraw'),
+        amount and optionally timestamp. Rows of one account are sent in input order,
+        one batch at a time; different accounts are written concurrently, with at most
+        `concurrency` batches in flight. If a batch request fails, the account's
+        remaining rows are skipped so later withdrawals never run out of order.
+        
+        Returns counts plus a list of failures whose index refers to the input list.
+        """
+        by_account: Dict[tuple, List[int]] = {}
+        failures = []
+        
+        for index, tx in enumerate(transactions):
+            if tx.get('type') not in ('deposit', 'withdraw'):
+                failures.append({'index': index, 'error': 'Unknown transaction type'})
+            elif float(tx.get('amount', 0)) <= 0:
+                failures.append({'index': index, 'error': 'Amount must be a positive number'})
+            else:
+                key = (tx['account_number'], tx['ifsc_code'])
+                by_account.setdefault(key, []).append(index)
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        succeeded = 0
+        
+        async def ingest_account(client: httpx.AsyncClient, account_number: str, ifsc_code: str, indices: List[int]):
+            nonlocal succeeded
+            for start in range(0, len(indices), batch_size):
+                chunk = indices[start:start + batch_size]
+                payload = [
+                    {
+                        'type': transactions[i]['type'],
+                        'amount': float(transactions[i]['amount']),
+                        'timestamp': transactions[i].get('timestamp')
+                    }
+                    for i in chunk
+                ]
+                try:
+                    async with semaphore:
+                        response = await self._request(
+                            "POST",
+                            f"/batch/{account_number}/{ifsc_code}",
+                            timeout=self.bulk_timeout,
+                            client=client,
+                            json={'transactions': payload}
+                        )
+                    if response.status_code == 400:
+                        raise ValueError(response.json().get('error', 'Batch rejected'))
+                    response.raise_for_status()
+                except Exception as e:
+                    for i in indices[start:]:
+                        failures.append({'index': i, 'error': f"Batch failed: {e}"})
+                    return
+                
+                for result in response.json().get('results', []):
+                    if result['status'] == 'ok':
+                        succeeded += 1
+                    else:
+                        failures.append({'index': chunk[result['index']], 'error': result.get('error')})
+        
+        async with httpx.AsyncClient(timeout=self.bulk_timeout) as client:
+            await asyncio.gather(*[
+                ingest_account(client, account_number, ifsc_code, indices)
+                for (account_number, ifsc_code), indices in by_account.items()
+            ])
+        
+        failures.sort(key=lambda f: f['index'])
+        return {
+            'submitted': len(transactions),
+            'succeeded': succeeded,
+            'failed': len(failures),
+            'failures': failures
+        }
 
 
 async def setup_demo_user() -> Dict:
@@ -128,9 +446,6 @@ async def setup_demo_user() -> Dict:
         existing_user = await service.get_user(account, ifsc)
         if existing_user:
             await service.delete_user(account, ifsc)
-            # Wait a bit for the delete to complete
-            import asyncio
-            await asyncio.sleep(0.5)
     except Exception as e:
         print(f"Error checking/deleting existing user: {e}")
     
@@ -243,24 +558,30 @@ async def setup_demo_user() -> Dict:
     all_transactions = income_transactions + expense_transactions
     all_transactions.sort(key=lambda x: x['date'])
     
-    # Execute transactions in order
+    # Execute transactions in order through the batch endpoint
     running_balance = 0
+    bulk_rows = []
     
     for tx in all_transactions[:200]:  # Limit to 200 transactions
-        try:
-            if tx['type'] == 'deposit':
-                await service.deposit(account, ifsc, tx['amount'], tx['date'])
-                running_balance += tx['amount']
-                transactions_created += 1
-            else:
-                # Only withdraw if we have enough balance
-                if running_balance >= tx['amount']:
-                    await service.withdraw(account, ifsc, tx['amount'], tx['date'])
-                    running_balance -= tx['amount']
-                    transactions_created += 1
-        except Exception as e:
-            print(f"Transaction error: {e}")
+        if tx['type'] == 'deposit':
+            running_balance += tx['amount']
+        elif running_balance >= tx['amount']:
+            # Only withdraw if we have enough balance
+            running_balance -= tx['amount']
+        else:
             continue
+        bulk_rows.append({
+            'account_number': account,
+            'ifsc_code': ifsc,
+            'type': tx['type'],
+            'amount': tx['amount'],
+            'timestamp': tx['date']
+        })
+    
+    result = await service.bulk_transactions(bulk_rows)
+    transactions_created = result['succeeded']
+    for failure in result['failures']:
+        print(f"Transaction error: {failure['error']}")
     
     # Final balance adjustment to reach exactly 1000
     final_user = await service.get_user(account, ifsc)
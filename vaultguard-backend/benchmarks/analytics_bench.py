@@ -0,0 +1,80 @@
+"""
+Analytics benchmark on a long synthetic history.
+
+Times the per-row category and weekday rollups the analytics endpoints used
+to run against ExpenseColumns: the one-off column build, then the
+category and weekday x category queries over a date range. Both sides
+include a few manually added expenses, and their totals must agree.
+
+Usage (from vaultguard-backend):
+    python benchmarks/analytics_bench.py [days]  (default ~100k transactions)
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from analytics import CATEGORIES, WEEKDAYS, ExpenseColumns
+from synthetic_data import generate_accounts
+
+
+def per_row(transactions, manual, account_number, start, end):
+    """The old approach: parse and bucket every expense in Python"""
+    totals = {category: 0.0 for category in CATEGORIES}
+    weekly = {day: {category: 0.0 for category in CATEGORIES} for day in WEEKDAYS}
+    rows = []
+    for tx in transactions:
+        if tx.get('sender_account') != account_number and tx.get('receiver_account') != 'CASH_WITHDRAWAL':
+            continue
+        amount = float(tx['amount'])
+        category = "daily" if amount < 500 else "irregular" if amount < 3000 else "regular"
+        rows.append((tx['timestamp'][:10], category, amount))
+    rows.extend((expense['date'], expense['category'], expense['amount']) for expense in manual)
+    for day, category, amount in rows:
+        day = datetime.strptime(day, '%Y-%m-%d').date()
+        if not start <= day <= end:
+            continue
+        totals[category] += amount
+        weekly[WEEKDAYS[day.weekday()]][category] += amount
+    return totals, weekly
+
+
+def main(days: int):
+    account = next(generate_accounts(1, seed=3, days=days))
+    transactions = account.rows()
+    end = datetime.strptime(transactions[-1]['timestamp'][:10], '%Y-%m-%d').date()
+    start = end - timedelta(days=365)
+    print(f"{len(transactions)} transactions over {days} days, querying the last year")
+
+    # Amounts the bank bands would call daily, filed under the user's own categories (one out of range)
+    manual = [
+        {'date': (end - timedelta(days=offset)).isoformat(), 'category': category, 'amount': 150.0}
+        for offset, category in ((0, 'regular'), (3, 'irregular'), (400, 'daily'))
+    ]
+
+    started = time.perf_counter()
+    expected_totals, expected_weekly = per_row(transactions, manual, account.account_number, start, end)
+    print(f"per-row rollups    {(time.perf_counter() - started) * 1000:>9.2f} ms")
+
+    started = time.perf_counter()
+    columns = ExpenseColumns.from_transactions(transactions, account.account_number)
+    print(f"column build       {(time.perf_counter() - started) * 1000:>9.2f} ms (once per account snapshot)")
+    manual_columns = ExpenseColumns.from_expenses(manual)
+
+    started = time.perf_counter()
+    for _ in range(100):
+        totals = columns.category_totals(start, end)[0] + manual_columns.category_totals(start, end)[0]
+        weekly = columns.weekday_by_category(start, end) + manual_columns.weekday_by_category(start, end)
+    print(f"vectorized queries {(time.perf_counter() - started) * 10:>9.3f} ms")
+
+    assert np.allclose(totals, [expected_totals[category] for category in CATEGORIES])
+    assert np.allclose(weekly, [[expected_weekly[day][category] for category in CATEGORIES] for day in WEEKDAYS])
+    print("category and weekday totals match, manual expenses included")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 25000)
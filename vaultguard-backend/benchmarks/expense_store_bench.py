@@ -0,0 +1,97 @@
+"""
+Memory benchmark for manually added expenses.
+
+Compares the old dict of pydantic Expense objects per user against
+ExpenseStore, measuring allocated bytes per expense with tracemalloc, and
+times a recent-expenses read on each.
+
+Usage (from vaultguard-backend):
+    python benchmarks/expense_store_bench.py [users] [expenses_per_user]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from expense_store import ExpenseStore
+from main import Expense
+
+NAMES = ["Coffee", "Lunch", "Groceries", "Fuel", "Rent", "Internet Bill", "Movie", "Medicine"]
+CATEGORIES = ["daily", "irregular", "regular"]
+
+
+def make_rows(users: int, per_user: int):
+    rng = random.Random(0)
+    today = date.today()
+    for user in range(users):
+        for _ in range(per_user):
+            yield (
+                f"{7000000000 + user}",
+                rng.choice(NAMES),
+                round(rng.uniform(50, 5000), 2),
+                rng.choice(CATEGORIES),
+                today - timedelta(days=rng.randrange(365))
+            )
+
+
+def fill_dicts(rows):
+    db = {}
+    for i, (account, name, amount, category, day) in enumerate(rows):
+        expense_id = str(time.time() + i)
+        db.setdefault(f"{account}_expenses", {})[expense_id] = Expense(
+            id=expense_id, name=name, amount=amount, category=category, date=day.isoformat()
+        )
+    return db
+
+
+def fill_store(rows):
+    store = ExpenseStore(max_per_user=10 ** 9, max_accounts=10 ** 9)
+    for account, name, amount, category, day in rows:
+        store.add(account, name, amount, category, day)
+    return store
+
+
+def measure(fill, rows):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    container = fill(rows)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return container, after - before
+
+
+def main(users: int, per_user: int):
+    rows = list(make_rows(users, per_user))
+    total = len(rows)
+    account = rows[0][0]
+
+    db, dict_bytes = measure(fill_dicts, rows)
+    store, store_bytes = measure(fill_store, rows)
+
+    started = time.perf_counter()
+    for _ in range(100):
+        # The old read: every stored expense, sorted, then the newest 50
+        sorted(db[f"{account}_expenses"].values(), key=lambda x: x.date, reverse=True)[:50]
+    dict_ms = (time.perf_counter() - started) * 10
+
+    started = time.perf_counter()
+    for _ in range(100):
+        store.recent(account, limit=50)
+    store_ms = (time.perf_counter() - started) * 10
+
+    print(f"{total} expenses for {users} users")
+    print(f"{'':<14}{'bytes/expense':>16}{'recent 50 ms':>14}")
+    print(f"{'pydantic dict':<14}{dict_bytes / total:>16.1f}{dict_ms:>14.3f}")
+    print(f"{'ExpenseStore':<14}{store_bytes / total:>16.1f}{store_ms:>14.3f}")
+    print(f"ExpenseStore.stats(): {store.stats()}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    )
@@ -0,0 +1,63 @@
+"""
+Prediction benchmark on synthetic production-scale histories.
+
+Serves generated accounts from FakeBankAPIService and times the snapshot fetch,
+daily aggregation and full prediction for each one.
+
+Usage (from vaultguard-backend):
+    python benchmarks/prediction_bench.py [accounts] [days]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from ml_models import VaultGuardPredictor
+from synthetic_data import FakeBankAPIService, generate_accounts
+
+
+def report(name: str, timings_ms):
+    timings = np.array(timings_ms)
+    print(f"{name:<14}{np.median(timings):>10.2f}{np.percentile(timings, 95):>10.2f}{timings.max():>10.2f}")
+
+
+async def main(n_accounts: int, days: int):
+    started = time.perf_counter()
+    accounts = list(generate_accounts(n_accounts, seed=1, days=days))
+    rows = sum(len(account) for account in accounts)
+    print(f"Generated {rows} transactions for {n_accounts} accounts in {time.perf_counter() - started:.2f}s")
+
+    bank = FakeBankAPIService(accounts)
+    predictor = VaultGuardPredictor()
+    fetch, aggregate, predict = [], [], []
+
+    for account in accounts:
+        t0 = time.perf_counter()
+        snapshot = await bank.fetch_account_snapshot(account.account_number, account.ifsc_code)
+        t1 = time.perf_counter()
+        daily_income = predictor.income_predictor.aggregate_daily_income(snapshot['transactions'])
+        daily_expenses = predictor.expense_forecaster.aggregate_daily_expenses(
+            snapshot['transactions'], account.account_number
+        )
+        t2 = time.perf_counter()
+        predictor.predict_from_aggregates(daily_income, daily_expenses, snapshot['balance'], days_left=15)
+        t3 = time.perf_counter()
+        fetch.append((t1 - t0) * 1000)
+        aggregate.append((t2 - t1) * 1000)
+        predict.append((t3 - t2) * 1000)
+
+    print(f"{'stage':<14}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    report("fetch", fetch)
+    report("aggregate", aggregate)
+    report("predict", predict)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    ))
@@ -0,0 +1,87 @@
+"""
+Serialization benchmark for large transaction and expense responses.
+
+Compares FastAPI's default path (jsonable_encoder + stdlib json, with response
+model validation for expenses) against the orjson paths the API now uses.
+
+Usage (from vaultguard-backend):
+    python benchmarks/serialization_bench.py [rows ...]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from main import Expense, transaction_columns
+
+ACCOUNT = "1234567890"
+
+
+def make_transactions(rows: int) -> List[dict]:
+    start = datetime(2025, 1, 1)
+    transactions = []
+    for i in range(rows):
+        deposit = i % 3 == 0
+        transactions.append({
+            'id': i + 1,
+            'sender_account': 'EXTERNAL_DEPOSIT' if deposit else ACCOUNT,
+            'receiver_account': ACCOUNT if deposit else 'CASH_WITHDRAWAL',
+            'amount': f"{(i * 37) % 9000 + 50:.2f}",
+            'timestamp': (start + timedelta(minutes=17 * i)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        })
+    return transactions
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    """Fastest of `repeat` runs, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main(sizes: List[int]):
+    expenses_adapter = TypeAdapter(List[Expense])
+    print(f"{'payload':<34}{'rows':>8}{'default ms':>12}{'orjson ms':>12}{'speedup':>9}")
+
+    for rows in sizes:
+        transactions = make_transactions(rows)
+        payload = {"transactions": transactions, "count": rows}
+
+        default = best_of(lambda: JSONResponse(jsonable_encoder(payload)))
+        fast = best_of(lambda: ORJSONResponse(payload))
+        columnar = best_of(lambda: ORJSONResponse({"columns": transaction_columns(transactions), "count": rows}))
+        print(f"{'/api/transactions (rows)':<34}{rows:>8}{default:>12.2f}{fast:>12.2f}{default / fast:>8.1f}x")
+        print(f"{'/api/transactions (columnar)':<34}{rows:>8}{default:>12.2f}{columnar:>12.2f}{default / columnar:>8.1f}x")
+
+        rows_data = [
+            {'id': str(tx['id']), 'name': 'Expense', 'amount': float(tx['amount']),
+             'category': 'daily', 'date': tx['timestamp'][:10]}
+            for tx in transactions
+        ]
+
+        def default_expenses():
+            # Validated on construction, then again against response_model, then encoded
+            expenses = [Expense(**row) for row in rows_data]
+            JSONResponse(jsonable_encoder(expenses_adapter.validate_python(expenses)))
+
+        def fast_expenses():
+            expenses = [Expense.model_construct(**row) for row in rows_data]
+            ORJSONResponse([exp.model_dump() for exp in expenses])
+
+        default = best_of(default_expenses)
+        fast = best_of(fast_expenses)
+        print(f"{'/api/expenses':<34}{rows:>8}{default:>12.2f}{fast:>12.2f}{default / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000])
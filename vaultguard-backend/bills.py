@@ -0,0 +1,285 @@
+"""
+VaultGuard Bills
+Recurring bill registry, due-date scheduler and pluggable alert notifiers
+"""
+import asyncio
+import calendar
+import heapq
+import itertools
+import uuid
+from collections import deque
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from config import BILL_ALERT_DAYS, BILL_ALERT_HOUR, BILL_NOTIFIER, DEFAULT_TIMEZONE
+from horizon import resolve_timezone
+
+
+class BillCreate(BaseModel):
+    name: str
+    amount: float = Field(..., gt=0, description="Amount must be a positive number")
+    frequency: Literal["weekly", "monthly", "yearly"] = "monthly"
+    due_date: str  # "YYYY-MM-DD" of the first (or any) occurrence
+
+
+class Bill(BillCreate):
+    id: str
+
+
+class BillAlert(BaseModel):
+    account_number: str
+    bill_id: str
+    name: str
+    amount: float
+    due_date: str
+    days_until_due: int
+
+
+def _add_months(anchor: date, months: int) -> date:
+    """Same day of month `months` later, clamped to the month's last day"""
+    month_index = anchor.month - 1 + months
+    year, month = anchor.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(anchor.day, calendar.monthrange(year, month)[1]))
+
+
+def occurrences(bill: Bill, start: date) -> Iterator[date]:
+    """Due dates of a bill on or after `start`, in order"""
+    anchor = datetime.strptime(bill.due_date, '%Y-%m-%d').date()
+    if bill.frequency == "weekly":
+        if anchor < start:
+            anchor += timedelta(days=-(-(start - anchor).days // 7) * 7)
+        while True:
+            yield anchor
+            anchor += timedelta(days=7)
+
+    step = 1 if bill.frequency == "monthly" else 12
+    # Always step from the anchor so a 31st keeps landing on month ends
+    n = 0
+    if anchor < start:
+        n = max(0, ((start.year - anchor.year) * 12 + start.month - anchor.month) // step - 1)
+    while True:
+        due = _add_months(anchor, n * step)
+        if due >= start:
+            yield due
+        n += 1
+
+
+# ==================== Notifiers ====================
+class Notifier:
+    """Delivers bill alerts to users (email, push, ...)"""
+
+    async def send(self, alert: BillAlert):
+        raise NotImplementedError
+
+
+class LogNotifier(Notifier):
+    """Local stand-in: prints alerts and keeps the most recent ones for inspection"""
+
+    def __init__(self, history: int = 100):
+        self.sent: deque = deque(maxlen=history)
+
+    async def send(self, alert: BillAlert):
+        self.sent.append(alert)
+        print(
+            f"Bill alert for {alert.account_number}: {alert.name} "
+            f"Rs.{alert.amount:.2f} due {alert.due_date} (in {alert.days_until_due} days)"
+        )
+
+
+NOTIFIERS: Dict[str, Callable[[], Notifier]] = {
+    "log": LogNotifier,
+}
+
+
+def get_notifier(name: Optional[str] = None) -> Notifier:
+    """Instantiate a notifier by name (defaults to the deployment notifier)"""
+    name = name or BILL_NOTIFIER
+    if name not in NOTIFIERS:
+        raise ValueError(f"Unknown bill notifier: {name}")
+    return NOTIFIERS[name]()
+
+
+# ==================== Scheduler ====================
+class BillService:
+    """
+    Per-account bill registry with a heap-based alert scheduler.
+    Each bill has exactly one entry in the heap - its next alert - so a tick only
+    touches bills that are actually due instead of scanning every user.
+    Updated or deleted bills leave their old entry behind; it is skipped when popped.
+    Due dates and alert times are on each account's own calendar, the one its
+    forecast horizon uses, so "due today" means the user's today.
+    """
+
+    def __init__(
+        self,
+        notifier: Optional[Notifier] = None,
+        alert_days: int = BILL_ALERT_DAYS,
+        alert_hour: int = BILL_ALERT_HOUR,
+        now_fn: Callable[[], datetime] = lambda: datetime.now(timezone.utc)
+    ):
+        self.notifier = notifier or get_notifier()
+        self.alert_days = alert_days
+        self.alert_hour = alert_hour
+        self.now_fn = now_fn
+        self._bills: Dict[str, Dict[str, Bill]] = {}
+        self._timezones: Dict[str, str] = {}
+        # (alert at in UTC, seq, account, bill id, due date, bill revision)
+        self._heap: List[Tuple[datetime, int, str, str, date, int]] = []
+        self._revisions: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the alert loop on the running event loop"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the alert loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ---------- Registry ----------
+    def list_bills(self, account_number: str) -> List[Bill]:
+        return list(self._bills.get(account_number, {}).values())
+
+    def has_bills(self, account_number: str) -> bool:
+        return bool(self._bills.get(account_number))
+
+    def _today(self, account_number: str, now: Optional[datetime] = None) -> date:
+        zone = resolve_timezone(self._timezones.get(account_number, DEFAULT_TIMEZONE))
+        return (now or self.now_fn()).astimezone(zone).date()
+
+    def set_timezone(self, account_number: str, timezone_name: str):
+        """Move an account's bills to another calendar; pending alerts are rescheduled"""
+        if self._timezones.get(account_number, DEFAULT_TIMEZONE) == timezone_name:
+            return
+        self._timezones[account_number] = timezone_name
+        today = self._today(account_number)
+        for bill in self.list_bills(account_number):
+            self._revisions[bill.id] += 1
+            self._schedule_next(account_number, bill, today)
+
+    def add_bill(
+        self,
+        account_number: str,
+        bill: BillCreate,
+        timezone_name: str = DEFAULT_TIMEZONE
+    ) -> Bill:
+        """Register a recurring bill and schedule its next alert"""
+        self.set_timezone(account_number, timezone_name)
+        stored = Bill(id=str(uuid.uuid4())[:8], **bill.model_dump())
+        self._bills.setdefault(account_number, {})[stored.id] = stored
+        self._revisions[stored.id] = 0
+        self._schedule_next(account_number, stored, self._today(account_number))
+        return stored
+
+    def update_bill(
+        self,
+        account_number: str,
+        bill_id: str,
+        bill: BillCreate,
+        timezone_name: str = DEFAULT_TIMEZONE
+    ) -> Optional[Bill]:
+        """Replace a bill's details; its pending alert is rescheduled"""
+        bills = self._bills.get(account_number, {})
+        if bill_id not in bills:
+            return None
+        self.set_timezone(account_number, timezone_name)
+        stored = Bill(id=bill_id, **bill.model_dump())
+        bills[bill_id] = stored
+        self._revisions[bill_id] += 1
+        self._schedule_next(account_number, stored, self._today(account_number))
+        return stored
+
+    def delete_bill(self, account_number: str, bill_id: str) -> bool:
+        bills = self._bills.get(account_number, {})
+        if bills.pop(bill_id, None) is None:
+            return False
+        self._revisions.pop(bill_id, None)
+        return True
+
+    # ---------- Queries ----------
+    def upcoming(self, account_number: str, start: date, end: date) -> List[Dict]:
+        """Every occurrence of the account's bills in [start, end], by due date"""
+        due = []
+        for bill in self.list_bills(account_number):
+            for due_date in occurrences(bill, start):
+                if due_date > end:
+                    break
+                due.append({
+                    "bill_id": bill.id,
+                    "name": bill.name,
+                    "amount": bill.amount,
+                    "due_date": due_date.isoformat()
+                })
+        due.sort(key=lambda item: item["due_date"])
+        return due
+
+    def amount_due(self, account_number: str, start: date, end: date) -> float:
+        """Total of the account's bills falling due in [start, end]"""
+        return round(sum(item["amount"] for item in self.upcoming(account_number, start, end)), 2)
+
+    # ---------- Alerts ----------
+    def _schedule_next(self, account_number: str, bill: Bill, start: date):
+        due_date = next(occurrences(bill, start))
+        zone = resolve_timezone(self._timezones.get(account_number, DEFAULT_TIMEZONE))
+        alert_at = datetime.combine(
+            due_date - timedelta(days=self.alert_days), time(self.alert_hour), tzinfo=zone
+        ).astimezone(timezone.utc)
+        seq = next(self._seq)
+        heapq.heappush(self._heap, (alert_at, seq, account_number, bill.id, due_date, self._revisions[bill.id]))
+        if self._wakeup is not None and self._heap[0][1] == seq:
+            # Earlier than the alert the loop is sleeping towards
+            self._wakeup.set()
+
+    async def run_due(self) -> int:
+        """Send every alert that is due now; returns how many were sent"""
+        now = self.now_fn()
+        sent = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, _, account_number, bill_id, due_date, revision = heapq.heappop(self._heap)
+            bill = self._bills.get(account_number, {}).get(bill_id)
+            if bill is None or self._revisions.get(bill_id) != revision:
+                continue
+
+            today = self._today(account_number, now)
+            if due_date >= today:
+                alert = BillAlert(
+                    account_number=account_number,
+                    bill_id=bill_id,
+                    name=bill.name,
+                    amount=bill.amount,
+                    due_date=due_date.isoformat(),
+                    days_until_due=(due_date - today).days
+                )
+                try:
+                    await self.notifier.send(alert)
+                    sent += 1
+                except Exception as e:
+                    print(f"Bill alert failed for {account_number}/{bill_id}: {e}")
+
+            self._schedule_next(account_number, bill, due_date + timedelta(days=1))
+        return sent
+
+    async def _run(self):
+        while True:
+            await self.run_due()
+            self._wakeup.clear()
+            timeout = None
+            if self._heap:
+                # Capped so a changed system clock is noticed within the hour
+                timeout = min(3600.0, max(0.0, (self._heap[0][0] - self.now_fn()).total_seconds()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,237 @@
+"""
+VaultGuard Cache
+Key/value cache with in-process, shared-file and Redis-compatible backends
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import CACHE_BACKEND, CACHE_DIR, CACHE_MAX_ENTRIES, REDIS_URL
+
+
+class Cache:
+    """
+    Interface for cache backends. Values are arbitrary picklable objects and
+    ttl is in seconds (None = no expiry). `shared` tells callers whether other
+    worker processes see the same entries.
+    """
+    shared = False
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set only if the key is absent; returns whether it was set (usable as a lock)"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+
+class LocalCache(Cache):
+    """In-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            expires_at = time.monotonic() + ttl if ttl is not None else None
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+        self.set(key, value, ttl)
+        return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class FileCache(Cache):
+    """
+    Cache shared by the worker processes of one host: one pickle file per key,
+    written atomically. Under /dev/shm the files live in shared memory, so
+    workers read each other's entries without a network hop.
+    """
+    shared = True
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.cache')
+
+    @staticmethod
+    def _expires_at(ttl: Optional[float]) -> Optional[float]:
+        # Wall clock: entries are compared across processes
+        return time.time() + ttl if ttl is not None else None
+
+    def _read(self, path: str) -> Optional[Tuple[Optional[float], Any]]:
+        try:
+            with open(path, 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Discarding unreadable cache entry {path}: {e}")
+            self._remove(path)
+            return None
+        if expires_at is not None and expires_at <= time.time():
+            self._remove(path)
+            return None
+        return expires_at, value
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._read(self._path(key))
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((self._expires_at(ttl), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            self._remove(tmp_path)
+            raise
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        path = self._path(key)
+        # An expired entry is removed by the read, so the exclusive create can succeed
+        if self._read(path) is not None:
+            return False
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((self._expires_at(ttl), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        return True
+
+    def delete(self, key: str):
+        self._remove(self._path(key))
+
+
+class FakeRedis:
+    """
+    In-process stand-in for the subset of the redis client the cache uses
+    (get / set with px and nx / delete), for tests and local runs of the Redis backend
+    """
+
+    def __init__(self):
+        self._cache = LocalCache(max_entries=10 ** 9)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes, px: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        ttl = px / 1000 if px is not None else None
+        if nx:
+            return True if self._cache.add(key, value, ttl) else None
+        self._cache.set(key, value, ttl)
+        return True
+
+    def delete(self, key: str) -> int:
+        existed = self._cache.get(key) is not None
+        self._cache.delete(key)
+        return int(existed)
+
+
+class RedisCache(Cache):
+    """
+    Cache on a Redis-compatible server, shared by every worker and host.
+    REDIS_URL=fake:// uses the in-process FakeRedis instead of a server.
+    """
+    shared = True
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "vaultguard:"):
+        self.prefix = prefix
+        if url.startswith("fake://"):
+            self.client = FakeRedis()
+            return
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        px = int(ttl * 1000) if ttl is not None else None
+        self.client.set(self.prefix + key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), px=px)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        px = int(ttl * 1000) if ttl is not None else None
+        return bool(self.client.set(
+            self.prefix + key,
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            px=px,
+            nx=True
+        ))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+
+CACHE_BACKENDS: Dict[str, type] = {
+    "local": LocalCache,
+    "file": FileCache,
+    "redis": RedisCache,
+}
+
+_cache: Optional[Cache] = None
+
+
+def get_cache() -> Cache:
+    """Process-wide cache for the configured backend"""
+    global _cache
+    if _cache is None:
+        if CACHE_BACKEND not in CACHE_BACKENDS:
+            raise ValueError(f"Unknown cache backend: {CACHE_BACKEND}")
+        _cache = CACHE_BACKENDS[CACHE_BACKEND]()
+    return _cache
@@ -0,0 +1,239 @@
+"""
+VaultGuard Response Compression
+Negotiated gzip/brotli/zstd compression middleware with per-encoding CPU metrics
+"""
+import time
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from config import COMPRESSION_MIN_SIZE, COMPRESSION_LEVEL, COMPRESSION_ENCODINGS
+
+
+# ==================== Encoders ====================
+class _Encoder:
+    """Incremental compressor: every chunk is flushed so streamed bodies reach the client as they are produced"""
+
+    def chunk(self, data: bytes, final: bool) -> bytes:
+        raise NotImplementedError
+
+
+class _GzipEncoder(_Encoder):
+    def __init__(self, level: int):
+        # wbits=31: gzip container
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliEncoder(_Encoder):
+    def __init__(self, level: int):
+        import brotli
+        self._compressor = brotli.Compressor(quality=min(level, 11))
+
+    def chunk(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class _ZstdEncoder(_Encoder):
+    def __init__(self, level: int):
+        import zstandard
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def chunk(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + (self._compressor.flush() if final else self._compressor.flush(self._flush_block))
+
+
+def _installed(module: str) -> bool:
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+ENCODERS: Dict[str, Callable[[int], _Encoder]] = {"gzip": _GzipEncoder}
+if _installed("brotli"):
+    ENCODERS["br"] = _BrotliEncoder
+if _installed("zstandard"):
+    ENCODERS["zstd"] = _ZstdEncoder
+
+
+def negotiate(accept_encoding: str, preferred: List[str]) -> Optional[str]:
+    """
+    Pick the encoding for an Accept-Encoding header: the client's highest
+    q-value wins, ties go to the server's preference order. None = identity.
+    """
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in preferred:
+        q = qualities.get(coding, qualities.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+# ==================== Metrics ====================
+class CompressionStats:
+    """Per-encoding totals: responses, bytes before/after and CPU time spent compressing"""
+
+    def __init__(self):
+        self._totals: Dict[str, Dict[str, float]] = {}
+        self.skipped_small = 0
+        self.skipped_uncompressible = 0
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, cpu_seconds: float, responses: int = 0):
+        totals = self._totals.setdefault(
+            encoding, {"responses": 0, "bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0}
+        )
+        totals["responses"] += responses
+        totals["bytes_in"] += bytes_in
+        totals["bytes_out"] += bytes_out
+        totals["cpu_seconds"] += cpu_seconds
+
+    def snapshot(self) -> Dict:
+        encodings = {}
+        for encoding, totals in self._totals.items():
+            bytes_in = totals["bytes_in"]
+            encodings[encoding] = {
+                "responses": totals["responses"],
+                "bytes_in": bytes_in,
+                "bytes_out": totals["bytes_out"],
+                "ratio": round(totals["bytes_out"] / bytes_in, 4) if bytes_in else None,
+                "cpu_ms": round(totals["cpu_seconds"] * 1000, 3),
+                "cpu_ns_per_byte": round(totals["cpu_seconds"] * 1e9 / bytes_in, 2) if bytes_in else None
+            }
+        return {
+            "encodings": encodings,
+            "skipped_below_min_size": self.skipped_small,
+            "skipped_uncompressible": self.skipped_uncompressible
+        }
+
+
+# ==================== Middleware ====================
+# Already compact, or would stall: SSE must reach the browser event by event
+_UNCOMPRESSIBLE_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with the best encoding the client
+    accepts. Complete bodies under minimum_size are sent as-is; streamed bodies
+    are compressed chunk by chunk (length unknown up front). Event streams,
+    media and already-encoded responses pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        level: int = COMPRESSION_LEVEL,
+        encodings: Optional[List[str]] = None,
+        stats: Optional[CompressionStats] = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        # Encodings whose packages are missing are silently left out
+        self.encodings = [e for e in (encodings or COMPRESSION_ENCODINGS) if e in ENCODERS]
+        self.stats = stats or compression_stats
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressedResponse(self, encoding, send).run(scope, receive)
+
+
+class _CompressedResponse:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+
+    async def run(self, scope, receive):
+        await self.middleware.app(scope, receive, self.on_send)
+
+    def _compress(self, body: bytes, final: bool) -> bytes:
+        started = time.thread_time()
+        out = self.encoder.chunk(body, final)
+        self.middleware.stats.record(
+            self.encoding, len(body), len(out), time.thread_time() - started, responses=int(final)
+        )
+        return out
+
+    async def on_send(self, message):
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether compression pays off
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            content_type = headers.get("content-type", "")
+            if "content-encoding" in headers or content_type.startswith(_UNCOMPRESSIBLE_TYPES):
+                self.middleware.stats.skipped_uncompressible += 1
+                self.passthrough = True
+            elif not more_body and len(body) < self.middleware.minimum_size:
+                self.middleware.stats.skipped_small += 1
+                self.passthrough = True
+            if self.passthrough:
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            self.encoder = ENCODERS[self.encoding](self.middleware.level)
+            body = self._compress(body, final=not more_body)
+            headers["content-encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["content-length"]
+            else:
+                headers["content-length"] = str(len(body))
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        await self.send({
+            "type": "http.response.body",
+            "body": self._compress(body, final=not more_body),
+            "more_body": more_body
+        })
+
+
+compression_stats = CompressionStats()
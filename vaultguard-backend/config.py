@@ -14,6 +14,7 @@ DEFAULT_IFSC_CODE = os.getenv("DEFAULT_IFSC_CODE", "VAULT001")
 USER_NAME = os.getenv("USER_NAME", "Rahul Sharma")
 USER_EMAIL = os.getenv("USER_EMAIL", "rahul.sharma@email.com")
 BANK_NAME = os.getenv("BANK_NAME", "VaultGuard Bank")
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "Asia/Kolkata")  # IANA name; month ends and midnights follow it
 
 # Authentication Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "vaultguard-super-secret-key-change-in-production-2024")
@@ -23,3 +24,122 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440
 # Demo User Credentials
 DEMO_USER_EMAIL = os.getenv("DEMO_USER_EMAIL", "rahul.sharma@email.com")
 DEMO_USER_PASSWORD = os.getenv("DEMO_USER_PASSWORD", "vaultguard123")
+
+# Model Artifact Configuration
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_artifacts"))
+
+# Income Forecaster Configuration
+# Backends: random_forest, hist_gradient_boosting, ridge, holt_winters
+INCOME_FORECASTER_BACKEND = os.getenv("INCOME_FORECASTER_BACKEND", "random_forest")
+# Per-tier overrides, e.g. "standard:ridge,premium:random_forest"
+INCOME_FORECASTER_TIER_BACKENDS = dict(
+    item.strip().split(":", 1)
+    for item in os.getenv("INCOME_FORECASTER_TIER_BACKENDS", "").split(",")
+    if ":" in item
+)
+
+# Random Forest Configuration
+INCOME_RF_N_ESTIMATORS = int(os.getenv("INCOME_RF_N_ESTIMATORS", "100"))
+INCOME_RF_MAX_DEPTH = int(os.getenv("INCOME_RF_MAX_DEPTH")) if os.getenv("INCOME_RF_MAX_DEPTH") else None
+INCOME_RF_N_JOBS = int(os.getenv("INCOME_RF_N_JOBS", "-1"))  # -1 = all cores
+# Warm start grows the previous forest by this many trees per retrain instead of refitting from scratch;
+# past the forest's size the oldest trees are retired, so it rotates toward recent data
+INCOME_RF_WARM_START = os.getenv("INCOME_RF_WARM_START", "false").lower() == "true"
+INCOME_RF_WARM_START_STEP = int(os.getenv("INCOME_RF_WARM_START_STEP", "10"))
+# Adaptive mode scales the forest to the history length, capped at INCOME_RF_N_ESTIMATORS
+INCOME_RF_ADAPTIVE = os.getenv("INCOME_RF_ADAPTIVE", "false").lower() == "true"
+INCOME_RF_MIN_ESTIMATORS = int(os.getenv("INCOME_RF_MIN_ESTIMATORS", "10"))
+INCOME_RF_TREES_PER_DAY = float(os.getenv("INCOME_RF_TREES_PER_DAY", "0.5"))
+
+# Bank API Deadlines (seconds)
+BANK_SNAPSHOT_DEADLINE = float(os.getenv("BANK_SNAPSHOT_DEADLINE", "10"))
+
+# Bank API Bulk Ingestion
+BANK_BULK_BATCH_SIZE = int(os.getenv("BANK_BULK_BATCH_SIZE", "500"))
+BANK_BULK_CONCURRENCY = int(os.getenv("BANK_BULK_CONCURRENCY", "8"))
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "10000"))  # transactions per statement import request
+
+# Bank API Resilience
+BANK_CONNECT_TIMEOUT = float(os.getenv("BANK_CONNECT_TIMEOUT", "2"))
+BANK_READ_TIMEOUT = float(os.getenv("BANK_READ_TIMEOUT", "5"))
+BANK_WRITE_TIMEOUT = float(os.getenv("BANK_WRITE_TIMEOUT", "10"))
+BANK_BULK_TIMEOUT = float(os.getenv("BANK_BULK_TIMEOUT", "30"))
+BANK_RETRY_ATTEMPTS = int(os.getenv("BANK_RETRY_ATTEMPTS", "3"))  # idempotent reads only
+BANK_RETRY_BACKOFF = float(os.getenv("BANK_RETRY_BACKOFF", "0.2"))  # base of the jittered exponential backoff
+BANK_BREAKER_FAILURE_RATE = float(os.getenv("BANK_BREAKER_FAILURE_RATE", "0.5"))
+BANK_BREAKER_WINDOW = int(os.getenv("BANK_BREAKER_WINDOW", "20"))
+BANK_BREAKER_MIN_CALLS = int(os.getenv("BANK_BREAKER_MIN_CALLS", "5"))
+BANK_BREAKER_RESET_SECONDS = float(os.getenv("BANK_BREAKER_RESET_SECONDS", "30"))
+BANK_STALE_CACHE_SIZE = int(os.getenv("BANK_STALE_CACHE_SIZE", "1000"))
+
+# Forecast Cache Configuration
+FORECAST_CACHE_TTL = float(os.getenv("FORECAST_CACHE_TTL", "300"))  # seconds before account state is refetched
+ACCOUNT_STATE_CACHE_SIZE = int(os.getenv("ACCOUNT_STATE_CACHE_SIZE", "1000"))
+
+# Dashboard Streaming
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+STREAM_TOKEN_EXPIRE_SECONDS = int(os.getenv("STREAM_TOKEN_EXPIRE_SECONDS", "60"))  # time to open a stream with one
+
+# Bill Alerts
+BILL_ALERT_DAYS = int(os.getenv("BILL_ALERT_DAYS", "3"))  # alert this many days before a bill is due
+BILL_ALERT_HOUR = int(os.getenv("BILL_ALERT_HOUR", "9"))  # local hour alerts are sent at
+BILL_NOTIFIER = os.getenv("BILL_NOTIFIER", "log")
+
+# Expense Forecasting
+EXPENSE_LOOKBACK_WEEKS = int(os.getenv("EXPENSE_LOOKBACK_WEEKS", "12"))  # history the run-rate is computed from
+
+# Liquidity Simulation
+SIMULATION_PATHS = int(os.getenv("SIMULATION_PATHS", "5000"))
+SIMULATION_MIN_PATHS = int(os.getenv("SIMULATION_MIN_PATHS", "500"))  # always simulated, even over budget
+SIMULATION_SEED = int(os.getenv("SIMULATION_SEED", "42"))
+SIMULATION_BUDGET_MS = float(os.getenv("SIMULATION_BUDGET_MS", "50"))
+SIMULATION_LOOKBACK_DAYS = int(os.getenv("SIMULATION_LOOKBACK_DAYS", "90"))  # history days paths are bootstrapped from
+
+# Deployment
+APP_ENV = os.getenv("APP_ENV", "development")  # "production" runs without --reload
+# Budgets, manual expenses, bills, rate limits and dashboard streams still live in
+# each process, so more than one worker would split a user's state between them
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# Cache Configuration
+# local = per-process LRU, file = shared by the workers of one host, redis = shared by every host
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file" if APP_ENV == "production" else "local")
+CACHE_DIR = os.getenv(
+    "CACHE_DIR",
+    "/dev/shm/vaultguard-cache" if os.path.isdir("/dev/shm") else os.path.join("/tmp", "vaultguard-cache")
+)
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")  # fake:// = in-process stand-in
+MODEL_TRAIN_CLAIM_TTL = float(os.getenv("MODEL_TRAIN_CLAIM_TTL", "600"))  # seconds a worker owns a retrain
+
+# Rate Limiting (token buckets per account)
+RATE_LIMIT_READ_PER_MINUTE = float(os.getenv("RATE_LIMIT_READ_PER_MINUTE", "120"))
+RATE_LIMIT_READ_BURST = float(os.getenv("RATE_LIMIT_READ_BURST", "30"))
+RATE_LIMIT_ML_PER_MINUTE = float(os.getenv("RATE_LIMIT_ML_PER_MINUTE", "20"))
+RATE_LIMIT_ML_BURST = float(os.getenv("RATE_LIMIT_ML_BURST", "5"))
+RATE_LIMIT_WRITE_PER_MINUTE = float(os.getenv("RATE_LIMIT_WRITE_PER_MINUTE", "30"))  # writes that reach the bank
+RATE_LIMIT_WRITE_BURST = float(os.getenv("RATE_LIMIT_WRITE_BURST", "10"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+
+# Manual Expense Store
+EXPENSE_STORE_MAX_PER_USER = int(os.getenv("EXPENSE_STORE_MAX_PER_USER", "1000"))  # oldest by date dropped beyond this
+EXPENSE_STORE_RETENTION_DAYS = int(os.getenv("EXPENSE_STORE_RETENTION_DAYS", "400"))  # by expense date
+EXPENSE_STORE_MAX_USERS = int(os.getenv("EXPENSE_STORE_MAX_USERS", "10000"))  # least recently used account evicted beyond this
+
+# Prediction Executor
+PREDICTION_WORKERS = int(os.getenv("PREDICTION_WORKERS", "2"))  # concurrent model fits/forecasts per process
+
+# Response Compression
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # smaller bodies are sent as-is
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))  # gzip/zstd level; brotli quality is capped at 11
+# Preferred first when a client accepts several; br/zstd need the brotli/zstandard packages
+COMPRESSION_ENCODINGS = [e.strip() for e in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",") if e.strip()]
+
+# Request Deadlines and Admission Control (seconds)
+REQUEST_DEADLINE_DEFAULT = float(os.getenv("REQUEST_DEADLINE_DEFAULT", "10"))  # when the client sends no X-Request-Timeout-Ms
+REQUEST_DEADLINE_ML = float(os.getenv("REQUEST_DEADLINE_ML", "20"))  # /api/predictions*: may fit a model
+REQUEST_DEADLINE_BULK = float(os.getenv("REQUEST_DEADLINE_BULK", "60"))  # imports and demo setup
+REQUEST_DEADLINE_MAX = float(os.getenv("REQUEST_DEADLINE_MAX", "60"))  # cap on client-requested budgets
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "64"))  # per process
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", "128"))  # beyond this requests get 503 at once
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "1"))  # longest wait for a slot before 503
@@ -0,0 +1,253 @@
+"""
+VaultGuard Request Deadlines
+Per-request time budgets that follow the work they start, and admission control
+"""
+import asyncio
+import contextvars
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import httpx
+import orjson
+from starlette.datastructures import Headers
+
+from config import (
+    REQUEST_DEADLINE_DEFAULT,
+    REQUEST_DEADLINE_ML,
+    REQUEST_DEADLINE_BULK,
+    REQUEST_DEADLINE_MAX,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_QUEUED_REQUESTS,
+    ADMISSION_QUEUE_TIMEOUT
+)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The request's time budget ran out; a TimeoutError, so handlers answer it with 504"""
+
+
+# ==================== Deadline Propagation ====================
+# Monotonic instant the current request must be answered by. Tasks copy the
+# context they are created in, so bank calls and executor work started for a
+# request see its deadline; background work clears it with clear_deadline().
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request's budget (None outside a request)"""
+    deadline = _deadline.get()
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def expired() -> bool:
+    return remaining() == 0.0
+
+
+def check():
+    """Raise DeadlineExceeded if the budget is spent, so no new work starts for an abandoned request"""
+    if expired():
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+def clear_deadline():
+    """Detach the current task from the request that spawned it"""
+    _deadline.set(None)
+
+
+def bound(timeout: float) -> float:
+    """A timeout no longer than the remaining budget"""
+    left = remaining()
+    return timeout if left is None else min(timeout, left)
+
+
+def bound_httpx(timeout: httpx.Timeout) -> httpx.Timeout:
+    """Cap every phase of an httpx timeout by the remaining budget"""
+    left = remaining()
+    if left is None:
+        return timeout
+    cap = lambda value: left if value is None else min(value, left)
+    return httpx.Timeout(
+        connect=cap(timeout.connect), read=cap(timeout.read), write=cap(timeout.write), pool=cap(timeout.pool)
+    )
+
+
+# ==================== Middleware ====================
+# Longest prefix wins; None = no deadline and no admission slot (long-lived or liveness checks)
+ROUTE_DEADLINES: Tuple[Tuple[str, Optional[float]], ...] = (
+    ("/api/stream", None),
+    ("/api/stream/token", REQUEST_DEADLINE_DEFAULT),
+    ("/health", None),
+    ("/api/predictions", REQUEST_DEADLINE_ML),
+    ("/api/transactions/import", REQUEST_DEADLINE_BULK),
+    ("/api/user/setup", REQUEST_DEADLINE_BULK),
+)
+
+DEADLINE_HEADER = "x-request-timeout-ms"
+
+
+def route_deadline(path: str) -> Optional[float]:
+    matches = [(prefix, budget) for prefix, budget in ROUTE_DEADLINES if path.startswith(prefix)]
+    if not matches:
+        return REQUEST_DEADLINE_DEFAULT
+    return max(matches, key=lambda match: len(match[0]))[1]
+
+
+class AdmissionStats:
+    def __init__(self):
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def snapshot(self) -> Dict:
+        return dict(vars(self))
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware giving every request a time budget - the client's
+    X-Request-Timeout-Ms header (capped) or the route default - and admitting
+    at most max_concurrent requests at once. Excess requests wait in a short
+    bounded queue and are rejected with 503 once it is full or the wait runs
+    out, so overload sheds work up front instead of letting every request slow
+    down. A request still running when its budget ends is cancelled, along
+    with the bank calls and model work it started, and answered with 504.
+    """
+
+    def __init__(
+        self,
+        app,
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+        max_queued: int = MAX_QUEUED_REQUESTS,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+        stats: Optional[AdmissionStats] = None
+    ):
+        self.app = app
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.stats = stats or admission_stats
+
+    def _update_gauges(self):
+        self.stats.active = self._active
+        self.stats.waiting = len(self._waiters)
+
+    def _budget(self, scope) -> Optional[float]:
+        budget = route_deadline(scope["path"])
+        if budget is None:
+            return None
+        requested = Headers(scope=scope).get(DEADLINE_HEADER)
+        if requested is not None:
+            try:
+                budget = float(requested) / 1000
+            except ValueError:
+                pass
+        return max(0.0, min(budget, REQUEST_DEADLINE_MAX))
+
+    async def _admit(self, wait: float) -> bool:
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            self.stats.admitted += 1
+            self._update_gauges()
+            return True
+        if len(self._waiters) >= self.max_queued or wait <= 0:
+            self.stats.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats.queued += 1
+        self._update_gauges()
+        try:
+            await asyncio.wait({waiter}, timeout=wait)
+        except asyncio.CancelledError:
+            if waiter.done():
+                # The slot was handed over just as the client went away; pass it on
+                self._release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+                self._update_gauges()
+            raise
+        if not waiter.done():
+            waiter.cancel()
+            self._waiters.remove(waiter)
+            self.stats.timed_out += 1
+            self._update_gauges()
+            return False
+        self.stats.admitted += 1
+        return True
+
+    def _release(self):
+        """Hand the slot straight to the next queued request, or free it"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self._active -= 1
+        self._update_gauges()
+
+    @staticmethod
+    async def _respond(send, status: int, detail: str, headers: Optional[Dict[str, str]] = None):
+        body = orjson.dumps({"detail": detail})
+        raw = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        raw += [(name.encode(), value.encode()) for name, value in (headers or {}).items()]
+        await send({"type": "http.response.start", "status": status, "headers": raw})
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        budget = self._budget(scope)
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        token = _deadline.set(time.monotonic() + budget)
+        try:
+            if not await self._admit(min(self.queue_timeout, budget)):
+                await self._respond(send, 503, "Server is busy, retry shortly", {"retry-after": "1"})
+                return
+            try:
+                await self._run(scope, receive, send)
+            finally:
+                self._release()
+        finally:
+            _deadline.reset(token)
+
+    async def _run(self, scope, receive, send):
+        started = False
+        replaced = False
+
+        async def send_wrapper(message):
+            nonlocal started, replaced
+            if replaced:
+                return
+            if message["type"] == "http.response.start":
+                if message["status"] >= 500 and expired():
+                    # A handler turned the cut-off into a generic error; report the real cause
+                    replaced = True
+                    await self._respond(send, 504, "Request deadline exceeded")
+                    return
+                started = True
+            await send(message)
+
+        try:
+            await asyncio.wait_for(self.app(scope, receive, send_wrapper), timeout=remaining())
+        except asyncio.TimeoutError:
+            # Also catches DeadlineExceeded raised by work the handler did not handle
+            if started:
+                raise
+            if not replaced:
+                await self._respond(send, 504, "Request deadline exceeded")
+
+
+admission_stats = AdmissionStats()
@@ -0,0 +1,63 @@
+"""
+VaultGuard Event Bus
+In-process publish/subscribe for transaction writes and derived-state updates
+"""
+import inspect
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+# Event types
+TRANSACTION_CREATED = "transaction.created"
+TRANSACTIONS_INVALIDATED = "transactions.invalidated"
+DASHBOARD_UPDATED = "dashboard.updated"
+
+
+class TransactionEvent(BaseModel):
+    account_number: str
+    ifsc_code: str
+    type: str  # "deposit" or "withdraw"
+    amount: float
+    timestamp: str  # "YYYY-MM-DD HH:MM:SS", as sent to the bank
+
+
+class InvalidationEvent(BaseModel):
+    account_number: str
+    ifsc_code: str
+    reason: Optional[str] = None
+
+
+class DashboardEvent(BaseModel):
+    account_number: str
+
+
+class EventBus:
+    """
+    Minimal in-process event bus.
+    Handlers may be plain functions or coroutines; they run in subscription order
+    and a failing handler is logged without affecting the others or the publisher.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable[[Any], Any]]] = defaultdict(list)
+
+    def subscribe(self, event_type: str, handler: Callable[[Any], Any]):
+        """Register a handler for an event type"""
+        self._subscribers[event_type].append(handler)
+
+    def unsubscribe(self, event_type: str, handler: Callable[[Any], Any]):
+        """Remove a previously registered handler"""
+        if handler in self._subscribers.get(event_type, []):
+            self._subscribers[event_type].remove(handler)
+
+    async def publish(self, event_type: str, event: Any):
+        """Deliver an event to every subscriber of its type"""
+        for handler in list(self._subscribers.get(event_type, [])):
+            try:
+                result = handler(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"Event handler failed for {event_type}: {e}")
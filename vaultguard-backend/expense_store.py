@@ -0,0 +1,184 @@
+"""
+VaultGuard Expense Store
+Manually added expenses in compact per-account arrays, bounded by count, age and accounts
+"""
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+from config import EXPENSE_STORE_MAX_PER_USER, EXPENSE_STORE_RETENTION_DAYS, EXPENSE_STORE_MAX_USERS
+
+
+class _AccountExpenses:
+    """
+    One account's expenses as parallel arrays kept sorted by date, which makes
+    the date column its own index. A record costs 28 bytes: id, day ordinal,
+    amount and two indexes into the account's table of interned strings.
+    """
+
+    __slots__ = ('ids', 'days', 'amounts', 'names', 'categories', 'strings', 'string_ids')
+
+    def __init__(self):
+        self.ids = array('q')
+        self.days = array('i')
+        self.amounts = array('d')
+        self.names = array('I')
+        self.categories = array('I')
+        self.strings: List[str] = []
+        self.string_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _columns(self):
+        return self.ids, self.days, self.amounts, self.names, self.categories
+
+    def _string(self, value: str) -> int:
+        index = self.string_ids.get(value)
+        if index is None:
+            value = sys.intern(value)
+            index = len(self.strings)
+            self.strings.append(value)
+            self.string_ids[value] = index
+        return index
+
+    def insert(self, expense_id: int, day: int, amount: float, name: str, category: str):
+        # After any expenses of the same day, so a day keeps insertion order
+        position = bisect_right(self.days, day)
+        values = (expense_id, day, amount, self._string(name), self._string(category))
+        for column, value in zip(self._columns(), values):
+            column.insert(position, value)
+
+    def delete(self, start: int, stop: int):
+        for column in self._columns():
+            del column[start:stop]
+        if len(self.strings) > 2 * len(self) + 16:
+            self._compact_strings()
+
+    def _compact_strings(self):
+        """Drop strings no stored expense refers to any more"""
+        used = sorted(set(self.names) | set(self.categories))
+        remap = {old: new for new, old in enumerate(used)}
+        self.strings = [self.strings[old] for old in used]
+        self.string_ids = {value: index for index, value in enumerate(self.strings)}
+        self.names = array('I', (remap[index] for index in self.names))
+        self.categories = array('I', (remap[index] for index in self.categories))
+
+    def record(self, position: int) -> Dict:
+        return {
+            'id': str(self.ids[position]),
+            'name': self.strings[self.names[position]],
+            'amount': self.amounts[position],
+            'category': self.strings[self.categories[position]],
+            'date': date.fromordinal(self.days[position]).isoformat()
+        }
+
+    def nbytes(self) -> int:
+        columns = sum(len(column) * column.itemsize for column in self._columns())
+        return columns + sum(sys.getsizeof(value) for value in self.strings)
+
+
+class ExpenseStore:
+    """
+    Manually added expenses per account. Each account keeps at most
+    max_per_user expenses (the oldest by date are dropped first) from the last
+    retention_days; beyond max_accounts the least recently used account is
+    evicted. Reads of a date range or the most recent expenses bisect the
+    date index instead of scanning.
+    """
+
+    def __init__(
+        self,
+        max_per_user: int = EXPENSE_STORE_MAX_PER_USER,
+        retention_days: int = EXPENSE_STORE_RETENTION_DAYS,
+        max_accounts: int = EXPENSE_STORE_MAX_USERS,
+        today_fn: Callable[[], date] = date.today
+    ):
+        self.max_per_user = max_per_user
+        self.retention_days = retention_days
+        self.max_accounts = max_accounts
+        self.today_fn = today_fn
+        self._accounts: OrderedDict = OrderedDict()
+        self._last_id = 0
+
+    def __len__(self) -> int:
+        return sum(len(expenses) for expenses in self._accounts.values())
+
+    def _next_id(self) -> int:
+        # Microsecond timestamps, never repeated within the process
+        self._last_id = max(time.time_ns() // 1000, self._last_id + 1)
+        return self._last_id
+
+    def _get(self, account_number: str) -> Optional[_AccountExpenses]:
+        """The account's expenses with anything past retention dropped"""
+        expenses = self._accounts.get(account_number)
+        if expenses is None:
+            return None
+        self._accounts.move_to_end(account_number)
+        cutoff = (self.today_fn() - timedelta(days=self.retention_days)).toordinal()
+        expired = bisect_left(expenses.days, cutoff)
+        if expired:
+            expenses.delete(0, expired)
+        if not expenses:
+            del self._accounts[account_number]
+            return None
+        return expenses
+
+    def add(self, account_number: str, name: str, amount: float, category: str, day: date) -> Dict:
+        """Store an expense and return it as a dict in the Expense shape"""
+        expenses = self._get(account_number)
+        if expenses is None:
+            expenses = self._accounts[account_number] = _AccountExpenses()
+            while len(self._accounts) > self.max_accounts:
+                self._accounts.popitem(last=False)
+
+        expense_id = self._next_id()
+        expenses.insert(expense_id, day.toordinal(), amount, name, category)
+        if len(expenses) > self.max_per_user:
+            expenses.delete(0, len(expenses) - self.max_per_user)
+        return {'id': str(expense_id), 'name': name, 'amount': amount, 'category': category, 'date': day.isoformat()}
+
+    def delete(self, account_number: str, expense_id: str) -> bool:
+        expenses = self._get(account_number)
+        if expenses is None:
+            return False
+        try:
+            position = expenses.ids.index(int(expense_id))
+        except ValueError:
+            return False
+        expenses.delete(position, position + 1)
+        if not expenses:
+            del self._accounts[account_number]
+        return True
+
+    def recent(self, account_number: str, limit: int = 50, since: Optional[date] = None) -> List[Dict]:
+        """Up to `limit` expenses, newest first, optionally only those on or after `since`"""
+        expenses = self._get(account_number)
+        if expenses is None:
+            return []
+        first = bisect_left(expenses.days, since.toordinal()) if since else 0
+        start = max(first, len(expenses) - limit)
+        return [expenses.record(position) for position in range(len(expenses) - 1, start - 1, -1)]
+
+    def between(self, account_number: str, start: date, end: date) -> List[Dict]:
+        """Expenses dated start through end inclusive, oldest first"""
+        expenses = self._get(account_number)
+        if expenses is None:
+            return []
+        first = bisect_left(expenses.days, start.toordinal())
+        last = bisect_right(expenses.days, end.toordinal())
+        return [expenses.record(position) for position in range(first, last)]
+
+    def stats(self) -> Dict:
+        count = len(self)
+        nbytes = sum(expenses.nbytes() for expenses in self._accounts.values())
+        return {
+            'accounts': len(self._accounts),
+            'expenses': count,
+            'bytes': nbytes,
+            'bytes_per_expense': round(nbytes / count, 1) if count else 0
+        }
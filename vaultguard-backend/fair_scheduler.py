@@ -0,0 +1,109 @@
+"""
+VaultGuard Fair Scheduler
+Bounded thread-pool executor that serves waiting accounts round-robin
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict
+
+from config import PREDICTION_WORKERS
+from deadline import DeadlineExceeded, check
+
+
+class FairScheduler:
+    """
+    Runs blocking model work on at most max_workers threads.
+    When every slot is busy, waiters queue per account and freed slots go to
+    the accounts round-robin, so an account with many queued calls gets one
+    turn per round instead of the slots in arrival order.
+    """
+
+    def __init__(self, max_workers: int = PREDICTION_WORKERS):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prediction")
+        self._active = 0
+        self._waiting: Dict[str, Deque[asyncio.Future]] = {}
+        self._rotation: Deque[str] = deque()
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiting.values())
+
+    def _hand_over(self):
+        """Give a freed slot to the next account in the rotation"""
+        while self._rotation:
+            account = self._rotation.popleft()
+            waiters = self._waiting.get(account)
+            while waiters:
+                waiter = waiters.popleft()
+                if waiter.done():
+                    continue  # cancelled while queued
+                if waiters:
+                    self._rotation.append(account)
+                else:
+                    del self._waiting[account]
+                waiter.set_result(None)
+                return
+            self._waiting.pop(account, None)
+        self._active -= 1
+
+    async def _acquire(self, account: str):
+        if self._active < self.max_workers and not self._rotation:
+            self._active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        if account not in self._waiting:
+            self._waiting[account] = deque()
+            self._rotation.append(account)
+        self._waiting[account].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on
+                self._hand_over()
+            else:
+                waiters = self._waiting.get(account)
+                if waiters is not None and waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self._waiting[account]
+                        self._rotation.remove(account)
+            raise
+
+    async def run(self, account: str, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run fn(*args) on the executor once the account's turn comes.
+        Work whose request deadline passed while queued is never started. A
+        thread cannot be interrupted, so when the caller is cancelled mid-run
+        the slot stays taken until the thread finishes.
+        """
+        check()
+        await self._acquire(account)
+        try:
+            check()
+        except DeadlineExceeded:
+            self._hand_over()
+            raise
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(fn, *args)
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.cancel():
+                self._hand_over()
+            else:
+                # Already running on its thread: free the slot once it finishes
+                future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._hand_over))
+            raise
+        except BaseException:
+            self._hand_over()
+            raise
+        self._hand_over()
+        return result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
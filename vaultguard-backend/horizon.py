@@ -0,0 +1,75 @@
+"""
+VaultGuard Forecast Horizon
+Today and month end on each user's own calendar, cached until the user's next midnight
+"""
+import calendar
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from config import DEFAULT_TIMEZONE
+
+
+@lru_cache(maxsize=None)
+def resolve_timezone(name: str) -> ZoneInfo:
+    """ZoneInfo for an IANA timezone name; raises ValueError for unknown names"""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+class Horizon:
+    """The forecast window of one local day: today through the last day of the month, inclusive"""
+
+    def __init__(self, timezone_name: str, today: date, end: date, starts_at: datetime, expires_at: datetime):
+        self.timezone = timezone_name
+        self.today = today
+        self.end = end
+        # UTC instants of the local midnights the window is valid between
+        self.starts_at = starts_at
+        self.expires_at = expires_at
+
+    @property
+    def days_left(self) -> int:
+        return (self.end - self.today).days + 1
+
+    @property
+    def key(self) -> Tuple[date, date]:
+        """Identifies the window in cache keys: equal for the whole local day"""
+        return self.today, self.end
+
+    def covers(self, now: datetime) -> bool:
+        return self.starts_at <= now < self.expires_at
+
+
+class HorizonService:
+    """
+    Computes horizons from the real calendar in each user's timezone.
+    Every user of a timezone shares one horizon until that zone's midnight, so
+    it is worked out once per zone per day rather than per request.
+    """
+
+    def __init__(self, now_fn: Callable[[], datetime] = lambda: datetime.now(timezone.utc)):
+        self.now_fn = now_fn
+        self._horizons: Dict[str, Horizon] = {}
+
+    def for_timezone(self, timezone_name: str = DEFAULT_TIMEZONE) -> Horizon:
+        now = self.now_fn()
+        horizon = self._horizons.get(timezone_name)
+        if horizon is not None and horizon.covers(now):
+            return horizon
+
+        zone = resolve_timezone(timezone_name)
+        today = now.astimezone(zone).date()
+        end = today.replace(day=calendar.monthrange(today.year, today.month)[1])
+        # Converting to UTC resolves a midnight skipped or repeated by a DST change
+        starts_at = datetime.combine(today, time(0), tzinfo=zone).astimezone(timezone.utc)
+        expires_at = datetime.combine(today + timedelta(days=1), time(0), tzinfo=zone).astimezone(timezone.utc)
+        horizon = Horizon(timezone_name, today, end, starts_at, expires_at)
+        self._horizons[timezone_name] = horizon
+        return horizon
+
+    def for_user(self, user) -> Horizon:
+        return self.for_timezone(getattr(user, 'timezone', None) or DEFAULT_TIMEZONE)
@@ -4,21 +4,49 @@ Main FastAPI application for the VaultGuard financial management platform
 """
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
-from datetime import datetime, timedelta
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional, Dict, Literal, Tuple
+from datetime import date, datetime, timedelta
+import asyncio
+import heapq
+import itertools
+import logging
 import random
 
+import numpy as np
+
 from config import (
     DEFAULT_ACCOUNT_NUMBER,
     DEFAULT_IFSC_CODE,
     USER_NAME,
     USER_EMAIL,
     BANK_NAME,
-    ACCESS_TOKEN_EXPIRE_MINUTES
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    IMPORT_MAX_ROWS,
+    STREAM_TOKEN_EXPIRE_SECONDS,
+    WEB_CONCURRENCY
+)
+from bank_service import BankAPIService, BankUnavailableError, setup_demo_user
+from ml_models import backend_for_tier
+from events import (
+    EventBus,
+    TransactionEvent,
+    InvalidationEvent,
+    TRANSACTION_CREATED,
+    TRANSACTIONS_INVALIDATED
 )
-from bank_service import BankAPIService, setup_demo_user
-from ml_models import VaultGuardPredictor
+from prediction_service import PredictionService
+from streaming import DashboardStreamHub
+from bills import BillService, BillCreate, Bill
+from rate_limit import limit_reads, limit_ml, limit_writes
+from rollups import MonthlyRollupService
+from compression import CompressionMiddleware, compression_stats
+from deadline import DeadlineMiddleware, admission_stats
+from expense_store import ExpenseStore
+from analytics import AnalyticsService, ExpenseColumns, CATEGORIES, WEEKDAYS
+from horizon import Horizon, HorizonService, resolve_timezone
 from auth import (
     Token,
     UserLogin,
@@ -27,18 +55,29 @@ from auth import (
     authenticate_user,
     create_access_token,
     get_current_active_user,
+    security,
+    get_stream_session,
+    create_stream_token,
     get_user,
     add_user,
+    set_user_timezone,
     hash_password,
     generate_unique_account_number
 )
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="VaultGuard API",
     description="Backend API for VaultGuard - Financial Goal Management for Freelancers",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Time budget and admission control per request; added first so it sits inside
+# CORS and its 503/504 answers still reach the browser
+app.add_middleware(DeadlineMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -48,9 +87,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON bodies for clients that accept it (event streams excluded)
+app.add_middleware(CompressionMiddleware)
+
 # Initialize services
 bank_service = BankAPIService()
-predictor = VaultGuardPredictor(user_type='freelancer')
+event_bus = EventBus()
+prediction_service = PredictionService(bank_service, event_bus)
+stream_hub = DashboardStreamHub(event_bus)
+bill_service = BillService()
+rollup_service = MonthlyRollupService(event_bus)
+analytics_service = AnalyticsService()
+horizon_service = HorizonService()
+
+
+@app.on_event("startup")
+async def start_background_workers():
+    """Start background model retraining, forecast recompute and bill alert workers"""
+    if WEB_CONCURRENCY > 1:
+        # uvicorn reads WEB_CONCURRENCY as its worker count, so refuse rather than split state
+        raise RuntimeError(
+            "WEB_CONCURRENCY must be 1: budgets, expenses, bills, rate limits and "
+            "dashboard streams are per process and not yet shared through the cache"
+        )
+    prediction_service.start()
+    bill_service.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    """Stop background workers"""
+    await prediction_service.stop()
+    await bill_service.stop()
 
 
 # Pydantic models for request/response
@@ -84,6 +152,26 @@ class IncomeCreate(BaseModel):
     date: str
 
 
+class TransactionImport(BaseModel):
+    type: Literal["deposit", "withdraw"]
+    amount: float = Field(..., gt=0, description="Amount must be a positive number")
+    date: str  # "YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS"
+
+    @field_validator("date")
+    @classmethod
+    def check_date(cls, value: str) -> str:
+        # Rejected here, with the row's index, rather than failing its whole batch at the bank
+        try:
+            datetime.strptime(value, '%Y-%m-%d' if len(value) <= 10 else '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            raise ValueError("date must be YYYY-MM-DD or YYYY-MM-DD HH:MM:SS")
+        return value
+
+
+class StatementImport(BaseModel):
+    transactions: List[TransactionImport] = Field(..., max_length=IMPORT_MAX_ROWS)
+
+
 class BudgetSettings(BaseModel):
     monthly_budget: float = Field(..., gt=0, description="Monthly budget must be a positive number")
     fixed_bills: float = Field(..., ge=0, description="Fixed bills must be zero or positive")
@@ -108,8 +196,8 @@ class ChartData(BaseModel):
     isPredicted: Optional[bool] = False
 
 
-# In-memory storage for expenses (in production, use a database)
-expenses_db: Dict[str, Expense] = {}
+# Manually added expenses, in memory (in production, use a database)
+expense_store = ExpenseStore()
 budget_settings = BudgetSettings(monthly_budget=50000, fixed_bills=12000)
 
 
@@ -155,6 +243,12 @@ async def register(user_register: UserRegister):
             detail="Password must be at least 6 characters long"
         )
     
+    if user_register.timezone is not None:
+        try:
+            resolve_timezone(user_register.timezone)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     # Generate unique account number and IFSC code
     ifsc_code = "VAULT001"
     try:
@@ -185,7 +279,8 @@ async def register(user_register: UserRegister):
             name=user_register.name,
             hashed_password=hashed_password,
             account_number=account_number,
-            ifsc_code=ifsc_code
+            ifsc_code=ifsc_code,
+            timezone=user_register.timezone
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -218,8 +313,20 @@ async def health_check():
         }
 
 
+@app.get("/health/compression")
+async def compression_metrics():
+    """Bytes saved and CPU spent per encoding since this worker started"""
+    return compression_stats.snapshot()
+
+
+@app.get("/health/admission")
+async def admission_metrics():
+    """Requests running, queued for a slot and shed by admission control since this worker started"""
+    return admission_stats.snapshot()
+
+
 # ==================== User Endpoints ====================
-@app.get("/api/user/profile", response_model=UserProfile)
+@app.get("/api/user/profile", response_model=UserProfile, dependencies=[Depends(limit_reads)])
 async def get_user_profile(current_user: User = Depends(get_current_active_user)):
     """Get the current user's profile including bank balance"""
     try:
@@ -250,6 +357,14 @@ async def setup_user(current_user: User = Depends(get_current_active_user)):
         if current_user.account_number != DEFAULT_ACCOUNT_NUMBER:
             raise HTTPException(status_code=403, detail="Demo setup only available for demo account")
         result = await setup_demo_user()
+        await event_bus.publish(
+            TRANSACTIONS_INVALIDATED,
+            InvalidationEvent(
+                account_number=current_user.account_number,
+                ifsc_code=current_user.ifsc_code,
+                reason="demo_setup"
+            )
+        )
         return result
     except HTTPException:
         raise
@@ -257,8 +372,73 @@ async def setup_user(current_user: User = Depends(get_current_active_user)):
         raise HTTPException(status_code=500, detail=f"Failed to setup user: {str(e)}")
 
 
+class TimezoneUpdate(BaseModel):
+    timezone: str  # IANA name, e.g. "Asia/Kolkata"
+
+
+@app.put("/api/user/timezone", response_model=User)
+async def update_timezone(update: TimezoneUpdate, current_user: User = Depends(get_current_active_user)):
+    """Set the timezone month ends and forecast rollovers are computed in"""
+    try:
+        resolve_timezone(update.timezone)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    bill_service.set_timezone(current_user.account_number, update.timezone)
+    return set_user_timezone(current_user.email, update.timezone)
+
+
 # ==================== Expense Endpoints ====================
-@app.get("/api/expenses", response_model=List[Expense])
+def build_expenses(transactions: List[Dict], current_user: User) -> List[Expense]:
+    """Categorize bank withdrawals and merge in manually added expenses"""
+    expenses = []
+    expense_categories = {
+        (0, 200): ("daily", ["Coffee", "Snacks", "Transport"]),
+        (200, 500): ("daily", ["Lunch", "Dinner", "Fuel"]),
+        (500, 1500): ("irregular", ["Restaurant", "Entertainment", "Medicine"]),
+        (1500, 3000): ("irregular", ["Grocery Shopping", "Clothing"]),
+        (3000, 5000): ("regular", ["Electricity Bill", "Internet Bill", "Mobile Recharge"]),
+        (5000, float('inf')): ("regular", ["Rent", "Insurance", "EMI"])
+    }
+    
+    for tx in transactions:
+        # Only process withdrawals as expenses
+        if tx.get('sender_account') == current_user.account_number or \
+           tx.get('receiver_account') == 'CASH_WITHDRAWAL':
+            amount = float(tx['amount'])
+            
+            # Categorize based on amount
+            category = "daily"
+            name = "Expense"
+            
+            for (min_amt, max_amt), (cat, names) in expense_categories.items():
+                if min_amt <= amount < max_amt:
+                    category = cat
+                    name = random.choice(names)
+                    break
+            
+            # Built from bank data we already trust, so skip validation
+            expense = Expense.model_construct(
+                id=str(tx['id']),
+                name=name,
+                amount=amount,
+                category=category,
+                date=tx['timestamp'][:10]
+            )
+            expenses.append(expense)
+    
+    # Sort by date descending
+    expenses.sort(key=lambda x: x.date, reverse=True)
+    
+    # Merge in the user's most recent manually added expenses by date
+    manual = [
+        Expense.model_construct(**record)
+        for record in expense_store.recent(current_user.account_number, limit=50)
+    ]
+    merged = heapq.merge(expenses, manual, key=lambda x: x.date, reverse=True)
+    return list(itertools.islice(merged, 50))  # Return last 50 expenses
+
+
+@app.get("/api/expenses", response_model=List[Expense], dependencies=[Depends(limit_reads)])
 async def get_expenses(current_user: User = Depends(get_current_active_user)):
     """Get all expenses from bank transactions"""
     try:
@@ -267,86 +447,52 @@ async def get_expenses(current_user: User = Depends(get_current_active_user)):
             current_user.ifsc_code,
             "alltime"
         )
-        
-        expenses = []
-        expense_categories = {
-            (0, 200): ("daily", ["Coffee", "Snacks", "Transport"]),
-            (200, 500): ("daily", ["Lunch", "Dinner", "Fuel"]),
-            (500, 1500): ("irregular", ["Restaurant", "Entertainment", "Medicine"]),
-            (1500, 3000): ("irregular", ["Grocery Shopping", "Clothing"]),
-            (3000, 5000): ("regular", ["Electricity Bill", "Internet Bill", "Mobile Recharge"]),
-            (5000, float('inf')): ("regular", ["Rent", "Insurance", "EMI"])
-        }
-        
-        for tx in transactions:
-            # Only process withdrawals as expenses
-            if tx.get('sender_account') == current_user.account_number or \
-               tx.get('receiver_account') == 'CASH_WITHDRAWAL':
-                amount = float(tx['amount'])
-                
-                # Categorize based on amount
-                category = "daily"
-                name = "Expense"
-                
-                for (min_amt, max_amt), (cat, names) in expense_categories.items():
-                    if min_amt <= amount < max_amt:
-                        category = cat
-                        name = random.choice(names)
-                        break
-                
-                expense = Expense(
-                    id=str(tx['id']),
-                    name=name,
-                    amount=amount,
-                    category=category,
-                    date=tx['timestamp'][:10]
-                )
-                expenses.append(expense)
-        
-        # Sort by date descending
-        expenses.sort(key=lambda x: x.date, reverse=True)
-        
-        # Also include manually added expenses for this user
-        user_expense_key = f"{current_user.account_number}_expenses"
-        if user_expense_key in expenses_db:
-            for exp in expenses_db[user_expense_key].values():
-                expenses.append(exp)
-        
-        return expenses[:50]  # Return last 50 expenses
+        # Returned as a response so FastAPI does not validate and re-encode every row
+        return ORJSONResponse([exp.model_dump() for exp in build_expenses(transactions, current_user)])
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch expenses: {str(e)}")
 
 
-@app.post("/api/expenses", response_model=Expense)
+@app.post("/api/expenses", response_model=Expense, dependencies=[Depends(limit_writes)])
 async def add_expense(expense: ExpenseCreate, current_user: User = Depends(get_current_active_user)):
     """Add a new expense (creates a withdrawal in bank)"""
     try:
+        try:
+            expense_date = date.fromisoformat(expense.date[:10])
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Date must be YYYY-MM-DD")
+        
         # Create withdrawal in bank
+        timestamp = f"{expense.date} 12:00:00"
         await bank_service.withdraw(
             current_user.account_number,
             current_user.ifsc_code,
             expense.amount,
-            f"{expense.date} 12:00:00"
+            timestamp
         )
-        
-        # Store in local db with generated ID (per user)
-        new_id = str(datetime.now().timestamp())
-        new_expense = Expense(
-            id=new_id,
-            name=expense.name,
-            amount=expense.amount,
-            category=expense.category,
-            date=expense.date
+        await event_bus.publish(
+            TRANSACTION_CREATED,
+            TransactionEvent(
+                account_number=current_user.account_number,
+                ifsc_code=current_user.ifsc_code,
+                type="withdraw",
+                amount=expense.amount,
+                timestamp=timestamp
+            )
         )
         
-        user_expense_key = f"{current_user.account_number}_expenses"
-        if user_expense_key not in expenses_db:
-            expenses_db[user_expense_key] = {}
-        expenses_db[user_expense_key][new_id] = new_expense
-        
-        return new_expense
+        # Store locally with a generated ID (per user)
+        return expense_store.add(
+            current_user.account_number,
+            expense.name,
+            expense.amount,
+            expense.category,
+            expense_date
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to add expense: {str(e)}")
 
@@ -354,24 +500,33 @@ async def add_expense(expense: ExpenseCreate, current_user: User = Depends(get_c
 @app.delete("/api/expenses/{expense_id}")
 async def delete_expense(expense_id: str, current_user: User = Depends(get_current_active_user)):
     """Delete an expense (note: bank transaction cannot be reversed)"""
-    user_expense_key = f"{current_user.account_number}_expenses"
-    if user_expense_key in expenses_db and expense_id in expenses_db[user_expense_key]:
-        del expenses_db[user_expense_key][expense_id]
+    if expense_store.delete(current_user.account_number, expense_id):
         return {"message": "Expense deleted successfully"}
     return {"message": "Expense removed from view"}
 
 
 # ==================== Income Endpoints ====================
-@app.post("/api/income")
+@app.post("/api/income", dependencies=[Depends(limit_writes)])
 async def add_income(income: IncomeCreate, current_user: User = Depends(get_current_active_user)):
     """Add income (creates a deposit in bank)"""
     try:
         # Create deposit in bank
+        timestamp = f"{income.date} 12:00:00"
         await bank_service.deposit(
             current_user.account_number,
             current_user.ifsc_code,
             income.amount,
-            f"{income.date} 12:00:00"
+            timestamp
+        )
+        await event_bus.publish(
+            TRANSACTION_CREATED,
+            TransactionEvent(
+                account_number=current_user.account_number,
+                ifsc_code=current_user.ifsc_code,
+                type="deposit",
+                amount=income.amount,
+                timestamp=timestamp
+            )
         )
         
         return {
@@ -386,16 +541,17 @@ async def add_income(income: IncomeCreate, current_user: User = Depends(get_curr
 
 
 # ==================== Budget Endpoints ====================
-@app.get("/api/budget")
+@app.get("/api/budget", dependencies=[Depends(limit_reads)])
 async def get_budget(current_user: User = Depends(get_current_active_user)):
     """Get budget settings and current spending status"""
     try:
-        # Get user balance
-        user = await bank_service.get_user(current_user.account_number, current_user.ifsc_code)
-        balance = float(user['balance']) if user else 0
-        
-        # Get expenses for current month
-        expenses = await get_expenses(current_user)
+        # Cached account state (balance and transactions are fetched concurrently on a miss)
+        state = await prediction_service.get_state(
+            current_user.account_number,
+            current_user.ifsc_code
+        )
+        balance = state.balance
+        expenses = build_expenses(state.transactions, current_user)
         
         # Calculate totals by category (all expenses, not just current month)
         category_totals = {"regular": 0, "irregular": 0, "daily": 0}
@@ -413,9 +569,14 @@ async def get_budget(current_user: User = Depends(get_current_active_user)):
             "percentage_used": round((total_spent / budget_settings.monthly_budget) * 100, 1) if budget_settings.monthly_budget > 0 else 0,
             "category_totals": category_totals,
             "current_balance": balance,
-            "fixed_bills": budget_settings.fixed_bills
+            "fixed_bills": budget_settings.fixed_bills,
+            "stale": state.stale
         }
         
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Bank API timed out")
+    except BankUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get budget: {str(e)}")
 
@@ -428,35 +589,99 @@ async def update_budget(settings: BudgetSettings, current_user: User = Depends(g
     return {"message": "Budget settings updated", "settings": settings}
 
 
+# ==================== Bill Endpoints ====================
+def bills_due_in_horizon(current_user: User, horizon: Horizon) -> float:
+    """
+    Bills falling due in the remaining forecast horizon.
+    Users who have not registered any bills fall back to the flat fixed_bills budget setting.
+    """
+    if not bill_service.has_bills(current_user.account_number):
+        return budget_settings.fixed_bills
+    return bill_service.amount_due(current_user.account_number, horizon.today, horizon.end)
+
+
+@app.get("/api/bills", response_model=List[Bill], dependencies=[Depends(limit_reads)])
+async def get_bills(current_user: User = Depends(get_current_active_user)):
+    """List the user's recurring bills"""
+    return bill_service.list_bills(current_user.account_number)
+
+
+@app.post("/api/bills", response_model=Bill)
+async def add_bill(bill: BillCreate, current_user: User = Depends(get_current_active_user)):
+    """Register a recurring bill"""
+    try:
+        datetime.strptime(bill.due_date, '%Y-%m-%d')
+    except ValueError:
+        raise HTTPException(status_code=400, detail="due_date must be YYYY-MM-DD")
+    return bill_service.add_bill(current_user.account_number, bill, horizon_service.for_user(current_user).timezone)
+
+
+@app.put("/api/bills/{bill_id}", response_model=Bill)
+async def update_bill(bill_id: str, bill: BillCreate, current_user: User = Depends(get_current_active_user)):
+    """Update a recurring bill"""
+    try:
+        datetime.strptime(bill.due_date, '%Y-%m-%d')
+    except ValueError:
+        raise HTTPException(status_code=400, detail="due_date must be YYYY-MM-DD")
+    updated = bill_service.update_bill(
+        current_user.account_number, bill_id, bill, horizon_service.for_user(current_user).timezone
+    )
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Bill not found")
+    return updated
+
+
+@app.delete("/api/bills/{bill_id}")
+async def delete_bill(bill_id: str, current_user: User = Depends(get_current_active_user)):
+    """Delete a recurring bill"""
+    if not bill_service.delete_bill(current_user.account_number, bill_id):
+        raise HTTPException(status_code=404, detail="Bill not found")
+    return {"message": "Bill deleted successfully"}
+
+
+@app.get("/api/bills/upcoming", dependencies=[Depends(limit_reads)])
+async def get_upcoming_bills(days: int = 3, current_user: User = Depends(get_current_active_user)):
+    """Bills due within the next `days` days (including today)"""
+    if days < 0 or days > 366:
+        raise HTTPException(status_code=400, detail="days must be between 0 and 366")
+    today = horizon_service.for_user(current_user).today
+    upcoming = bill_service.upcoming(current_user.account_number, today, today + timedelta(days=days))
+    return {
+        "days": days,
+        "bills": upcoming,
+        "total": round(sum(item["amount"] for item in upcoming), 2)
+    }
+
+
 # ==================== Prediction Endpoints ====================
-@app.get("/api/predictions")
-async def get_predictions(current_user: User = Depends(get_current_active_user)):
-    """Get ML-based predictions for income and expenses"""
+@app.get("/api/predictions", dependencies=[Depends(limit_ml)])
+async def get_predictions(distribution: bool = False, current_user: User = Depends(get_current_active_user)):
+    """
+    Get ML-based predictions for income and expenses.
+    With ?distribution=true the summary also carries P10/P50/P90 of safe_to_spend
+    (null when the user's forecasting backend cannot provide them, or the history
+    is too short for the ML forecast to count).
+    """
     try:
-        # Get user balance
-        user = await bank_service.get_user(current_user.account_number, current_user.ifsc_code)
-        balance = float(user['balance']) if user else 0
+        # Today through month end on the user's own calendar
+        horizon = horizon_service.for_user(current_user)
+        days_left = horizon.days_left
+        fixed_bills_due = bills_due_in_horizon(current_user, horizon)
         
-        # Get all transactions
-        transactions = await bank_service.get_transactions(
+        # Get predictions from ML model (cached until the data changes or the user's day ends)
+        prediction, state = await prediction_service.get_prediction(
             current_user.account_number,
             current_user.ifsc_code,
-            "alltime"
-        )
-        
-        # Calculate days left in month
-        today = datetime.now()
-        days_in_month = 30
-        days_left = days_in_month - today.day + 1
-        
-        # Get predictions from ML model
-        prediction = predictor.get_full_prediction(
-            transactions=transactions,
-            account_number=current_user.account_number,
-            current_balance=balance,
-            days_left=days_left,
-            fixed_bills_due=budget_settings.fixed_bills
+            horizon=horizon,
+            fixed_bills_due=fixed_bills_due,
+            backend=backend_for_tier(current_user.tier)
         )
+        balance = prediction['summary']['current_balance']
+        income_details = prediction['income']
+        summary = prediction['summary']
+        if not distribution:
+            income_details = {k: v for k, v in income_details.items() if k != 'quantiles'}
+            summary = {k: v for k, v in summary.items() if k != 'safe_to_spend_distribution'}
         
         return {
             "predicted_income": prediction['income']['predicted_income'],
@@ -466,175 +691,367 @@ async def get_predictions(current_user: User = Depends(get_current_active_user))
             "confidence": prediction['summary']['overall_confidence'],
             "current_balance": balance,
             "days_left": days_left,
-            "income_details": prediction['income'],
+            "income_details": income_details,
             "expense_details": prediction['expense'],
-            "summary": prediction['summary']
+            "summary": summary,
+            "stale": state.stale
         }
         
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Bank API timed out")
+    except BankUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get predictions: {str(e)}")
 
 
-@app.get("/api/predictions/chart-data")
-async def get_chart_data(current_user: User = Depends(get_current_active_user)):
-    """Get historical and predicted data for charts"""
+# ==================== Streaming Endpoints ====================
+async def dashboard_figures(current_user: User) -> Dict:
+    """Current dashboard headline figures, from the cached account state"""
     try:
-        # Get all transactions
-        transactions = await bank_service.get_transactions(
+        state = await prediction_service.get_state(
+            current_user.account_number,
+            current_user.ifsc_code
+        )
+    except Exception as e:
+        # Leave the figures out; the client keeps showing the last values it received
+        logger.warning("Dashboard figures unavailable for %s: %s", current_user.account_number, e)
+        return {}
+
+    expenses = build_expenses(state.transactions, current_user)
+    category_totals = {"regular": 0, "irregular": 0, "daily": 0}
+    total_spent = 0
+    for exp in expenses:
+        if exp.category in category_totals:
+            category_totals[exp.category] += exp.amount
+        total_spent += exp.amount
+
+    figures = {
+        "current_balance": round(state.balance, 2),
+        "total_spent": round(total_spent, 2),
+        "category_totals": {key: round(value, 2) for key, value in category_totals.items()},
+        "stale": state.stale
+    }
+    if state.forecast is not None:
+        figures["safe_to_spend"] = state.forecast['summary']['safe_to_spend']
+        figures["predicted_income"] = state.forecast['income']['predicted_income']
+        figures["predicted_expense"] = state.forecast['expense']['predicted_expense']
+    return figures
+
+
+@app.post("/api/stream/token", dependencies=[Depends(limit_reads)])
+async def issue_stream_token(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Short-lived token for opening /api/stream. EventSource can only pass it in
+    the URL, so the login's own bearer token never goes there.
+    """
+    return {
+        "token": create_stream_token(current_user.email, credentials.credentials),
+        "expires_in": STREAM_TOKEN_EXPIRE_SECONDS
+    }
+
+
+@app.get("/api/stream")
+async def stream_dashboard(session: Tuple[User, str] = Depends(get_stream_session)):
+    """
+    Server-Sent Events stream of dashboard figures.
+    Sends a 'snapshot' on connect and a 'delta' with only the changed figures after
+    every write or forecast recompute, so clients no longer need to poll.
+    Opened with ?token= from POST /api/stream/token.
+    """
+    # One stream per login session: reconnecting replaces the previous stream
+    current_user, session_id = session
+
+    async def figures():
+        return await dashboard_figures(current_user)
+
+    return StreamingResponse(
+        stream_hub.stream(session_id, current_user.account_number, figures),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@app.get("/api/predictions/liquidity", dependencies=[Depends(limit_ml)])
+async def get_liquidity_simulation(current_user: User = Depends(get_current_active_user)):
+    """Probability of the balance going negative before month end, from a Monte Carlo simulation"""
+    try:
+        horizon = horizon_service.for_user(current_user)
+        
+        # Registered bills are paid on their due dates; the flat fixed_bills setting is spread evenly
+        bill_schedule = None
+        if bill_service.has_bills(current_user.account_number):
+            bill_schedule = [0.0] * horizon.days_left
+            for item in bill_service.upcoming(current_user.account_number, horizon.today, horizon.end):
+                due = datetime.strptime(item["due_date"], '%Y-%m-%d').date()
+                bill_schedule[(due - horizon.today).days] += item["amount"]
+        
+        simulation, state = await prediction_service.simulate(
             current_user.account_number,
             current_user.ifsc_code,
-            "alltime"
+            horizon=horizon,
+            fixed_bills_due=bills_due_in_horizon(current_user, horizon),
+            bill_schedule=bill_schedule
         )
+        return {**simulation, "current_balance": state.balance, "stale": state.stale}
         
-        # Process into monthly data
-        monthly_data = {}
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Bank API timed out")
+    except BankUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to simulate liquidity: {str(e)}")
+
+
+@app.get("/api/predictions/chart-data", dependencies=[Depends(limit_ml)])
+async def get_chart_data(months: int = 2, current_user: User = Depends(get_current_active_user)):
+    """Get historical and predicted data for charts (predictions for the next `months` months)"""
+    if months < 1 or months > 12:
+        raise HTTPException(status_code=400, detail="months must be between 1 and 12")
+    try:
+        horizon = horizon_service.for_user(current_user)
+        today = horizon.today
         
-        for tx in transactions:
-            date = datetime.fromisoformat(tx['timestamp'].replace('Z', '+00:00'))
-            month_key = date.strftime('%b')
-            month_order = date.month
-            
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {
-                    'income': 0,
-                    'expense': 0,
-                    'order': month_order
-                }
-            
-            amount = float(tx['amount'])
-            
-            if tx.get('sender_account') == 'EXTERNAL_DEPOSIT':
-                monthly_data[month_key]['income'] += amount
-            elif tx.get('sender_account') == current_user.account_number:
-                monthly_data[month_key]['expense'] += amount
+        # Same cached state and income model as /api/predictions, no second pipeline
+        forecast, state = await prediction_service.forecast_months(
+            current_user.account_number,
+            current_user.ifsc_code,
+            months,
+            backend_for_tier(current_user.tier),
+            today
+        )
         
-        # Sort by month order and convert to chart format
-        sorted_months = sorted(monthly_data.items(), key=lambda x: x[1]['order'])
+        # Monthly totals (closed months come from the rollup cache)
+        history = rollup_service.monthly(
+            current_user.account_number,
+            state.transactions,
+            current_month=today.strftime('%Y-%m'),
+            timezone_name=horizon.timezone
+        )
         
         chart_data = []
-        for month, data in sorted_months[-7:]:  # Last 7 months
+        for row in history[-7:]:  # Last 7 months
             chart_data.append({
-                'month': month,
-                'income': round(data['income'], 2),
-                'expense': round(data['expense'], 2),
-                'balance': round(data['income'] - data['expense'], 2),
+                'month': datetime.strptime(row['month'], '%Y-%m').strftime('%b'),
+                'key': row['month'],
+                'income': row['income'],
+                'expense': row['expense'],
+                'balance': row['balance'],
                 'isPredicted': False
             })
         
-        # Add predictions for next 2 months
-        predictions = await get_predictions(current_user)
-        
-        next_months = ['Feb', 'Mar']
-        for i, month in enumerate(next_months):
-            multiplier = 1 + (i * 0.05)
+        for bucket in forecast:
             chart_data.append({
-                'month': f'{month} (P)',
-                'income': round(predictions['predicted_income'] * multiplier, 2),
-                'expense': round(predictions['predicted_expense'] * (1 - i * 0.05), 2),
-                'balance': round(predictions['predicted_savings'] * (1 + i * 0.15), 2),
+                'month': f"{datetime.strptime(bucket['month'], '%Y-%m').strftime('%b')} (P)",
+                'key': bucket['month'],
+                'income': bucket['income'],
+                'expense': bucket['expense'],
+                'balance': bucket['balance'],
                 'isPredicted': True
             })
         
-        return {"data": chart_data}
+        return {"data": chart_data, "stale": state.stale}
         
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Bank API timed out")
+    except BankUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get chart data: {str(e)}")
 
 
-# ==================== Analytics Endpoints ====================
-@app.get("/api/analytics/category-summary")
-async def get_category_summary(current_user: User = Depends(get_current_active_user)):
-    """Get expense summary by category"""
+@app.get("/api/predictions/backends", dependencies=[Depends(limit_ml)])
+async def get_backend_report(current_user: User = Depends(get_current_active_user)):
+    """Accuracy-vs-latency report of every income forecasting backend on the user's history"""
     try:
-        expenses = await get_expenses(current_user)
+        transactions = await bank_service.get_transactions(
+            current_user.account_number,
+            current_user.ifsc_code,
+            "alltime"
+        )
         
-        totals = {"regular": 0, "irregular": 0, "daily": 0}
-        counts = {"regular": 0, "irregular": 0, "daily": 0}
+        # Four model fits: on the prediction executor, not the event loop
+        report = await prediction_service.executor.run(
+            current_user.account_number,
+            prediction_service.predictor.income_predictor.benchmark_backends,
+            transactions
+        )
+        return {
+            "active_backend": backend_for_tier(current_user.tier),
+            "backends": report
+        }
         
-        for exp in expenses:
-            if exp.category in totals:
-                totals[exp.category] += exp.amount
-                counts[exp.category] += 1
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Bank API timed out")
+    except BankUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to benchmark backends: {str(e)}")
+
+
+# ==================== Analytics Endpoints ====================
+CATEGORY_INFO = {
+    "regular": ("Regular", "Bills & subscriptions"),
+    "irregular": ("Irregular", "Shopping & occasions"),
+    "daily": ("Daily", "Food & transport")
+}
+
+
+async def expense_columns_for(current_user: User, start: Optional[date], end: Optional[date]) -> List[ExpenseColumns]:
+    """
+    The user's expense columns after checking the date range: bank withdrawals
+    from the cached account state, then manually added expenses in the range
+    """
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    state = await prediction_service.get_state(current_user.account_number, current_user.ifsc_code)
+    columns = [await analytics_service.columns(state)]
+    manual = expense_store.between(current_user.account_number, start or date.min, end or date.max)
+    if manual:
+        columns.append(ExpenseColumns.from_expenses(manual))
+    return columns
+
+
+@app.get("/api/analytics/category-summary", dependencies=[Depends(limit_reads)])
+async def get_category_summary(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get expense summary by category, start through end inclusive (default: all history)"""
+    try:
+        totals = np.zeros(len(CATEGORIES))
+        counts = np.zeros(len(CATEGORIES), dtype=np.int64)
+        for columns in await expense_columns_for(current_user, start, end):
+            column_totals, column_counts = columns.category_totals(start, end)
+            totals += column_totals
+            counts += column_counts
         
         return {
             "categories": [
                 {
-                    "name": "Regular",
-                    "id": "regular",
-                    "total": round(totals["regular"], 2),
-                    "count": counts["regular"],
-                    "description": "Bills & subscriptions"
-                },
-                {
-                    "name": "Irregular",
-                    "id": "irregular",
-                    "total": round(totals["irregular"], 2),
-                    "count": counts["irregular"],
-                    "description": "Shopping & occasions"
-                },
-                {
-                    "name": "Daily",
-                    "id": "daily",
-                    "total": round(totals["daily"], 2),
-                    "count": counts["daily"],
-                    "description": "Food & transport"
+                    "name": CATEGORY_INFO[category][0],
+                    "id": category,
+                    "total": round(float(total), 2),
+                    "count": int(count),
+                    "description": CATEGORY_INFO[category][1]
                 }
+                for category, total, count in zip(CATEGORIES, totals, counts)
             ],
-            "total": round(sum(totals.values()), 2)
+            "total": round(float(totals.sum()), 2),
+            "start": start,
+            "end": end
         }
         
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Bank API timed out")
+    except BankUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get category summary: {str(e)}")
 
 
-@app.get("/api/analytics/weekly-spending")
-async def get_weekly_spending(current_user: User = Depends(get_current_active_user)):
-    """Get weekly spending breakdown for charts"""
+@app.get("/api/analytics/weekly-spending", dependencies=[Depends(limit_reads)])
+async def get_weekly_spending(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get spending per weekday and category for charts, start through end inclusive (default: all history)"""
     try:
-        expenses = await get_expenses(current_user)
+        matrix = sum(
+            columns.weekday_by_category(start, end)
+            for columns in await expense_columns_for(current_user, start, end)
+        ).round(2)
         
-        # Group by day of week
-        days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        daily_data = {day: {"regular": 0, "irregular": 0, "daily": 0} for day in days}
+        result = [
+            {"day": day, **{category: float(total) for category, total in zip(CATEGORIES, row)}}
+            for day, row in zip(WEEKDAYS, matrix)
+        ]
         
-        for exp in expenses:
-            try:
-                date = datetime.strptime(exp.date, '%Y-%m-%d')
-                day_name = days[date.weekday()]
-                if exp.category in daily_data[day_name]:
-                    daily_data[day_name][exp.category] += exp.amount
-            except:
-                continue
-        
-        result = []
-        for day in days:
-            result.append({
-                "day": day,
-                "regular": round(daily_data[day]["regular"], 2),
-                "irregular": round(daily_data[day]["irregular"], 2),
-                "daily": round(daily_data[day]["daily"], 2)
-            })
-        
-        return {"data": result}
+        return {"data": result, "start": start, "end": end}
         
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Bank API timed out")
+    except BankUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get weekly spending: {str(e)}")
 
 
-@app.get("/api/transactions")
-async def get_transactions(current_user: User = Depends(get_current_active_user)):
-    """Get raw transactions from bank"""
+def transaction_columns(transactions: List[Dict]) -> Dict:
+    """Column-per-field form of a transaction feed, with amounts as a float array"""
+    return {
+        "id": [tx.get('id') for tx in transactions],
+        "sender_account": [tx.get('sender_account') for tx in transactions],
+        "receiver_account": [tx.get('receiver_account') for tx in transactions],
+        "amount": np.array([tx.get('amount') or 0 for tx in transactions], dtype=float),
+        "timestamp": [tx.get('timestamp') for tx in transactions]
+    }
+
+
+@app.get("/api/transactions", dependencies=[Depends(limit_reads)])
+async def get_transactions(
+    format: Literal["rows", "columnar"] = "rows",
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get raw transactions from bank.
+    The bank's rows are passed straight to orjson instead of through FastAPI's
+    encoder; format=columnar returns one array per field, which is smaller and
+    encodes faster for large feeds.
+    """
     try:
         transactions = await bank_service.get_transactions(
             current_user.account_number,
             current_user.ifsc_code,
             "alltime"
         )
-        return {"transactions": transactions, "count": len(transactions)}
+        if format == "columnar":
+            return ORJSONResponse({"columns": transaction_columns(transactions), "count": len(transactions)})
+        return ORJSONResponse({"transactions": transactions, "count": len(transactions)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get transactions: {str(e)}")
 
 
+@app.post("/api/transactions/import", dependencies=[Depends(limit_writes)])
+async def import_statement(statement: StatementImport, current_user: User = Depends(get_current_active_user)):
+    """Bulk import a statement of deposits/withdrawals, applied in the given order"""
+    try:
+        rows = [
+            {
+                'account_number': current_user.account_number,
+                'ifsc_code': current_user.ifsc_code,
+                'type': tx.type,
+                'amount': tx.amount,
+                'timestamp': tx.date if len(tx.date) > 10 else f"{tx.date} 12:00:00"
+            }
+            for tx in statement.transactions
+        ]
+        result = await bank_service.bulk_transactions(rows)
+        await event_bus.publish(
+            TRANSACTIONS_INVALIDATED,
+            InvalidationEvent(
+                account_number=current_user.account_number,
+                ifsc_code=current_user.ifsc_code,
+                reason="statement_import"
+            )
+        )
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import statement: {str(e)}")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8080)
@@ -4,10 +4,453 @@ Based on final_version.py with enhancements for API integration
 """
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from typing import List, Dict, Tuple
-from datetime import datetime, timedelta
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from typing import List, Dict, Tuple, Optional, Union
+from datetime import datetime, date as Date, timedelta
+from collections import deque
+import copy
 import random
+import time
+
+from config import (
+    INCOME_FORECASTER_BACKEND,
+    INCOME_FORECASTER_TIER_BACKENDS,
+    INCOME_RF_N_ESTIMATORS,
+    INCOME_RF_MAX_DEPTH,
+    INCOME_RF_N_JOBS,
+    INCOME_RF_WARM_START,
+    INCOME_RF_WARM_START_STEP,
+    INCOME_RF_ADAPTIVE,
+    INCOME_RF_MIN_ESTIMATORS,
+    INCOME_RF_TREES_PER_DAY,
+    EXPENSE_LOOKBACK_WEEKS,
+    SIMULATION_LOOKBACK_DAYS
+)
+from simulation import simulate_liquidity
+from rollups import aggregate_monthly, rollup_rows
+
+
+FEATURES = ['day_of_week', 'is_weekend', 'lag_1_income', 'rolling_avg']
+# Bump whenever the meaning of the features changes, so persisted models are retrained
+FEATURES_VERSION = 2
+ROLLING_WINDOW = 7
+# Bands reported by forecasts with quantiles (P10 / P50 / P90)
+INCOME_QUANTILES = (0.1, 0.5, 0.9)
+
+
+def _welford_add(n: int, mean: float, m2: float, value: float) -> Tuple[int, float, float]:
+    """Add a value to running (count, mean, sum of squared deviations)"""
+    n += 1
+    delta = value - mean
+    mean += delta / n
+    return n, mean, m2 + delta * (value - mean)
+
+
+def _welford_remove(n: int, mean: float, m2: float, value: float) -> Tuple[int, float, float]:
+    """Remove a previously added value from running (count, mean, sum of squared deviations)"""
+    n -= 1
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = value - mean
+    mean -= delta / n
+    return n, mean, max(0.0, m2 - delta * (value - mean))
+
+
+class IncomeFeatures:
+    """
+    Streaming feature engine over a dense daily income series.
+    Days are pushed in date order (days without income are filled with zeros) and
+    each day's lag and 7-day rolling mean/std are derived from running Welford
+    statistics, so extending the series by one day is O(1) instead of a rebuild.
+    A row only depends on earlier days, so the latest day can keep accumulating
+    deposits after its row was produced.
+    """
+    
+    def __init__(self):
+        self.last_date: Optional[Date] = None
+        self.dates: List[Date] = []
+        self.day_of_week: List[int] = []
+        self.is_weekend: List[int] = []
+        self.lag_1_income: List[float] = []
+        self.rolling_avg: List[float] = []
+        self.rolling_std: List[float] = []
+        self.history: List[float] = []
+        self._window: deque = deque()
+        # Welford (count, mean, m2) of the rolling window and of the whole series
+        self._window_stats = (0, 0.0, 0.0)
+        self._series_stats = (0, 0.0, 0.0)
+    
+    @classmethod
+    def from_daily(cls, daily_income: Dict) -> 'IncomeFeatures':
+        """Build the features for daily income totals keyed by date"""
+        features = cls()
+        for day in sorted(daily_income):
+            features.add(day, daily_income[day])
+        return features
+    
+    def copy(self) -> 'IncomeFeatures':
+        """Independent copy, e.g. for a worker thread while new events keep arriving"""
+        return copy.deepcopy(self)
+    
+    @property
+    def mean(self) -> float:
+        """Mean daily income of the whole series"""
+        return self._series_stats[1]
+    
+    @property
+    def std(self) -> float:
+        """Sample standard deviation of the whole series"""
+        n, _, m2 = self._series_stats
+        return float(np.sqrt(m2 / (n - 1))) if n > 1 else 0.0
+    
+    def _push(self, day: Date, value: float):
+        day_of_week = day.weekday()
+        window_n, window_mean, window_m2 = self._window_stats
+        self.dates.append(day)
+        self.day_of_week.append(day_of_week)
+        self.is_weekend.append(1 if day_of_week >= 5 else 0)
+        self.lag_1_income.append(self.history[-1] if self.history else 0)
+        # Mean of the last 7 days, or of all days while there are fewer than 7
+        self.rolling_avg.append(window_mean)
+        self.rolling_std.append(float(np.sqrt(window_m2 / window_n)) if window_n else 0.0)
+        
+        self.history.append(value)
+        self._series_stats = _welford_add(*self._series_stats, value)
+        if len(self._window) == ROLLING_WINDOW:
+            self._window_stats = _welford_remove(*self._window_stats, self._window.popleft())
+        self._window.append(value)
+        self._window_stats = _welford_add(*self._window_stats, value)
+        self.last_date = day
+    
+    def add(self, day: Date, amount: float) -> bool:
+        """
+        Fold income received on `day` into the series, filling any gap days with zeros.
+        Returns False (and changes nothing) for a day before the latest one; the
+        caller has to rebuild from its daily totals in that case.
+        """
+        if self.last_date is not None and day < self.last_date:
+            return False
+        
+        if self.last_date is not None and day == self.last_date:
+            old = self.history[-1]
+            new = old + amount
+            self.history[-1] = new
+            self._window[-1] = new
+            self._series_stats = _welford_add(*_welford_remove(*self._series_stats, old), new)
+            self._window_stats = _welford_add(*_welford_remove(*self._window_stats, old), new)
+            return True
+        
+        if self.last_date is not None:
+            gap = self.last_date + timedelta(days=1)
+            while gap < day:
+                self._push(gap, 0.0)
+                gap += timedelta(days=1)
+        self._push(day, amount)
+        return True
+    
+    def frame(self) -> pd.DataFrame:
+        """Feature DataFrame (one row per day, target = that day's income)"""
+        return pd.DataFrame({
+            'date': self.dates,
+            'day_of_week': self.day_of_week,
+            'is_weekend': self.is_weekend,
+            'lag_1_income': self.lag_1_income,
+            'rolling_avg': self.rolling_avg,
+            'rolling_std': self.rolling_std,
+            'target': self.history
+        })
+    
+    def __len__(self) -> int:
+        return len(self.history)
+
+
+class IncomeForecaster:
+    """
+    Interface for income forecasting backends.
+    fit() learns from the prepared feature frame, optionally growing a previously
+    fitted model of the same backend; forecast() returns one non-negative income
+    prediction per future day.
+    """
+    name = 'base'
+    
+    def fit(self, df: pd.DataFrame, previous: Optional['IncomeForecaster'] = None) -> 'IncomeForecaster':
+        raise NotImplementedError
+    
+    def forecast(self, history: List[float], days_left: int, last_date: Optional[Date] = None) -> np.ndarray:
+        raise NotImplementedError
+    
+    def forecast_with_quantiles(
+        self,
+        history: List[float],
+        days_left: int,
+        quantiles: Tuple[float, ...] = INCOME_QUANTILES,
+        last_date: Optional[Date] = None
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """forecast() plus quantiles of the horizon total (None if the backend has no spread)"""
+        return self.forecast(history, days_left, last_date), None
+
+
+class FeatureForecaster(IncomeForecaster):
+    """
+    Base for regressors over the lag/rolling features.
+    Forecasts are rolled out one day at a time, feeding each prediction back as the next lag.
+    """
+    
+    def _fit_matrix(self, X: np.ndarray, y: np.ndarray, previous: Optional[IncomeForecaster] = None):
+        raise NotImplementedError
+    
+    def _predict_row(self, row: np.ndarray) -> float:
+        raise NotImplementedError
+    
+    def fit(self, df: pd.DataFrame, previous: Optional[IncomeForecaster] = None) -> 'FeatureForecaster':
+        self._fit_matrix(df[FEATURES].to_numpy(dtype=float), df['target'].to_numpy(dtype=float), previous)
+        return self
+    
+    def forecast(self, history: List[float], days_left: int, last_date: Optional[Date] = None) -> np.ndarray:
+        return self._rollout(history, days_left, last_date)[0]
+    
+    def _rollout(
+        self,
+        history: List[float],
+        days_left: int,
+        last_date: Optional[Date] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Daily predictions and the feature row each one was made from.
+        Weekdays follow the calendar from last_date, the date of the last
+        history day, as in training; without it they fall back to the position.
+        """
+        preds = np.zeros(days_left)
+        rows = np.zeros((days_left, len(FEATURES)))
+        curr_lag = history[-1] if history else 0
+        curr_rolling = sum(history[-7:]) / 7 if len(history) >= 7 else (sum(history) / len(history) if history else 0)
+        
+        for d in range(days_left):
+            if last_date is not None:
+                dow = (last_date + timedelta(days=d + 1)).weekday()
+            else:
+                dow = (len(history) + d) % 7
+            is_weekend = 1 if dow >= 5 else 0
+            row = np.array([[dow, is_weekend, curr_lag, curr_rolling]], dtype=float)
+            
+            daily_pred = max(0, self._predict_row(row))
+            preds[d] = daily_pred
+            rows[d] = row[0]
+            
+            curr_lag = daily_pred
+            curr_rolling = ((curr_rolling * 6) + daily_pred) / 7
+        
+        return preds, rows
+
+
+class RandomForestForecaster(FeatureForecaster):
+    """
+    Random forest over the lag/rolling features (the original VaultGuard model).
+    Trees are fitted in parallel; size, depth and warm-start growth come from config.
+    """
+    name = 'random_forest'
+    
+    def __init__(
+        self,
+        n_estimators: int = INCOME_RF_N_ESTIMATORS,
+        max_depth: Optional[int] = INCOME_RF_MAX_DEPTH,
+        n_jobs: int = INCOME_RF_N_JOBS,
+        warm_start: bool = INCOME_RF_WARM_START,
+        adaptive: bool = INCOME_RF_ADAPTIVE
+    ):
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.n_jobs = n_jobs
+        self.warm_start = warm_start
+        self.adaptive = adaptive
+        # Warm-start retrains since the forest was last fitted from scratch
+        self.generation = 0
+        self.model = None
+    
+    def target_estimators(self, days_history: int) -> int:
+        """Forest size for a history length (fixed unless adaptive mode is on)"""
+        if not self.adaptive:
+            return self.n_estimators
+        scaled = int(round(days_history * INCOME_RF_TREES_PER_DAY))
+        return max(INCOME_RF_MIN_ESTIMATORS, min(self.n_estimators, scaled))
+    
+    def _fit_matrix(self, X: np.ndarray, y: np.ndarray, previous: Optional[IncomeForecaster] = None):
+        target = self.target_estimators(len(y))
+        
+        prev_model = getattr(previous, 'model', None) if isinstance(previous, RandomForestForecaster) else None
+        if self.warm_start and prev_model is not None:
+            # Grow a copy of the previous forest; the original may still be serving requests
+            self.model = copy.deepcopy(prev_model)
+            self.generation = getattr(previous, 'generation', 0) + 1
+            self.model.set_params(
+                n_estimators=len(prev_model.estimators_) + INCOME_RF_WARM_START_STEP,
+                warm_start=True,
+                n_jobs=self.n_jobs,
+                # Fresh seeds, or a rotated forest would redraw the same bootstraps every retrain
+                random_state=42 + self.generation
+            )
+        else:
+            self.generation = 0
+            self.model = RandomForestRegressor(
+                n_estimators=target,
+                max_depth=self.max_depth,
+                n_jobs=self.n_jobs,
+                random_state=42
+            )
+        
+        self.model.fit(X, y)
+        if len(self.model.estimators_) > target:
+            # Past the cap, retire the oldest trees so the forest rotates toward recent data
+            self.model.estimators_ = self.model.estimators_[-target:]
+        # Single-row predictions in the rollout are slower with a thread pool
+        self.model.set_params(n_estimators=len(self.model.estimators_), n_jobs=1, warm_start=False)
+    
+    def _predict_row(self, row: np.ndarray) -> float:
+        return float(self.model.predict(row)[0])
+    
+    def forecast_with_quantiles(
+        self,
+        history: List[float],
+        days_left: int,
+        quantiles: Tuple[float, ...] = INCOME_QUANTILES,
+        last_date: Optional[Date] = None
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Income bands from the spread of the individual trees. The forest's rollout
+        is reused: every tree scores the rolled-out feature matrix in one predict
+        call (no refit), and quantiles are taken over the per-tree horizon totals.
+        """
+        preds, rows = self._rollout(history, days_left, last_date)
+        if days_left <= 0:
+            return preds, None
+        per_tree = np.stack([tree.predict(rows) for tree in self.model.estimators_])
+        totals = np.clip(per_tree, 0, None).sum(axis=1)
+        return preds, np.quantile(totals, quantiles)
+
+
+class HistGradientBoostingForecaster(FeatureForecaster):
+    """Histogram gradient-boosted trees; far cheaper than a forest for similar accuracy"""
+    name = 'hist_gradient_boosting'
+    
+    def __init__(self, max_iter: int = 50, min_samples_leaf: int = 5):
+        self.max_iter = max_iter
+        # sklearn's default of 20 leaves histories under ~40 days with no split at all
+        self.min_samples_leaf = min_samples_leaf
+        self.model = None
+    
+    def _fit_matrix(self, X: np.ndarray, y: np.ndarray, previous: Optional[IncomeForecaster] = None):
+        self.model = HistGradientBoostingRegressor(
+            max_iter=self.max_iter,
+            min_samples_leaf=self.min_samples_leaf,
+            random_state=42
+        )
+        self.model.fit(X, y)
+    
+    def _predict_row(self, row: np.ndarray) -> float:
+        return float(self.model.predict(row)[0])
+
+
+class RidgeForecaster(FeatureForecaster):
+    """
+    Closed-form ridge regression.
+    Day of week is one-hot encoded since a linear model cannot use it as an ordinal.
+    """
+    name = 'ridge'
+    
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.coef = None
+        self.intercept = 0.0
+    
+    @staticmethod
+    def _design(X: np.ndarray) -> np.ndarray:
+        one_hot_dow = np.eye(7)[X[:, 0].astype(int) % 7]
+        return np.hstack([one_hot_dow, X[:, 2:]])
+    
+    def _fit_matrix(self, X: np.ndarray, y: np.ndarray, previous: Optional[IncomeForecaster] = None):
+        A = self._design(X)
+        x_mean = A.mean(axis=0)
+        y_mean = y.mean()
+        A_c = A - x_mean
+        gram = A_c.T @ A_c + self.alpha * np.eye(A.shape[1])
+        self.coef = np.linalg.solve(gram, A_c.T @ (y - y_mean))
+        self.intercept = float(y_mean - x_mean @ self.coef)
+    
+    def _predict_row(self, row: np.ndarray) -> float:
+        return float(self._design(row)[0] @ self.coef + self.intercept)
+
+
+class HoltWintersForecaster(IncomeForecaster):
+    """
+    Additive Holt-Winters exponential smoothing with weekly seasonality.
+    Works on the income series directly and needs no per-day model calls.
+    """
+    name = 'holt_winters'
+    season_length = 7
+    
+    def __init__(self, alpha: float = 0.3, beta: float = 0.05, gamma: float = 0.2):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.level = 0.0
+        self.trend = 0.0
+        self.season = np.zeros(self.season_length)
+        self.n_obs = 0
+    
+    def fit(self, df: pd.DataFrame, previous: Optional[IncomeForecaster] = None) -> 'HoltWintersForecaster':
+        y = df['target'].to_numpy(dtype=float)
+        m = self.season_length
+        self.n_obs = len(y)
+        
+        if len(y) < 2 * m:
+            # Too short for seasonality: flat forecast at the mean
+            self.level = float(y.mean()) if len(y) else 0.0
+            self.trend = 0.0
+            self.season = np.zeros(m)
+            return self
+        
+        self.level = y[:m].mean()
+        self.trend = (y[m:2 * m].mean() - y[:m].mean()) / m
+        self.season = y[:m] - self.level
+        
+        for t in range(m, len(y)):
+            s_idx = t % m
+            prev_level = self.level
+            self.level = self.alpha * (y[t] - self.season[s_idx]) + (1 - self.alpha) * (self.level + self.trend)
+            self.trend = self.beta * (self.level - prev_level) + (1 - self.beta) * self.trend
+            self.season[s_idx] = self.gamma * (y[t] - self.level) + (1 - self.gamma) * self.season[s_idx]
+        
+        self.level = float(self.level)
+        self.trend = float(self.trend)
+        return self
+    
+    def forecast(self, history: List[float], days_left: int, last_date: Optional[Date] = None) -> np.ndarray:
+        # Seasons are indexed by position in training too, so no calendar is needed
+        steps = np.arange(1, days_left + 1)
+        season_idx = (self.n_obs + steps - 1) % self.season_length
+        preds = self.level + steps * self.trend + self.season[season_idx]
+        return np.maximum(preds, 0)
+
+
+FORECASTER_BACKENDS = {
+    RandomForestForecaster.name: RandomForestForecaster,
+    HistGradientBoostingForecaster.name: HistGradientBoostingForecaster,
+    RidgeForecaster.name: RidgeForecaster,
+    HoltWintersForecaster.name: HoltWintersForecaster,
+}
+
+
+def get_forecaster(backend: Optional[str] = None) -> IncomeForecaster:
+    """Instantiate a forecasting backend by name (defaults to the deployment backend)"""
+    backend = backend or INCOME_FORECASTER_BACKEND
+    if backend not in FORECASTER_BACKENDS:
+        raise ValueError(f"Unknown forecaster backend: {backend}")
+    return FORECASTER_BACKENDS[backend]()
+
+
+def backend_for_tier(tier: Optional[str]) -> str:
+    """Resolve the forecasting backend for a user tier, falling back to the deployment default"""
+    return INCOME_FORECASTER_TIER_BACKENDS.get(tier or '', INCOME_FORECASTER_BACKEND)
 
 
 class IncomePredictor:
@@ -16,50 +459,116 @@ class IncomePredictor:
     Combines ML predictions with statistical fallback based on data availability.
     """
     
-    def __init__(self, user_type: str = 'freelancer'):
+    def __init__(self, user_type: str = 'freelancer', backend: Optional[str] = None):
         self.user_type = user_type
+        self.backend = backend
         self.model = None
         
-    def prepare_features(self, transactions: List[Dict]) -> pd.DataFrame:
-        """Convert transactions to feature DataFrame for training"""
-        # Filter income transactions (deposits)
-        income_data = []
-        
-        # Group by date and sum incomes
+    @staticmethod
+    def aggregate_daily_income(transactions: List[Dict]) -> Dict:
+        """Sum income (deposits) per calendar date"""
         daily_income = {}
         for tx in transactions:
             if tx.get('sender_account') == 'EXTERNAL_DEPOSIT':
                 date = datetime.fromisoformat(tx['timestamp'].replace('Z', '+00:00')).date()
                 daily_income[date] = daily_income.get(date, 0) + float(tx['amount'])
+        return daily_income
+    
+    def prepare_features(self, transactions: List[Dict]) -> pd.DataFrame:
+        """Convert transactions to feature DataFrame for training"""
+        return self.features_from_daily(self.aggregate_daily_income(transactions))
+    
+    def features_from_daily(self, daily_income: Dict) -> Tuple[pd.DataFrame, List[float]]:
+        """Build the feature DataFrame and income history from daily income totals"""
+        features = IncomeFeatures.from_daily(daily_income)
+        return features.frame(), features.history
+    
+    def _fit_model(
+        self,
+        df: pd.DataFrame,
+        backend: Optional[str] = None,
+        previous: Optional[IncomeForecaster] = None
+    ) -> Optional[IncomeForecaster]:
+        """Fit a forecasting backend on prepared features (None when there is too little history)"""
+        if len(df) < 5:
+            return None
+        return get_forecaster(backend or self.backend).fit(df, previous)
+    
+    def fit(
+        self,
+        transactions: List[Dict],
+        backend: Optional[str] = None,
+        previous: Optional[IncomeForecaster] = None
+    ) -> Optional[IncomeForecaster]:
+        """Fit a model without predicting, for background training and persistence"""
+        df, _ = self.prepare_features(transactions)
+        return self._fit_model(df, backend, previous)
+    
+    def train_and_predict(
+        self,
+        transactions: List[Dict],
+        days_left: int = 15,
+        model: Optional[IncomeForecaster] = None
+    ) -> Dict:
+        """Train model and predict future income (reuses a pre-fitted model when given)"""
+        return self.predict_from_daily(self.aggregate_daily_income(transactions), days_left, model)
+    
+    @staticmethod
+    def hybrid_weights(days_history: int) -> Tuple[float, float, str, int]:
+        """(ML weight, statistical weight, method, confidence) for a history length"""
+        if days_history < 30:
+            return 0.0, 1.0, 'statistical', min(50, days_history * 2)
+        if days_history < 90:
+            return 0.7, 0.3, 'hybrid', 50 + min(30, (days_history - 30))
+        return 0.9, 0.1, 'ml', 80 + min(15, (days_history - 90) // 10)
+    
+    @staticmethod
+    def safety_factor(volatility: float) -> float:
+        """Haircut applied to predicted income, larger for volatile earners"""
+        if volatility > 2000:
+            return 0.70
+        if volatility > 500:
+            return 0.85
+        return 0.95
+    
+    def forecast_daily(
+        self,
+        daily_income: Union[Dict, IncomeFeatures],
+        days: int,
+        model: Optional[IncomeForecaster] = None
+    ) -> np.ndarray:
+        """
+        Safe income for each of the `days` days after the last history day: one
+        rollout of the model, blended and haircut exactly like predict_from_daily
+        """
+        features = daily_income if isinstance(daily_income, IncomeFeatures) else IncomeFeatures.from_daily(daily_income)
+        days_history = len(features)
+        if days_history == 0 or days <= 0:
+            return np.zeros(max(days, 0))
         
-        # Sort by date
-        sorted_dates = sorted(daily_income.keys())
-        history = []
-        
-        for i, date in enumerate(sorted_dates):
-            day_of_week = date.weekday()
-            is_weekend = 1 if day_of_week >= 5 else 0
-            income = daily_income[date]
-            
-            lag_1 = history[-1] if history else 0
-            rolling_7 = sum(history[-7:]) / 7 if len(history) >= 7 else (sum(history) / len(history) if history else 0)
-            
-            income_data.append({
-                'date': date,
-                'day_of_week': day_of_week,
-                'is_weekend': is_weekend,
-                'lag_1_income': lag_1,
-                'rolling_avg': rolling_7,
-                'target': income
-            })
-            history.append(income)
+        ml_daily = np.zeros(days)
+        if days_history >= 5:
+            forecaster = model if model is not None else self._fit_model(features.frame())
+            ml_daily = forecaster.forecast(features.history, days, features.last_date)
         
-        return pd.DataFrame(income_data), history
+        weight_ml, weight_stat, _, _ = self.hybrid_weights(days_history)
+        return (ml_daily * weight_ml + features.mean * weight_stat) * self.safety_factor(features.std)
     
-    def train_and_predict(self, transactions: List[Dict], days_left: int = 15) -> Dict:
-        """Train model and predict future income"""
-        df, history = self.prepare_features(transactions)
-        days_history = len(df)
+    def predict_from_daily(
+        self,
+        daily_income: Union[Dict, IncomeFeatures],
+        days_left: int = 15,
+        model: Optional[IncomeForecaster] = None,
+        quantiles: bool = False
+    ) -> Dict:
+        """
+        Predict future income from daily income totals, or from features maintained incrementally.
+        With quantiles=True, backends that support it also report P10/P50/P90 income bands
+        (None while the history is too short for the ML forecast to carry any weight).
+        """
+        features = daily_income if isinstance(daily_income, IncomeFeatures) else IncomeFeatures.from_daily(daily_income)
+        history = features.history
+        days_history = len(features)
         
         if days_history == 0:
             return {
@@ -71,67 +580,48 @@ class IncomePredictor:
             }
         
         # Statistical prediction (baseline)
-        statistical_daily_avg = df['target'].mean() if not df.empty else 0
+        statistical_daily_avg = features.mean
         statistical_total_pred = statistical_daily_avg * days_left
         
         # ML prediction
         ml_total_pred = 0
+        ml_quantiles = None
         
-        if days_history >= 5:
-            features = ['day_of_week', 'is_weekend', 'lag_1_income', 'rolling_avg']
-            self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-            self.model.fit(df[features], df['target'])
-            
-            curr_lag = history[-1] if history else 0
-            curr_rolling = sum(history[-7:]) / 7 if len(history) >= 7 else (sum(history) / len(history) if history else 0)
-            
-            for d in range(days_left):
-                future_day_idx = days_history + d
-                dow = future_day_idx % 7
-                is_weekend = 1 if dow >= 5 else 0
-                
-                input_data = pd.DataFrame([{
-                    'day_of_week': dow,
-                    'is_weekend': is_weekend,
-                    'lag_1_income': curr_lag,
-                    'rolling_avg': curr_rolling
-                }])
-                
-                daily_pred = max(0, self.model.predict(input_data)[0])
-                ml_total_pred += daily_pred
-                
-                curr_lag = daily_pred
-                curr_rolling = ((curr_rolling * 6) + daily_pred) / 7
+        forecaster = None
         
         # Hybrid strategy (cold start logic)
-        if days_history < 30:
-            weight_ml, weight_stat = 0.0, 1.0
-            method = 'statistical'
-            confidence = min(50, days_history * 2)
-        elif days_history < 90:
-            weight_ml, weight_stat = 0.7, 0.3
-            method = 'hybrid'
-            confidence = 50 + min(30, (days_history - 30))
-        else:
-            weight_ml, weight_stat = 0.9, 0.1
-            method = 'ml'
-            confidence = 80 + min(15, (days_history - 90) // 10)
+        weight_ml, weight_stat, method, confidence = self.hybrid_weights(days_history)
+        
+        if days_history >= 5:
+            forecaster = model if model is not None else self._fit_model(features.frame())
+            self.model = forecaster
+            # Under the ML weight threshold the bands would collapse onto the
+            # statistical point estimate, a zero-width band; report none instead
+            if quantiles and weight_ml > 0:
+                daily_preds, ml_quantiles = forecaster.forecast_with_quantiles(
+                    history, days_left, last_date=features.last_date
+                )
+            else:
+                daily_preds = forecaster.forecast(history, days_left, features.last_date)
+            ml_total_pred = float(daily_preds.sum())
         
         final_raw_prediction = (ml_total_pred * weight_ml) + (statistical_total_pred * weight_stat)
         
         # Volatility safety factor
-        volatility = df['target'].std() if len(df) > 1 else 0
-        
-        if volatility > 2000:
-            safety_factor = 0.70
-        elif volatility > 500:
-            safety_factor = 0.85
-        else:
-            safety_factor = 0.95
+        volatility = features.std
+        safety_factor = self.safety_factor(volatility)
         
         safe_income = final_raw_prediction * safety_factor
         
-        return {
+        # Bands replace the safety factor as the risk measure, so it is not applied to them
+        income_quantiles = None
+        if ml_quantiles is not None:
+            income_quantiles = {
+                f"p{int(round(q * 100))}": float(round(value * weight_ml + statistical_total_pred * weight_stat, 2))
+                for q, value in zip(INCOME_QUANTILES, ml_quantiles)
+            }
+        
+        result = {
             'predicted_income': float(round(safe_income, 2)),
             'raw_prediction': float(round(final_raw_prediction, 2)),
             'ml_prediction': float(round(ml_total_pred, 2)),
@@ -141,17 +631,95 @@ class IncomePredictor:
             'method': method,
             'safety_factor': float(safety_factor),
             'volatility': float(round(volatility, 2)),
-            'days_history': int(days_history)
+            'days_history': int(days_history),
+            'backend': forecaster.name if forecaster is not None else None
         }
+        if quantiles:
+            result['quantiles'] = income_quantiles
+        return result
+
+    def benchmark_backends(
+        self,
+        transactions: List[Dict],
+        holdout_days: int = 14,
+        backends: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Accuracy-vs-latency report: fit every backend on all but the last
+        holdout_days income days and score the forecast against them.
+        """
+        df, history = self.prepare_features(transactions)
+        if len(df) < holdout_days + 5:
+            return []
+        
+        train_df = df.iloc[:-holdout_days]
+        train_history = history[:-holdout_days]
+        actual = np.array(history[-holdout_days:])
+        
+        report = []
+        for backend in backends or list(FORECASTER_BACKENDS):
+            start = time.perf_counter()
+            forecaster = get_forecaster(backend).fit(train_df)
+            fit_ms = (time.perf_counter() - start) * 1000
+            
+            start = time.perf_counter()
+            preds = forecaster.forecast(train_history, holdout_days, train_df['date'].iloc[-1])
+            predict_ms = (time.perf_counter() - start) * 1000
+            
+            report.append({
+                'backend': backend,
+                'mae': float(round(np.mean(np.abs(preds - actual)), 2)),
+                'total_error': float(round(preds.sum() - actual.sum(), 2)),
+                'fit_ms': float(round(fit_ms, 2)),
+                'predict_ms': float(round(predict_ms, 2)),
+                'holdout_days': int(holdout_days)
+            })
+        
+        return sorted(report, key=lambda r: r['mae'])
+
+
+def epoch_days(dates: List[Date]) -> np.ndarray:
+    """Days since 1970-01-01 for a list of dates"""
+    return np.array(dates, dtype='datetime64[D]').astype(np.int64)
+
+
+def dense_daily_series(daily_totals: Dict, start_day: int, end_day: int) -> np.ndarray:
+    """
+    Daily totals binned into a dense array covering epoch days [start_day, end_day];
+    days without entries are zero.
+    """
+    length = max(0, end_day - start_day + 1)
+    if not daily_totals or length == 0:
+        return np.zeros(length)
+    days = epoch_days(list(daily_totals.keys()))
+    amounts = np.fromiter(daily_totals.values(), dtype=float, count=len(daily_totals))
+    in_range = (days >= start_day) & (days <= end_day)
+    return np.bincount(days[in_range] - start_day, weights=amounts[in_range], minlength=length)
+
+
+def iso_week_totals(series: np.ndarray, start_day: int) -> np.ndarray:
+    """Totals of the complete Monday-to-Sunday weeks in a dense daily series"""
+    # 1970-01-01 was a Thursday, so (epoch day + 3) % 7 is the weekday with Monday = 0
+    first_monday = (-(start_day + 3)) % 7
+    weeks = (len(series) - first_monday) // 7
+    if weeks <= 0:
+        return np.zeros(0)
+    return series[first_monday:first_monday + weeks * 7].reshape(weeks, 7).sum(axis=1)
 
 
 class ExpenseForecaster:
     """
-    Expense forecaster using weighted average of recent spending patterns
+    Expense forecaster using weighted average of recent spending patterns.
+    Works on a dense calendar series (days without spending count as zero) limited
+    to the last lookback_weeks ISO weeks, however long the account's history is.
     """
     
-    def prepare_daily_expenses(self, transactions: List[Dict], account_number: str) -> List[float]:
-        """Convert transactions to daily expense totals"""
+    def __init__(self, lookback_weeks: int = EXPENSE_LOOKBACK_WEEKS):
+        self.lookback_weeks = lookback_weeks
+    
+    @staticmethod
+    def aggregate_daily_expenses(transactions: List[Dict], account_number: str) -> Dict:
+        """Sum expenses (withdrawals) per calendar date"""
         daily_expenses = {}
         
         for tx in transactions:
@@ -160,15 +728,39 @@ class ExpenseForecaster:
                 date = datetime.fromisoformat(tx['timestamp'].replace('Z', '+00:00')).date()
                 daily_expenses[date] = daily_expenses.get(date, 0) + float(tx['amount'])
         
-        # Sort by date and return values
-        sorted_dates = sorted(daily_expenses.keys())
-        return [daily_expenses[d] for d in sorted_dates]
+        return daily_expenses
+    
+    def prepare_daily_expenses(
+        self,
+        transactions: List[Dict],
+        account_number: str,
+        as_of: Optional[Date] = None
+    ) -> Tuple[np.ndarray, int]:
+        """Dense daily expense series of the lookback window and its first epoch day"""
+        return self.daily_series(self.aggregate_daily_expenses(transactions, account_number), as_of)
+    
+    def daily_series(self, daily_expenses: Dict, as_of: Optional[Date] = None) -> Tuple[np.ndarray, int]:
+        """
+        Dense daily expense series ending at the later of as_of and the last spending
+        day, starting at the later of the first spending day and the Monday
+        lookback_weeks ISO weeks before the current one. Returns (series, first epoch day).
+        """
+        if not daily_expenses:
+            return np.zeros(0), 0
+        end_day = int(epoch_days([max(daily_expenses) if as_of is None else max(as_of, max(daily_expenses))])[0])
+        current_monday = end_day - (end_day + 3) % 7
+        start_day = max(current_monday - self.lookback_weeks * 7, int(epoch_days([min(daily_expenses)])[0]))
+        return dense_daily_series(daily_expenses, start_day, end_day), start_day
     
     def predict(self, transactions: List[Dict], account_number: str, days_left: int = 15) -> Dict:
         """Predict future expenses"""
-        daily_spend_history = self.prepare_daily_expenses(transactions, account_number)
+        return self.predict_from_daily(self.aggregate_daily_expenses(transactions, account_number), days_left)
+    
+    def predict_from_daily(self, daily_expenses: Dict, days_left: int = 15, as_of: Optional[Date] = None) -> Dict:
+        """Predict future expenses from pre-aggregated daily expense totals"""
+        daily_spend_history, start_day = self.daily_series(daily_expenses, as_of)
         
-        if not daily_spend_history:
+        if len(daily_spend_history) == 0:
             return {
                 'predicted_expense': 0,
                 'daily_run_rate': 0,
@@ -182,17 +774,13 @@ class ExpenseForecaster:
             method = 'simple_average'
             confidence = min(50, len(daily_spend_history) * 4)
         else:
-            # Weighted weekly average
-            weekly_totals = []
-            for i in range(0, len(daily_spend_history), 7):
-                chunk = daily_spend_history[i:i+7]
-                if len(chunk) == 7:
-                    weekly_totals.append(sum(chunk))
+            # Weighted average of the latest complete calendar weeks
+            weekly_totals = iso_week_totals(daily_spend_history, start_day)
             
             if len(weekly_totals) >= 4:
                 recent_weeks = weekly_totals[-4:]
-                weights = [0.1, 0.2, 0.3, 0.4]
-                weighted_weekly = sum([s*w for s, w in zip(recent_weeks, weights)])
+                weights = np.array([0.1, 0.2, 0.3, 0.4])
+                weighted_weekly = float(recent_weeks @ weights)
                 daily_run_rate = weighted_weekly / 7
                 method = 'weighted_average'
                 confidence = 70 + min(20, len(weekly_totals) * 2)
@@ -230,14 +818,42 @@ class VaultGuardPredictor:
         account_number: str,
         current_balance: float,
         days_left: int = 15,
-        fixed_bills_due: float = 0
+        fixed_bills_due: float = 0,
+        income_model: Optional[IncomeForecaster] = None,
+        distribution: bool = False
     ) -> Dict:
         """
         Generate comprehensive prediction including safe spending amount
+        (and its P10/P50/P90 distribution when requested)
+        """
+        return self.predict_from_aggregates(
+            daily_income=self.income_predictor.aggregate_daily_income(transactions),
+            daily_expenses=self.expense_forecaster.aggregate_daily_expenses(transactions, account_number),
+            current_balance=current_balance,
+            days_left=days_left,
+            fixed_bills_due=fixed_bills_due,
+            income_model=income_model,
+            distribution=distribution
+        )
+    
+    def predict_from_aggregates(
+        self,
+        daily_income: Union[Dict, IncomeFeatures],
+        daily_expenses: Dict,
+        current_balance: float,
+        days_left: int = 15,
+        fixed_bills_due: float = 0,
+        income_model: Optional[IncomeForecaster] = None,
+        as_of: Optional[Date] = None,
+        distribution: bool = False
+    ) -> Dict:
+        """
+        Same as get_full_prediction, but from daily income/expense totals that
+        callers keep up to date incrementally
         """
         # Get predictions
-        income_pred = self.income_predictor.train_and_predict(transactions, days_left)
-        expense_pred = self.expense_forecaster.predict(transactions, account_number, days_left)
+        income_pred = self.income_predictor.predict_from_daily(daily_income, days_left, income_model, distribution)
+        expense_pred = self.expense_forecaster.predict_from_daily(daily_expenses, days_left, as_of)
         
         # Calculate safe withdrawable amount
         total_liquidity = current_balance + income_pred['predicted_income']
@@ -247,7 +863,7 @@ class VaultGuardPredictor:
         # Calculate overall confidence
         avg_confidence = (income_pred['confidence'] + expense_pred['confidence']) / 2
         
-        return {
+        prediction = {
             'income': income_pred,
             'expense': expense_pred,
             'summary': {
@@ -263,32 +879,94 @@ class VaultGuardPredictor:
                 'is_safe': bool(safe_withdrawable > 0)
             }
         }
+        
+        if distribution:
+            # safe_to_spend is monotonic in income, so income quantiles map straight onto it
+            bands = income_pred.get('quantiles')
+            prediction['summary']['safe_to_spend_distribution'] = {
+                key: float(round(max(0, current_balance + value - total_obligations), 2))
+                for key, value in bands.items()
+            } if bands else None
+        
+        return prediction
     
-    def generate_chart_data(self, transactions: List[Dict], account_number: str) -> Dict:
-        """Generate historical and predicted data for charts"""
-        # Process transactions into monthly data
-        monthly_data = {}
+    def simulate_liquidity(
+        self,
+        daily_income: Union[Dict, IncomeFeatures],
+        daily_expenses: Dict,
+        current_balance: float,
+        days_left: int = 15,
+        fixed_bills_due: float = 0,
+        as_of: Optional[Date] = None,
+        bill_schedule: Optional[np.ndarray] = None,
+        seed: Optional[int] = None
+    ) -> Dict:
+        """
+        Monte Carlo shortfall probability and balance percentiles up to month end,
+        bootstrapped from the last SIMULATION_LOOKBACK_DAYS of dense daily history
+        (bill_schedule: bills due on each remaining day, see simulate_liquidity)
+        """
+        features = daily_income if isinstance(daily_income, IncomeFeatures) else IncomeFeatures.from_daily(daily_income)
+        income_history = np.asarray(features.history[-SIMULATION_LOOKBACK_DAYS:], dtype=float)
+        expense_history, _ = self.expense_forecaster.daily_series(daily_expenses, as_of)
+        expense_history = expense_history[-SIMULATION_LOOKBACK_DAYS:]
         
-        for tx in transactions:
-            date = datetime.fromisoformat(tx['timestamp'].replace('Z', '+00:00'))
-            month_key = date.strftime('%b')
-            
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {'income': 0, 'expense': 0}
-            
-            if tx.get('sender_account') == 'EXTERNAL_DEPOSIT':
-                monthly_data[month_key]['income'] += float(tx['amount'])
-            elif tx.get('sender_account') == account_number:
-                monthly_data[month_key]['expense'] += float(tx['amount'])
-        
-        # Convert to chart format
-        chart_data = []
-        for month, data in monthly_data.items():
-            chart_data.append({
-                'month': month,
-                'income': round(data['income'], 2),
-                'expense': round(data['expense'], 2),
-                'balance': round(data['income'] - data['expense'], 2)
-            })
+        kwargs = {} if seed is None else {'seed': seed}
+        return simulate_liquidity(
+            income_history,
+            expense_history,
+            current_balance,
+            days_left,
+            fixed_bills_due,
+            bill_schedule,
+            **kwargs
+        )
+    
+    def forecast_months(
+        self,
+        daily_income: Union[Dict, IncomeFeatures],
+        daily_expenses: Dict,
+        months: int = 2,
+        as_of: Optional[Date] = None,
+        income_model: Optional[IncomeForecaster] = None
+    ) -> List[Dict]:
+        """
+        Income, expense and net forecast for each of the `months` calendar months
+        after as_of's month, keyed by 'YYYY-MM'. Income comes from a single daily
+        rollout of the model up to the end of the horizon, binned into months;
+        expenses use the current daily run-rate.
+        """
+        as_of = as_of or datetime.now().date()
+        first_month = np.datetime64(as_of, 'M') + 1
+        month_starts = first_month + np.arange(months + 1)
+        horizon_end = month_starts[-1].astype('datetime64[D]') - 1
+        days_in_month = np.diff(month_starts.astype('datetime64[D]')).astype(int)
+        
+        features = daily_income if isinstance(daily_income, IncomeFeatures) else IncomeFeatures.from_daily(daily_income)
+        income = np.zeros(months)
+        if len(features) > 0:
+            origin = np.datetime64(features.last_date, 'D')
+            n_days = int((horizon_end - origin).astype(int))
+            daily = self.income_predictor.forecast_daily(features, n_days, income_model)
+            dates = origin + 1 + np.arange(n_days)
+            month_index = (dates.astype('datetime64[M]') - first_month).astype(int)
+            in_horizon = month_index >= 0
+            income = np.bincount(month_index[in_horizon], weights=daily[in_horizon], minlength=months)[:months]
+        
+        # predicted_expense for a single day = safety-buffered daily run-rate
+        daily_expense = self.expense_forecaster.predict_from_daily(daily_expenses, 1, as_of)['predicted_expense']
+        expense = daily_expense * days_in_month
         
-        return {'historical': chart_data}
+        return [
+            {
+                'month': str(month_starts[i]),
+                'income': float(round(income[i], 2)),
+                'expense': float(round(expense[i], 2)),
+                'balance': float(round(income[i] - expense[i], 2))
+            }
+            for i in range(months)
+        ]
+    
+    def generate_chart_data(self, transactions: List[Dict], account_number: str) -> Dict:
+        """Generate historical data for charts"""
+        return {'historical': rollup_rows(aggregate_monthly(transactions, account_number))}
@@ -0,0 +1,181 @@
+"""
+VaultGuard Model Store
+Persists trained income models to disk and retrains them in the background
+"""
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+
+from config import ACCOUNT_STATE_CACHE_SIZE, MODEL_DIR, MODEL_TRAIN_CLAIM_TTL
+from ml_models import FEATURES_VERSION
+
+
+def transaction_fingerprint(transactions: List[Dict]) -> str:
+    """Stable digest of a transaction feed, used to detect when a model is stale"""
+    digest = hashlib.sha1()
+    rows = sorted(
+        f"{tx.get('id')}|{tx.get('timestamp')}|{tx.get('amount')}|"
+        f"{tx.get('sender_account')}|{tx.get('receiver_account')}"
+        for tx in transactions
+    )
+    for row in rows:
+        digest.update(row.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class ModelStore:
+    """
+    On-disk store of the latest trained model per account.
+    Artifacts are written uncompressed with joblib so they can be memory-mapped on load.
+    Loading reads from disk, so callers on the event loop run it in a thread.
+    """
+
+    def __init__(self, model_dir: str = MODEL_DIR, max_loaded: int = ACCOUNT_STATE_CACHE_SIZE):
+        self.model_dir = model_dir
+        self.max_loaded = max_loaded
+        # account -> (file mtime, artifact) so unchanged artifacts are not reloaded, LRU-bounded
+        self._loaded: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, account_number: str) -> str:
+        safe_name = re.sub(r'[^A-Za-z0-9_-]', '_', account_number)
+        return os.path.join(self.model_dir, f"{safe_name}.joblib")
+
+    def save(self, account_number: str, fingerprint: str, model: Any, backend: Optional[str] = None) -> Dict:
+        """Atomically write the artifact for an account"""
+        os.makedirs(self.model_dir, exist_ok=True)
+        artifact = {
+            'fingerprint': fingerprint,
+            'backend': backend,
+            'features_version': FEATURES_VERSION,
+            'model': model,
+            'trained_at': datetime.now().isoformat()
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.model_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            joblib.dump(artifact, tmp_path)
+            os.replace(tmp_path, self._path(account_number))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return artifact
+
+    def load(self, account_number: str) -> Optional[Dict]:
+        """Load (memory-mapped) the latest artifact for an account, or None if there is none"""
+        path = self._path(account_number)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            cached = self._loaded.get(account_number)
+            if cached and cached[0] == mtime:
+                self._loaded.move_to_end(account_number)
+                return cached[1]
+
+        try:
+            artifact = joblib.load(path, mmap_mode='r')
+        except Exception as e:
+            print(f"Failed to load model artifact for {account_number}: {e}")
+            return None
+
+        with self._lock:
+            self._loaded[account_number] = (mtime, artifact)
+            self._loaded.move_to_end(account_number)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return artifact
+
+    @staticmethod
+    def is_compatible(artifact: Optional[Dict], backend: Optional[str]) -> bool:
+        """Whether an artifact was trained by the given backend on the current features"""
+        return (
+            artifact is not None
+            and artifact.get('backend') == backend
+            and artifact.get('features_version') == FEATURES_VERSION
+        )
+
+
+class ModelTrainer:
+    """
+    Background scheduler that retrains a user's model whenever their
+    transaction fingerprint changes. Only the latest request per account is kept.
+    With a shared cache, workers claim a retrain first so that only one of them
+    trains a given account and fingerprint.
+    """
+
+    def __init__(
+        self,
+        store: ModelStore,
+        fit_fn: Callable[[List[Dict], Optional[str], Any], Any],
+        cache: Optional[Any] = None
+    ):
+        self.store = store
+        self.fit_fn = fit_fn
+        self.cache = cache
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Dict[str, Tuple[str, List[Dict], Optional[str]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the training worker on the running event loop"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the training worker"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def schedule(
+        self,
+        account_number: str,
+        fingerprint: str,
+        transactions: List[Dict],
+        backend: Optional[str] = None
+    ):
+        """Queue a retrain; repeated calls before it runs only replace the payload"""
+        if self._queue is None:
+            return
+        already_queued = account_number in self._pending
+        self._pending[account_number] = (fingerprint, transactions, backend)
+        if not already_queued:
+            self._queue.put_nowait(account_number)
+
+    async def _run(self):
+        while True:
+            account_number = await self._queue.get()
+            fingerprint, transactions, backend = self._pending.pop(account_number, (None, None, None))
+            if fingerprint is None:
+                continue
+            try:
+                if self.cache is not None and self.cache.shared and not self.cache.add(
+                    f"train:{account_number}:{backend}:{fingerprint}", True, ttl=MODEL_TRAIN_CLAIM_TTL
+                ):
+                    # Another worker is training (or has trained) this model; the store picks it up
+                    continue
+                # Hand the current model to the fit so backends that support it can grow it
+                artifact = await asyncio.to_thread(self.store.load, account_number)
+                previous = artifact['model'] if self.store.is_compatible(artifact, backend) else None
+                model = await asyncio.to_thread(self.fit_fn, transactions, backend, previous)
+                await asyncio.to_thread(self.store.save, account_number, fingerprint, model, backend)
+            except Exception as e:
+                print(f"Background retrain failed for {account_number}: {e}")
@@ -0,0 +1,407 @@
+"""
+VaultGuard Prediction Service
+Caches per-account transaction state and forecasts, kept current by transaction events
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from config import FORECAST_CACHE_TTL, ACCOUNT_STATE_CACHE_SIZE
+from bank_service import BankAPIService
+from cache import Cache, get_cache
+from fair_scheduler import FairScheduler
+from deadline import clear_deadline
+from horizon import Horizon
+from events import (
+    EventBus,
+    TransactionEvent,
+    InvalidationEvent,
+    DashboardEvent,
+    TRANSACTION_CREATED,
+    TRANSACTIONS_INVALIDATED,
+    DASHBOARD_UPDATED
+)
+from ml_models import VaultGuardPredictor, IncomePredictor, ExpenseForecaster, IncomeForecaster, IncomeFeatures
+from model_store import ModelStore, ModelTrainer, transaction_fingerprint
+
+
+class AccountState:
+    """Cached balance, transaction feed, daily aggregates and latest forecast of one account"""
+
+    def __init__(
+        self,
+        account_number: str,
+        ifsc_code: str,
+        balance: float,
+        transactions: List[Dict],
+        stale: bool = False,
+        revision: Optional[str] = None
+    ):
+        self.account_number = account_number
+        self.ifsc_code = ifsc_code
+        self.balance = balance
+        # Copied: the bank client keeps the fetched list as its last-known-good value
+        self.transactions = list(transactions)
+        self.daily_income = IncomePredictor.aggregate_daily_income(transactions)
+        self.income_features = IncomeFeatures.from_daily(self.daily_income)
+        self.daily_expenses = ExpenseForecaster.aggregate_daily_expenses(transactions, account_number)
+        self.stale = stale
+        self.fetched_at = time.monotonic()
+        self.version = 0
+        # Identifies this snapshot of the account across worker processes
+        self.revision = revision or uuid.uuid4().hex
+        self.forecast: Optional[Dict] = None
+        # (horizon start, horizon end, fixed_bills_due, backend) the forecast was computed for
+        self.forecast_key: Optional[Tuple] = None
+        # When the forecast's horizon ends (the user's next midnight, UTC)
+        self.forecast_expires_at: Optional[datetime] = None
+        self._fingerprint: Optional[str] = None
+        # (months, backend, as-of date) -> monthly forecast buckets
+        self.month_forecasts: Dict[Tuple, List[Dict]] = {}
+
+    @property
+    def fingerprint(self) -> str:
+        """Digest of the transaction feed, the same in every worker holding the same data"""
+        if self._fingerprint is None:
+            self._fingerprint = transaction_fingerprint(self.transactions)
+        return self._fingerprint
+
+    def is_fresh(self) -> bool:
+        """Whether the state can be served without refetching from the bank"""
+        return not self.stale and time.monotonic() - self.fetched_at < FORECAST_CACHE_TTL
+
+    def apply(self, event: TransactionEvent):
+        """Fold a newly written transaction into the cached feed and aggregates"""
+        day = datetime.strptime(event.timestamp[:10], '%Y-%m-%d').date()
+        if event.type == 'deposit':
+            self.balance += event.amount
+            self.daily_income[day] = self.daily_income.get(day, 0) + event.amount
+            if not self.income_features.add(day, event.amount):
+                # Backdated deposit: the rows after it change, so rebuild
+                self.income_features = IncomeFeatures.from_daily(self.daily_income)
+            sender, receiver = 'EXTERNAL_DEPOSIT', self.account_number
+        else:
+            self.balance -= event.amount
+            self.daily_expenses[day] = self.daily_expenses.get(day, 0) + event.amount
+            sender, receiver = self.account_number, 'CASH_WITHDRAWAL'
+
+        self.transactions.append({
+            'id': f"local-{self.version}",
+            'sender_account': sender,
+            'receiver_account': receiver,
+            'amount': f"{event.amount:.2f}",
+            'timestamp': event.timestamp.replace(' ', 'T')
+        })
+        self.version += 1
+        self.revision = uuid.uuid4().hex
+        self._fingerprint = None
+        self.forecast = None
+        self.month_forecasts = {}
+    
+    def snapshot(self) -> Dict:
+        """Balance and transaction feed, as shared with other workers"""
+        return {
+            'balance': self.balance,
+            'transactions': self.transactions,
+            'revision': self.revision
+        }
+
+
+class PredictionService:
+    """
+    Serves forecasts from cached account state.
+    Transaction events update the state incrementally and schedule a background
+    recompute, so the read after a write is normally a cache hit. Every change to
+    an account's figures is announced as a DASHBOARD_UPDATED event.
+    With a shared cache, bank snapshots are published for the other worker
+    processes, and a worker notices another worker's writes through the
+    snapshot revision.
+    """
+
+    def __init__(self, bank_service: BankAPIService, event_bus: EventBus, cache: Optional[Cache] = None):
+        self.bank_service = bank_service
+        self.event_bus = event_bus
+        self.cache = cache or get_cache()
+        # Model fits and forecasts run here, shared fairly between accounts
+        self.executor = FairScheduler()
+        self.predictor = VaultGuardPredictor(user_type='freelancer')
+        self.model_store = ModelStore()
+        self.model_trainer = ModelTrainer(self.model_store, self.predictor.income_predictor.fit, self.cache)
+        self._states: OrderedDict = OrderedDict()
+        self._recomputes: Dict[str, asyncio.Task] = {}
+        event_bus.subscribe(TRANSACTION_CREATED, self.on_transaction)
+        event_bus.subscribe(TRANSACTIONS_INVALIDATED, self.on_invalidated)
+
+    def start(self):
+        """Start background workers"""
+        self.model_trainer.start()
+
+    async def stop(self):
+        """Stop background workers"""
+        for task in list(self._recomputes.values()):
+            task.cancel()
+        await self.model_trainer.stop()
+        self.executor.shutdown()
+
+    async def resolve_income_model(
+        self,
+        account_number: str,
+        transactions: List[Dict],
+        backend: str
+    ) -> Optional[IncomeForecaster]:
+        """
+        Return the latest persisted income model for an account.
+        A stale artifact is still served while a retrain is scheduled in the background;
+        only an account with no artifact for its backend is fitted on the request path.
+        """
+        fingerprint = transaction_fingerprint(transactions)
+        artifact = await asyncio.to_thread(self.model_store.load, account_number)
+
+        if not self.model_store.is_compatible(artifact, backend):
+            model = await self.executor.run(account_number, self.predictor.income_predictor.fit, transactions, backend)
+            await asyncio.to_thread(self.model_store.save, account_number, fingerprint, model, backend)
+            return model
+
+        if artifact['fingerprint'] != fingerprint:
+            self.model_trainer.schedule(account_number, fingerprint, transactions, backend)
+        return artifact['model']
+
+    async def get_state(self, account_number: str, ifsc_code: str) -> AccountState:
+        """Cached account state, refetched from the bank once it expires"""
+        state = self._states.get(account_number)
+        if state is not None and state.is_fresh():
+            shared_revision = self.cache.get(f"snapshot-rev:{account_number}") if self.cache.shared else None
+            if shared_revision is None or shared_revision == state.revision:
+                self._states.move_to_end(account_number)
+                return state
+        
+        shared = self.cache.get(f"snapshot:{account_number}") if self.cache.shared else None
+        if shared is not None and (state is None or shared['revision'] != state.revision):
+            # Another worker fetched or updated the account; no need to ask the bank
+            state = AccountState(
+                account_number,
+                ifsc_code,
+                shared['balance'],
+                shared['transactions'],
+                revision=shared['revision']
+            )
+        else:
+            snapshot = await self.bank_service.fetch_account_snapshot(account_number, ifsc_code)
+            state = AccountState(
+                account_number,
+                ifsc_code,
+                snapshot['balance'],
+                snapshot['transactions'],
+                snapshot['stale']
+            )
+            if not state.stale:
+                self._publish_snapshot(state)
+        
+        self._states[account_number] = state
+        self._states.move_to_end(account_number)
+        while len(self._states) > ACCOUNT_STATE_CACHE_SIZE:
+            self._states.popitem(last=False)
+        return state
+    
+    def _publish_snapshot(self, state: AccountState):
+        """Share an account's snapshot with the other workers"""
+        if not self.cache.shared:
+            return
+        try:
+            self.cache.set(f"snapshot:{state.account_number}", state.snapshot(), ttl=FORECAST_CACHE_TTL)
+            self.cache.set(f"snapshot-rev:{state.account_number}", state.revision, ttl=FORECAST_CACHE_TTL)
+        except Exception as e:
+            print(f"Failed to share snapshot for {state.account_number}: {e}")
+    
+    def _invalidate_shared(self, account_number: str):
+        """Make every worker drop its copy of an account on its next read"""
+        if not self.cache.shared:
+            return
+        try:
+            self.cache.delete(f"snapshot:{account_number}")
+            # A revision no worker holds, so fresh local copies are not trusted either
+            self.cache.set(f"snapshot-rev:{account_number}", uuid.uuid4().hex, ttl=FORECAST_CACHE_TTL)
+        except Exception as e:
+            print(f"Failed to invalidate shared snapshot for {account_number}: {e}")
+    
+    async def get_prediction(
+        self,
+        account_number: str,
+        ifsc_code: str,
+        horizon: Horizon,
+        fixed_bills_due: float,
+        backend: str
+    ) -> Tuple[Dict, AccountState]:
+        """
+        Full prediction for an account over the user's horizon. Cached until the
+        account's data changes or the horizon rolls over at the user's midnight;
+        with a shared cache, other workers reuse it by data fingerprint.
+        """
+        pending = self._recomputes.get(account_number)
+        if pending is not None and not pending.done():
+            await asyncio.shield(pending)
+
+        state = await self.get_state(account_number, ifsc_code)
+        key = (*horizon.key, fixed_bills_due, backend)
+        if state.forecast is not None and state.forecast_key == key:
+            return state.forecast, state
+
+        shared = self.cache.get(self._forecast_cache_key(state, key)) if self.cache.shared else None
+        if shared is not None:
+            state.forecast = shared
+            state.forecast_key = key
+            state.forecast_expires_at = horizon.expires_at
+            return shared, state
+
+        prediction = await self._compute(state, key, horizon.expires_at)
+        return prediction, state
+
+    @staticmethod
+    def _forecast_cache_key(state: AccountState, key: Tuple) -> str:
+        start, end, fixed_bills_due, backend = key
+        return f"forecast:{state.account_number}:{end}:{state.fingerprint}:{start}:{fixed_bills_due}:{backend}"
+
+    def _publish_forecast(self, state: AccountState, key: Tuple, prediction: Dict, expires_at: datetime):
+        """Share a forecast with the other workers until its horizon rolls over"""
+        if not self.cache.shared:
+            return
+        ttl = (expires_at - datetime.now(expires_at.tzinfo)).total_seconds()
+        if ttl <= 0:
+            return
+        try:
+            self.cache.set(self._forecast_cache_key(state, key), prediction, ttl=ttl)
+        except Exception as e:
+            print(f"Failed to share forecast for {state.account_number}: {e}")
+
+    async def _compute(self, state: AccountState, key: Tuple, expires_at: datetime) -> Dict:
+        start, end, fixed_bills_due, backend = key
+        days_left = (end - start).days + 1
+        version = state.version
+        # Copies, so later events cannot mutate the inputs while the worker thread reads them
+        transactions = list(state.transactions)
+        income_features = state.income_features.copy()
+        daily_expenses = dict(state.daily_expenses)
+        balance = state.balance
+
+        income_model = await self.resolve_income_model(state.account_number, transactions, backend)
+        prediction = await self.executor.run(
+            state.account_number,
+            self.predictor.predict_from_aggregates,
+            income_features,
+            daily_expenses,
+            balance,
+            days_left,
+            fixed_bills_due,
+            income_model,
+            start,
+            # Per-tree bands reuse the rollout, so they are cheap enough to always keep
+            True
+        )
+
+        if state.version == version:
+            state.forecast = prediction
+            state.forecast_key = key
+            state.forecast_expires_at = expires_at
+            self._publish_forecast(state, key, prediction, expires_at)
+            await self.event_bus.publish(DASHBOARD_UPDATED, DashboardEvent(account_number=state.account_number))
+        return prediction
+
+    async def simulate(
+        self,
+        account_number: str,
+        ifsc_code: str,
+        horizon: Horizon,
+        fixed_bills_due: float,
+        bill_schedule: Optional[List[float]] = None
+    ) -> Tuple[Dict, AccountState]:
+        """Monte Carlo liquidity simulation over the cached account state, to the end of the horizon"""
+        state = await self.get_state(account_number, ifsc_code)
+        simulation = await self.executor.run(
+            account_number,
+            self.predictor.simulate_liquidity,
+            state.income_features.copy(),
+            dict(state.daily_expenses),
+            state.balance,
+            horizon.days_left,
+            fixed_bills_due,
+            horizon.today,
+            bill_schedule
+        )
+        return simulation, state
+    
+    async def forecast_months(
+        self,
+        account_number: str,
+        ifsc_code: str,
+        months: int,
+        backend: str,
+        today: date
+    ) -> Tuple[List[Dict], AccountState]:
+        """
+        Monthly forecast buckets for the months after `today` (the user's local date),
+        from the same cached state and income model as get_prediction
+        """
+        state = await self.get_state(account_number, ifsc_code)
+        key = (months, backend, today)
+        if key in state.month_forecasts:
+            return state.month_forecasts[key], state
+        
+        version = state.version
+        income_model = await self.resolve_income_model(account_number, list(state.transactions), backend)
+        forecast = await self.executor.run(
+            account_number,
+            self.predictor.forecast_months,
+            state.income_features.copy(),
+            dict(state.daily_expenses),
+            months,
+            today,
+            income_model
+        )
+        if state.version == version:
+            state.month_forecasts[key] = forecast
+        return forecast, state
+    
+    def schedule_recompute(self, account_number: str):
+        """Recompute an account's last forecast in the background"""
+        task = self._recomputes.get(account_number)
+        if task is not None and not task.done():
+            # The running recompute notices the new version and goes around again
+            return
+        self._recomputes[account_number] = asyncio.create_task(self._recompute(account_number))
+
+    async def _recompute(self, account_number: str):
+        # Started from a request, but not bound by its deadline
+        clear_deadline()
+        try:
+            while True:
+                state = self._states.get(account_number)
+                if state is None or state.forecast_key is None:
+                    return
+                version = state.version
+                await self._compute(state, state.forecast_key, state.forecast_expires_at)
+                if state.version == version:
+                    return
+        except Exception as e:
+            print(f"Background forecast recompute failed for {account_number}: {e}")
+        finally:
+            self._recomputes.pop(account_number, None)
+
+    async def on_transaction(self, event: TransactionEvent):
+        """Event handler: apply a written transaction to the cached state"""
+        state = self._states.get(event.account_number)
+        if state is None:
+            self._invalidate_shared(event.account_number)
+            return
+        state.apply(event)
+        self._publish_snapshot(state)
+        self.schedule_recompute(event.account_number)
+        await self.event_bus.publish(DASHBOARD_UPDATED, DashboardEvent(account_number=event.account_number))
+
+    async def on_invalidated(self, event: InvalidationEvent):
+        """Event handler: drop cached state after writes we cannot fold in incrementally"""
+        self._states.pop(event.account_number, None)
+        self._invalidate_shared(event.account_number)
+        await self.event_bus.publish(DASHBOARD_UPDATED, DashboardEvent(account_number=event.account_number))
@@ -0,0 +1,104 @@
+"""
+VaultGuard Rate Limiting
+Per-account token buckets with separate budgets for cheap reads and ML endpoints
+"""
+import math
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from fastapi import Depends, HTTPException
+
+from auth import User, get_current_active_user
+from config import (
+    RATE_LIMIT_READ_PER_MINUTE,
+    RATE_LIMIT_READ_BURST,
+    RATE_LIMIT_ML_PER_MINUTE,
+    RATE_LIMIT_ML_BURST,
+    RATE_LIMIT_WRITE_PER_MINUTE,
+    RATE_LIMIT_WRITE_BURST,
+    RATE_LIMIT_MAX_KEYS
+)
+
+# Longest Retry-After sent; a bucket with no refill (rate 0) would otherwise say "never"
+MAX_RETRY_AFTER_SECONDS = 60
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets keyed by account, refilled lazily on each check (O(1)).
+    Buckets live in an LRU-ordered dict: a bucket idle long enough to be full
+    again is indistinguishable from a new one, so such buckets are dropped from
+    the cold end as checks go by, and the dict never exceeds max_keys.
+    """
+
+    def __init__(self, per_minute: float, burst: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self.idle_seconds = burst / self.rate if self.rate > 0 else math.inf
+        # key -> (tokens, last update)
+        self._buckets: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _evict_idle(self, now: float):
+        # At most two per check keeps the check O(1) while still draining idle keys
+        for _ in range(2):
+            if not self._buckets:
+                return
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < self.idle_seconds:
+                return
+            del self._buckets[key]
+
+    def check(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take `cost` tokens if available; returns (allowed, seconds until it would be)"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+
+        self._evict_idle(now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        if allowed:
+            return True, 0.0
+        retry_after = (cost - tokens) / self.rate if self.rate > 0 else math.inf
+        return False, retry_after
+
+
+read_limiter = TokenBucketLimiter(RATE_LIMIT_READ_PER_MINUTE, RATE_LIMIT_READ_BURST)
+ml_limiter = TokenBucketLimiter(RATE_LIMIT_ML_PER_MINUTE, RATE_LIMIT_ML_BURST)
+write_limiter = TokenBucketLimiter(RATE_LIMIT_WRITE_PER_MINUTE, RATE_LIMIT_WRITE_BURST)
+
+
+def _enforce(limiter: TokenBucketLimiter, account_number: str):
+    allowed, retry_after = limiter.check(account_number)
+    if not allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please slow down",
+            headers={"Retry-After": str(max(1, math.ceil(min(retry_after, MAX_RETRY_AFTER_SECONDS))))}
+        )
+
+
+async def limit_reads(current_user: User = Depends(get_current_active_user)):
+    """Dependency: cheap read budget"""
+    _enforce(read_limiter, current_user.account_number)
+
+
+async def limit_ml(current_user: User = Depends(get_current_active_user)):
+    """Dependency: budget for endpoints that run models"""
+    _enforce(ml_limiter, current_user.account_number)
+
+
+async def limit_writes(current_user: User = Depends(get_current_active_user)):
+    """Dependency: budget for endpoints that write to the bank"""
+    _enforce(write_limiter, current_user.account_number)
@@ -0,0 +1,172 @@
+"""
+VaultGuard Monthly Rollups
+Monthly income/expense totals from the raw transaction feed, cached per closed month
+"""
+from collections import OrderedDict
+from datetime import datetime, timezone, tzinfo
+from typing import Dict, List, Optional
+
+from config import ACCOUNT_STATE_CACHE_SIZE, DEFAULT_TIMEZONE
+from events import (
+    EventBus,
+    TransactionEvent,
+    InvalidationEvent,
+    TRANSACTION_CREATED,
+    TRANSACTIONS_INVALIDATED
+)
+from horizon import resolve_timezone
+
+
+def is_income(tx: Dict) -> bool:
+    return tx.get('sender_account') == 'EXTERNAL_DEPOSIT'
+
+
+def is_expense(tx: Dict, account_number: str) -> bool:
+    # Same rule as ExpenseForecaster.aggregate_daily_expenses
+    return tx.get('sender_account') == account_number or tx.get('receiver_account') == 'CASH_WITHDRAWAL'
+
+
+def local_month(timestamp: str, zone: Optional[tzinfo] = None) -> str:
+    """'YYYY-MM' of a bank (UTC) timestamp on the zone's calendar"""
+    # No UTC offset moves a time between the 2nd and the 27th into another month
+    if zone is None or '02' <= timestamp[8:10] <= '27':
+        return timestamp[:7]
+    moment = datetime.fromisoformat(timestamp.replace(' ', 'T'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(zone).strftime('%Y-%m')
+
+
+def _previous_month(month: str) -> str:
+    year, number = int(month[:4]), int(month[5:7])
+    return f"{year - 1}-12" if number == 1 else f"{year}-{number - 1:02d}"
+
+
+def aggregate_monthly(
+    transactions: List[Dict],
+    account_number: str,
+    since: Optional[str] = None,
+    zone: Optional[tzinfo] = None
+) -> Dict[str, Dict]:
+    """
+    Income and expense totals per 'YYYY-MM' month, on the zone's calendar
+    (UTC when none is given). With `since` ('YYYY-MM'), transactions more than
+    a month older are skipped on a string compare, without parsing them.
+    """
+    # A UTC month can hold the first hours of the next local month
+    earliest = _previous_month(since) if since is not None else None
+    months: Dict[str, Dict] = {}
+    for tx in transactions:
+        if earliest is not None and tx['timestamp'][:7] < earliest:
+            continue
+        month = local_month(tx['timestamp'], zone)
+        if since is not None and month < since:
+            continue
+        if is_income(tx):
+            field = 'income'
+        elif is_expense(tx, account_number):
+            field = 'expense'
+        else:
+            continue
+        totals = months.setdefault(month, {'income': 0.0, 'expense': 0.0})
+        totals[field] += float(tx['amount'])
+    return months
+
+
+def rollup_rows(months: Dict[str, Dict]) -> List[Dict]:
+    """Chronological rollup rows with rounded totals and the month's net"""
+    return [
+        {
+            'month': month,
+            'income': round(months[month]['income'], 2),
+            'expense': round(months[month]['expense'], 2),
+            'balance': round(months[month]['income'] - months[month]['expense'], 2)
+        }
+        for month in sorted(months)
+    ]
+
+
+class _AccountRollups:
+    def __init__(self, transactions: List[Dict], timezone_name: str, closed_through: str, closed: Dict[str, Dict]):
+        # The feed the totals were built from: a refetched account state brings a
+        # new one, carrying writes made by other workers or directly at the bank
+        self.transactions = transactions
+        self.timezone = timezone_name
+        # Every month before closed_through has its final totals in `closed`
+        self.closed_through = closed_through
+        self.closed = closed
+
+
+class MonthlyRollupService:
+    """
+    Monthly totals per account, on the account's calendar. Closed months
+    cannot change (short of a backdated write, which the transaction events
+    report), so they are computed once per transaction feed and cached; each
+    call only aggregates the current month from the feed.
+    """
+
+    def __init__(self, event_bus: EventBus, max_accounts: int = ACCOUNT_STATE_CACHE_SIZE):
+        self.max_accounts = max_accounts
+        self._accounts: OrderedDict = OrderedDict()
+        event_bus.subscribe(TRANSACTION_CREATED, self.on_transaction)
+        event_bus.subscribe(TRANSACTIONS_INVALIDATED, self.on_invalidated)
+
+    def monthly(
+        self,
+        account_number: str,
+        transactions: List[Dict],
+        current_month: Optional[str] = None,
+        timezone_name: str = DEFAULT_TIMEZONE
+    ) -> List[Dict]:
+        """
+        Rollup rows for every month with activity, up to and including the
+        current one. current_month must be on the same calendar (timezone_name).
+        """
+        zone = resolve_timezone(timezone_name)
+        current_month = current_month or datetime.now(zone).strftime('%Y-%m')
+        cached = self._accounts.get(account_number)
+
+        if (
+            cached is None
+            or cached.transactions is not transactions
+            or cached.timezone != timezone_name
+            or cached.closed_through > current_month
+        ):
+            months = aggregate_monthly(transactions, account_number, zone=zone)
+            cached = _AccountRollups(
+                transactions,
+                timezone_name,
+                current_month,
+                {month: totals for month, totals in months.items() if month < current_month}
+            )
+            current = {month: totals for month, totals in months.items() if month >= current_month}
+        else:
+            # Only months that closed since the last call, plus the open one, are aggregated
+            months = aggregate_monthly(transactions, account_number, since=cached.closed_through, zone=zone)
+            for month, totals in months.items():
+                if month < current_month:
+                    cached.closed[month] = totals
+            cached.closed_through = current_month
+            current = {month: totals for month, totals in months.items() if month >= current_month}
+
+        self._accounts[account_number] = cached
+        self._accounts.move_to_end(account_number)
+        while len(self._accounts) > self.max_accounts:
+            self._accounts.popitem(last=False)
+
+        return rollup_rows({**cached.closed, **current})
+
+    def on_transaction(self, event: TransactionEvent):
+        """Event handler: fold a backdated write into its closed month"""
+        cached = self._accounts.get(event.account_number)
+        if cached is None:
+            return
+        month = local_month(event.timestamp, resolve_timezone(cached.timezone))
+        if month >= cached.closed_through:
+            return
+        totals = cached.closed.setdefault(month, {'income': 0.0, 'expense': 0.0})
+        totals['income' if event.type == 'deposit' else 'expense'] += event.amount
+
+    def on_invalidated(self, event: InvalidationEvent):
+        """Event handler: imports can touch any month, so start over"""
+        self._accounts.pop(event.account_number, None)
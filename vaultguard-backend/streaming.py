@@ -0,0 +1,114 @@
+"""
+VaultGuard Dashboard Streaming
+Server-Sent Events hub that pushes dashboard deltas to connected sessions
+"""
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, Set, Tuple
+
+from config import STREAM_HEARTBEAT_SECONDS
+from events import EventBus, DashboardEvent, DASHBOARD_UPDATED
+
+
+# Sentinel telling a stream that a newer connection replaced it
+_REPLACED = object()
+
+
+def format_sse(event: str, data: Dict) -> str:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class DashboardStreamHub:
+    """
+    Tracks one streaming connection per session and wakes the streams of an
+    account whenever its dashboard figures may have changed.
+    """
+
+    def __init__(self, event_bus: EventBus, heartbeat: float = STREAM_HEARTBEAT_SECONDS):
+        self.heartbeat = heartbeat
+        # session id -> (account number, wake-up queue)
+        self._connections: Dict[str, Tuple[str, asyncio.Queue]] = {}
+        self._sessions_by_account: Dict[str, Set[str]] = {}
+        event_bus.subscribe(DASHBOARD_UPDATED, self.on_dashboard_updated)
+
+    @property
+    def connection_count(self) -> int:
+        return len(self._connections)
+
+    def connect(self, session_id: str, account_number: str) -> asyncio.Queue:
+        """Register a stream, closing any older stream of the same session"""
+        previous = self._connections.get(session_id)
+        if previous is not None:
+            self._wake(previous[1], _REPLACED)
+
+        # Size 1: several updates arriving between pushes collapse into one recompute
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._connections[session_id] = (account_number, queue)
+        self._sessions_by_account.setdefault(account_number, set()).add(session_id)
+        return queue
+
+    def disconnect(self, session_id: str, queue: asyncio.Queue):
+        """Unregister a stream (no-op if a newer connection already took over the session)"""
+        current = self._connections.get(session_id)
+        if current is None or current[1] is not queue:
+            return
+        account_number = current[0]
+        del self._connections[session_id]
+        sessions = self._sessions_by_account.get(account_number)
+        if sessions is not None:
+            sessions.discard(session_id)
+            if not sessions:
+                del self._sessions_by_account[account_number]
+
+    @staticmethod
+    def _wake(queue: asyncio.Queue, message):
+        if message is _REPLACED:
+            # The replacement notice must win over a pending update
+            while not queue.empty():
+                queue.get_nowait()
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+
+    def on_dashboard_updated(self, event: DashboardEvent):
+        """Event handler: wake every stream of the account"""
+        for session_id in self._sessions_by_account.get(event.account_number, ()):
+            self._wake(self._connections[session_id][1], event)
+
+    async def stream(
+        self,
+        session_id: str,
+        account_number: str,
+        figures_fn: Callable[[], Awaitable[Dict]]
+    ):
+        """
+        SSE generator: a full 'snapshot' first, then a 'delta' with only the
+        figures that changed each time the account is updated. figures_fn may
+        leave out a figure it cannot compute yet; the client keeps the last value.
+        Idle connections get a comment heartbeat so proxies keep them open.
+        """
+        queue = self.connect(session_id, account_number)
+        try:
+            last = await figures_fn()
+            yield format_sse("snapshot", last)
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if message is _REPLACED:
+                    yield format_sse("replaced", {})
+                    return
+
+                current = await figures_fn()
+                delta = {key: value for key, value in current.items() if last.get(key) != value}
+                if delta:
+                    last = {**last, **delta}
+                    yield format_sse("delta", delta)
+        finally:
+            self.disconnect(session_id, queue)
@@ -11,7 +11,7 @@ import {
   ResponsiveContainer,
   ReferenceLine,
 } from "recharts";
-import { getPredictions, getChartData, type PredictionData, type ChartDataPoint } from "@/lib/api";
+import { getPredictions, getChartData, type PredictionData, type ChartDataPoint, type DashboardFigures } from "@/lib/api";
 
 interface Expense {
   id: string;
@@ -24,9 +24,10 @@ interface Expense {
 interface PredictionTabProps {
   expenses: Expense[];
   budget: number;
+  liveForecast?: DashboardFigures | null;
 }
 
-const PredictionTab = ({ expenses, budget }: PredictionTabProps) => {
+const PredictionTab = ({ expenses, budget, liveForecast }: PredictionTabProps) => {
   const [loading, setLoading] = useState(true);
   const [predictions, setPredictions] = useState<PredictionData | null>(null);
   const [chartData, setChartData] = useState<ChartDataPoint[]>([]);
@@ -58,6 +59,19 @@ const PredictionTab = ({ expenses, budget }: PredictionTabProps) => {
     fetchPredictions();
   }, [expenses]);
 
+  // Apply forecast figures pushed over the dashboard stream
+  useEffect(() => {
+    if (!liveForecast || liveForecast.safe_to_spend === undefined) return;
+    const safeToSpend = liveForecast.safe_to_spend;
+    setPredictions((prev) => prev && {
+      ...prev,
+      can_spend: safeToSpend,
+      predicted_savings: safeToSpend,
+      predicted_income: liveForecast.predicted_income ?? prev.predicted_income,
+      predicted_expense: liveForecast.predicted_expense ?? prev.predicted_expense,
+    });
+  }, [liveForecast]);
+
   // Animate values when predictions load
   useEffect(() => {
     if (!predictions) return;
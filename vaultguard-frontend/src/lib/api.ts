@@ -99,6 +99,7 @@ export interface PredictionData {
 
 export interface ChartDataPoint {
   month: string;
+  key?: string; // "YYYY-MM"
   income: number;
   expense: number;
   balance: number;
@@ -116,6 +117,20 @@ export interface CategorySummary {
   total: number;
 }
 
+export interface DashboardFigures {
+  current_balance?: number;
+  total_spent?: number;
+  category_totals?: {
+    regular: number;
+    irregular: number;
+    daily: number;
+  };
+  stale?: boolean;
+  safe_to_spend?: number;
+  predicted_income?: number;
+  predicted_expense?: number;
+}
+
 export interface WeeklySpendingData {
   day: string;
   regular: number;
@@ -265,11 +280,22 @@ export async function getChartData(): Promise<ChartDataPoint[]> {
   return data.data;
 }
 
+/**
+ * Optional ?start=&end= (YYYY-MM-DD, inclusive) for the analytics endpoints
+ */
+function dateRangeQuery(start?: string, end?: string): string {
+  const params = new URLSearchParams();
+  if (start) params.set('start', start);
+  if (end) params.set('end', end);
+  const query = params.toString();
+  return query ? `?${query}` : '';
+}
+
 /**
  * Fetch category summary
  */
-export async function getCategorySummary(): Promise<CategorySummary> {
-  const response = await fetch(`${API_BASE_URL}/api/analytics/category-summary`, {
+export async function getCategorySummary(start?: string, end?: string): Promise<CategorySummary> {
+  const response = await fetch(`${API_BASE_URL}/api/analytics/category-summary${dateRangeQuery(start, end)}`, {
     headers: getAuthHeaders(),
   });
   if (!response.ok) {
@@ -281,8 +307,8 @@ export async function getCategorySummary(): Promise<CategorySummary> {
 /**
  * Fetch weekly spending data
  */
-export async function getWeeklySpending(): Promise<WeeklySpendingData[]> {
-  const response = await fetch(`${API_BASE_URL}/api/analytics/weekly-spending`, {
+export async function getWeeklySpending(start?: string, end?: string): Promise<WeeklySpendingData[]> {
+  const response = await fetch(`${API_BASE_URL}/api/analytics/weekly-spending${dateRangeQuery(start, end)}`, {
     headers: getAuthHeaders(),
   });
   if (!response.ok) {
@@ -302,3 +328,90 @@ export async function healthCheck(): Promise<{ status: string; message: string }
   }
   return response.json();
 }
+
+/**
+ * Get a short-lived token for opening the dashboard stream.
+ * EventSource can only send it in the URL, so the login token is never put there.
+ */
+export async function getStreamToken(): Promise<string> {
+  const response = await fetch(`${API_BASE_URL}/api/stream/token`, {
+    method: 'POST',
+    headers: getAuthHeaders(),
+  });
+  if (!response.ok) {
+    throw new Error('Failed to get stream token');
+  }
+  const data = await response.json();
+  return data.token;
+}
+
+/**
+ * Subscribe to live dashboard figures (Server-Sent Events).
+ * onUpdate receives the full figures on connect and the merged figures after every change.
+ * onClosed is called once if the stream ends for good (rejected, replaced or unsupported),
+ * so the caller can fall back to polling. Returns a function that closes the stream.
+ */
+export function subscribeToDashboard(
+  onUpdate: (figures: DashboardFigures) => void,
+  onClosed?: () => void
+): () => void {
+  if (typeof EventSource === 'undefined') {
+    onClosed?.();
+    return () => {};
+  }
+
+  let source: EventSource | null = null;
+  let stopped = false;
+  let figures: DashboardFigures = {};
+
+  const giveUp = () => {
+    if (stopped) return;
+    stopped = true;
+    source?.close();
+    onClosed?.();
+  };
+
+  const connect = async () => {
+    let token: string;
+    try {
+      token = await getStreamToken();
+    } catch {
+      giveUp();
+      return;
+    }
+    if (stopped) return;
+
+    const current = new EventSource(`${API_BASE_URL}/api/stream?token=${encodeURIComponent(token)}`);
+    source = current;
+    let opened = false;
+
+    current.addEventListener('snapshot', (event) => {
+      opened = true;
+      figures = JSON.parse((event as MessageEvent).data);
+      onUpdate(figures);
+    });
+    current.addEventListener('delta', (event) => {
+      figures = { ...figures, ...JSON.parse((event as MessageEvent).data) };
+      onUpdate(figures);
+    });
+    current.addEventListener('replaced', giveUp);
+    // EventSource reconnects by itself after a dropped connection, but with the same
+    // stream token, which expires quickly; once refused it is CLOSED. A stream that
+    // was working gets a fresh token; one that never opened means streaming is unavailable.
+    current.onerror = () => {
+      if (stopped || current.readyState !== EventSource.CLOSED) return;
+      if (opened) {
+        connect();
+      } else {
+        giveUp();
+      }
+    };
+  };
+
+  connect();
+
+  return () => {
+    stopped = true;
+    source?.close();
+  };
+}
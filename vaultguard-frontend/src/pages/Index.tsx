@@ -7,12 +7,15 @@ import CategorySummary from "@/components/CategorySummary";
 import UserProfileDropdown from "@/components/UserProfileDropdown";
 import PredictionTab from "@/components/PredictionTab";
 import AnalyticsTransactions from "@/components/AnalyticsTransactions";
-import { getExpenses, getBudget, addExpense, deleteExpense, setupDemoUser, type Expense, type BudgetData } from "@/lib/api";
+import { getExpenses, getBudget, addExpense, deleteExpense, setupDemoUser, subscribeToDashboard, type Expense, type BudgetData, type DashboardFigures } from "@/lib/api";
 import { Loader2, RefreshCw } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { useToast } from "@/hooks/use-toast";
 import { useAuth } from "@/contexts/AuthContext";
 
+// How often budget figures are refetched when the live stream is unavailable
+const BUDGET_POLL_INTERVAL_MS = 30000;
+
 const Index = () => {
   const [activeTab, setActiveTab] = useState("dashboard");
   const [budget, setBudget] = useState(50000);
@@ -20,6 +23,7 @@ const Index = () => {
   const [loading, setLoading] = useState(true);
   const [settingUp, setSettingUp] = useState(false);
   const [budgetData, setBudgetData] = useState<BudgetData | null>(null);
+  const [liveForecast, setLiveForecast] = useState<DashboardFigures | null>(null);
   const { toast } = useToast();
   const { user } = useAuth();
 
@@ -81,6 +85,52 @@ const Index = () => {
     fetchData();
   }, []);
 
+  // Live figures over the dashboard stream, polling the budget if the stream closes
+  useEffect(() => {
+    let pollTimer: ReturnType<typeof setInterval> | null = null;
+
+    const startPolling = () => {
+      if (pollTimer) return;
+      pollTimer = setInterval(async () => {
+        try {
+          setBudgetData(await getBudget());
+        } catch (error) {
+          console.error("Failed to refresh budget:", error);
+        }
+      }, BUDGET_POLL_INTERVAL_MS);
+    };
+
+    const unsubscribe = subscribeToDashboard((figures) => {
+      // Forecast figures arrive once the server has recomputed them
+      if (figures.safe_to_spend !== undefined) {
+        setLiveForecast({
+          safe_to_spend: figures.safe_to_spend,
+          predicted_income: figures.predicted_income,
+          predicted_expense: figures.predicted_expense,
+        });
+      }
+      setBudgetData((prev) => {
+        if (!prev) return prev;
+        const totalSpent = figures.total_spent ?? prev.total_spent;
+        return {
+          ...prev,
+          total_spent: totalSpent,
+          remaining: prev.monthly_budget - totalSpent,
+          percentage_used: prev.monthly_budget > 0
+            ? Math.round((totalSpent / prev.monthly_budget) * 1000) / 10
+            : 0,
+          category_totals: figures.category_totals ?? prev.category_totals,
+          current_balance: figures.current_balance ?? prev.current_balance,
+        };
+      });
+    }, startPolling);
+
+    return () => {
+      unsubscribe();
+      if (pollTimer) clearInterval(pollTimer);
+    };
+  }, []);
+
   const totalSpent = budgetData?.total_spent || expenses.reduce((sum, e) => sum + e.amount, 0);
 
   const handleAddExpense = async (expense: Omit<Expense, "id">) => {
@@ -242,7 +292,7 @@ const Index = () => {
                 exit="exit"
                 transition={{ duration: 0.3 }}
               >
-                <PredictionTab expenses={expenses} budget={budget} />
+                <PredictionTab expenses={expenses} budget={budget} liveForecast={liveForecast} />
               </motion.div>
             )}
 